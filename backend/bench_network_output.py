@@ -0,0 +1,120 @@
+"""Benchmark the network output drivers over loopback.
+
+    python -m bench_network_output [--channels 4] [--leds 1000] [--frames 500] [--sync]
+
+Sends frames of random colors with each protocol to a receiver thread on
+127.0.0.1 and reports frames and packets per second on the sending side, plus
+how many packets the receiver saw. Packets that did not arrive were dropped
+by the kernel (a full socket buffer); the driver counts failed sends itself.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import socket
+import threading
+import time
+
+from engine.artnet import ArtnetDriver
+from engine.ddp import DdpDriver
+from engine.network_output import NetworkDriver
+from engine.sacn import SacnDriver
+from models import Channel
+
+
+class _Receiver(threading.Thread):
+    def __init__(self) -> None:
+        super().__init__(daemon=True)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.2)
+        self.port = self.sock.getsockname()[1]
+        self.packets = 0
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.is_set():
+            try:
+                self.sock.recv(2048)
+            except TimeoutError:
+                continue
+            self.packets += 1
+
+    def stop(self) -> None:
+        self._done.set()
+        self.join()
+        self.sock.close()
+
+
+def _drivers(channels: list[Channel], port: int, sync: bool) -> dict[str, NetworkDriver]:
+    universes = {}
+    next_universe = 1
+    for ch in channels:
+        universes[ch.id] = next_universe
+        next_universe += -(-ch.ledCount // 170)
+    return {
+        "sACN": SacnDriver(
+            universes, host="127.0.0.1", port=port, sync_universe=next_universe if sync else 0
+        ),
+        "Art-Net": ArtnetDriver(universes, host="127.0.0.1", port=port, sync=sync),
+        "DDP": DdpDriver(
+            {ch.id: f"127.0.0.1:{i * ch.ledCount}" for i, ch in enumerate(channels)},
+            port=port,
+            sync=sync,
+        ),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench_network_output")
+    parser.add_argument("--channels", type=int, default=4)
+    parser.add_argument("--leds", type=int, default=1000, help="LEDs per channel")
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--sync", action="store_true", help="send sync packets after each frame")
+    args = parser.parse_args(argv)
+
+    channels = [
+        Channel(
+            id=f"ch-{i}", name=f"Channel {i}", gpioPin=18, ledCount=args.leds,
+            ledType="WS2812B", colorOrder="GRB",
+        )
+        for i in range(args.channels)
+    ]
+    rng = random.Random(0)
+    frames = [
+        {ch.id: [(rng.randrange(256), rng.randrange(256), rng.randrange(256))] * ch.ledCount
+         for ch in channels}
+        for _ in range(8)
+    ]
+
+    print(f"{args.channels} channels x {args.leds} LEDs, {args.frames} frames")
+    receiver = _Receiver()
+    receiver.start()
+    try:
+        for name, driver in _drivers(channels, receiver.port, args.sync).items():
+            driver.write_frame(channels, frames[0])  # build the packets
+            time.sleep(0.3)  # let the receiver drain
+            received = receiver.packets
+            sent = driver.packets_sent
+            start = time.perf_counter()
+            for i in range(args.frames):
+                driver.write_frame(channels, frames[i % len(frames)])
+            elapsed = time.perf_counter() - start
+            sent = driver.packets_sent - sent
+            time.sleep(0.3)  # let the receiver drain
+            received = receiver.packets - received
+            print(
+                f"  {name:<8} {args.frames / elapsed:8.0f} frames/s"
+                f"  {sent / elapsed:9.0f} packets/s"
+                f"  {sent // args.frames:4d} packets/frame"
+                f"  received {received}/{sent}  send errors {driver.send_errors}"
+            )
+            driver.close()
+    finally:
+        receiver.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
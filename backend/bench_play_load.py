@@ -0,0 +1,112 @@
+"""Benchmark cold play loads with and without the trusted fast path.
+
+    python -m bench_play_load [--cues 300] [--regions 300] [--ranges 4] [--repeat 5]
+
+Builds a synthetic play, saves it with the JSON backend in a temporary data
+directory, then times a cold ``load_play`` (a fresh ``Storage`` each run) two
+ways: with the checksum recorded at save time, and with it removed from the
+play index, which forces full validation as for a file edited by hand.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from models import Cue, Effect, PixelRange, Play, Region
+from storage import Storage
+
+
+def make_large_play(cues: int, regions: int, ranges: int) -> Play:
+    width = ranges * 10
+    return Play(
+        id="bench",
+        name="Benchmark",
+        regions=[
+            Region(
+                id=f"r-{i}",
+                name=f"Region {i}",
+                channelId="ch-1",
+                ranges=[
+                    PixelRange(start=i * width + j * 10, end=i * width + j * 10 + 7)
+                    for j in range(ranges)
+                ],
+            )
+            for i in range(regions)
+        ],
+        cues=[
+            Cue(
+                id=f"cue-{c}",
+                name=f"Cue {c}",
+                effectsByRegion={
+                    f"r-{i}": Effect(
+                        id=f"e-{c}-{i}", type="static_color", params={"color": "#ff8800"}
+                    )
+                    for i in range(regions)
+                },
+            )
+            for c in range(cues)
+        ],
+    )
+
+
+def _time_cold_load(data_dir: Path, repeat: int) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        storage = Storage(data_dir)
+        gc.collect()
+        start = time.perf_counter()
+        storage.load_play("bench")
+        times.append(time.perf_counter() - start)
+        del storage
+    return times
+
+
+def _drop_checksums(data_dir: Path) -> None:
+    path = data_dir / "plays-index.json"
+    index = json.loads(path.read_text(encoding="utf-8"))
+    for entry in index["plays"].values():
+        entry.pop("sha256", None)
+    path.write_text(json.dumps(index), encoding="utf-8")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench_play_load")
+    parser.add_argument("--cues", type=int, default=300)
+    parser.add_argument("--regions", type=int, default=300)
+    parser.add_argument("--ranges", type=int, default=4, help="pixel ranges per region")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    play = make_large_play(args.cues, args.regions, args.ranges)
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        storage = Storage(data_dir)
+        storage.create_dirs()
+        storage.save_play(play)
+        size = (data_dir / "plays" / "play-bench.json").stat().st_size
+        del storage, play
+
+        trusted = _time_cold_load(data_dir, args.repeat)
+        _drop_checksums(data_dir)
+        full = _time_cold_load(data_dir, args.repeat)
+
+    print(
+        f"play: {args.cues} cues x {args.regions} regions x {args.ranges} ranges, "
+        f"{size / 1e6:.1f} MB JSON"
+    )
+    for label, times in (("full validation", full), ("trusted fast path", trusted)):
+        print(
+            f"  {label:<18} median {statistics.median(times) * 1000:7.1f} ms"
+            f"  min {min(times) * 1000:7.1f} ms"
+        )
+    print(f"  speedup            {statistics.median(full) / statistics.median(trusted):.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
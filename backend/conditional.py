@@ -0,0 +1,111 @@
+"""Conditional requests: ``ETag``, ``If-None-Match`` and ``If-Match``.
+
+Routes get an opaque tag from storage (see ``StorageBackend.play_tag``) before
+loading anything, so a client whose copy is current gets a 304 without the
+resource being read, validated or serialized.
+"""
+from __future__ import annotations
+
+from fastapi import HTTPException, Request, Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Appended to the tag of a gzip-encoded body, a different representation
+_GZIP_SUFFIX = "-gzip"
+
+
+def _etag(tag: str) -> str:
+    return f'"{tag}"'
+
+
+def _strip_encoding(etag: str) -> str:
+    suffix = _GZIP_SUFFIX + '"'
+    if etag.endswith(suffix):
+        return etag[: -len(suffix)] + '"'
+    return etag
+
+
+def _matches(header: str, etag: str, weak: bool) -> bool:
+    """Whether an ``If-Match``/``If-None-Match`` list names ``etag``.
+
+    With ``weak`` (If-None-Match), ``W/"x"`` matches ``"x"``; If-Match uses
+    strong comparison, where a weak tag never matches. The tag of the gzip
+    encoding matches too: both encode the same stored content.
+    """
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if _strip_encoding(candidate) == etag:
+            return True
+    return False
+
+
+def conditional_get(request: Request, response: Response, tag: str | None) -> Response | None:
+    """Tag a GET response, or return a 304 if the client's copy is current.
+
+    ``tag`` should be read before the resource is loaded: if a write lands in
+    between, the client gets the newer content with the older tag, and its
+    next conditional request simply fetches it again.
+    """
+    if tag is None:
+        return None
+    etag = _etag(tag)
+    # Cache, but revalidate on every use
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _matches(if_none_match, etag, weak=True):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def check_if_match(request: Request, tag: str | None) -> None:
+    """Raise 412 if the request's ``If-Match`` does not name the current tag."""
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return
+    if tag is None or not _matches(if_match, _etag(tag), weak=False):
+        raise HTTPException(
+            status_code=412,
+            detail="The resource has changed since it was fetched. Reload and try again.",
+        )
+
+
+def set_etag(response: Response, tag: str | None) -> None:
+    if tag is not None:
+        response.headers["ETag"] = _etag(tag)
+
+
+class EncodingETagMiddleware:
+    """Give gzip-encoded responses their own strong ETag.
+
+    Must wrap GZipMiddleware. A compressed body is not byte-identical to the
+    uncompressed one, so ``"<tag>"`` becomes ``"<tag>-gzip"`` on it.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_tagged(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                etag = headers.get("etag")
+                if (
+                    etag is not None
+                    and etag.startswith('"')
+                    and headers.get("content-encoding") == "gzip"
+                ):
+                    headers["etag"] = etag[:-1] + _GZIP_SUFFIX + '"'
+            await send(message)
+
+        await self.app(scope, receive, send_tagged)
@@ -1,12 +1,43 @@
 from pathlib import Path
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     data_dir: Path = Path("/var/lib/pilites")
+    storage_backend: Literal["json", "sqlite"] = "json"
     mock_hardware: bool = False
+    hardware_output: Literal["ws281x", "sacn", "artnet", "ddp"] = "ws281x"
+    # sACN output: channel id -> first universe, e.g. {"ch-1": 1}
+    sacn_universes: dict[str, int] = {}
+    sacn_host: str | None = None
+    sacn_priority: int = 100
+    sacn_sync_universe: int = 0
+    # Art-Net output: channel id -> first port address
+    artnet_universes: dict[str, int] = {}
+    artnet_host: str = "255.255.255.255"
+    # DDP output: channel id -> "host" or "host:first pixel"
+    ddp_outputs: dict[str, str] = {}
+    # Art-Net and DDP: follow each frame with sync packets
+    output_sync: bool = False
     hardware_test_timeout_sec: int = 30
     fps_target: int = 30
+    render_process: bool = False
+    render_cpu: int | None = None
+    render_rt_priority: int = 0
+    render_nice: int = 0
+    live_show_mode: bool = False
+    loop_lag_threshold_ms: int = 100
+    autosave_delay_ms: int = 0
+    max_backups_per_play: int = 0
+    max_import_mb: int = 50
+    gzip_min_bytes: int = 1024
+    # Multi-Pi shows: a coordinator owns the cue state, nodes follow it
+    cluster_role: Literal["standalone", "coordinator", "node"] = "standalone"
+    cluster_coordinator: str | None = None
+    cluster_port: int = 5570
+    cluster_node_name: str | None = None
     host: str = "0.0.0.0"
     port: int = 8000
 
@@ -0,0 +1,90 @@
+"""Art-Net 4 network output (ArtDmx and ArtSync).
+
+Each channel is sent as consecutive 15-bit port addresses (Net, Sub-Net and
+Universe), split into universes as with sACN (see ``UniverseDriver``). Packets go to ``host``,
+which may be a controller's address or a broadcast address. With ``sync``,
+every frame is followed by an ArtSync to each destination so nodes output the
+frame together rather than as each ArtDmx arrives.
+"""
+from __future__ import annotations
+
+import struct
+
+from engine.network_output import Packet, UniverseDriver, distinct_addresses
+
+ARTNET_PORT = 6454
+MAX_UNIVERSE = 0x7FFF
+
+_ID = b"Art-Net\x00"
+_OP_DMX = 0x5000
+_OP_SYNC = 0x5200
+_PROTOCOL_VERSION = 14
+
+HEADER_SIZE = 18
+SYNC_PACKET_SIZE = 14
+_SEQUENCE_OFFSET = 12
+
+
+def build_dmx_packet(universe: int, slot_count: int) -> bytearray:
+    """An ArtDmx packet for ``slot_count`` slots, all zero, sequence 0.
+
+    The DMX data length must be even, so an odd slot count gets one
+    trailing zero.
+    """
+    length = slot_count + (slot_count & 1)
+    packet = bytearray(HEADER_SIZE + length)
+    struct.pack_into(
+        "<8sHBBBBBB", packet, 0,
+        _ID,
+        _OP_DMX,                         # opcode, little-endian
+        0, _PROTOCOL_VERSION,            # protocol version, high byte first
+        0,                               # sequence
+        0,                               # physical port
+        universe & 0xFF,                 # SubUni: sub-net and universe
+        universe >> 8,                   # Net
+    )
+    struct.pack_into("!H", packet, 16, length)
+    return packet
+
+
+def build_sync_packet() -> bytearray:
+    packet = bytearray(SYNC_PACKET_SIZE)
+    struct.pack_into("<8sHBBBB", packet, 0, _ID, _OP_SYNC, 0, _PROTOCOL_VERSION, 0, 0)
+    return packet
+
+
+class ArtnetDriver(UniverseDriver):
+    """Send channel buffers as ArtDmx universes over UDP.
+
+    ``universes`` maps channel ids to their first port address (0-32767).
+    """
+
+    protocol = "Art-Net"
+    max_universe = MAX_UNIVERSE
+    header_size = HEADER_SIZE
+    sequence_offset = _SEQUENCE_OFFSET
+
+    def __init__(
+        self,
+        universes: dict[str, int],
+        host: str = "255.255.255.255",
+        port: int = ARTNET_PORT,
+        sync: bool = False,
+    ) -> None:
+        super().__init__(universes, port, sync)
+        self._host = host
+
+    def _next_sequence(self, sequence: int) -> int:
+        # 1-255; 0 would tell nodes to ignore ordering
+        return sequence % 255 + 1
+
+    def _build_universe(
+        self, universe: int, slot_count: int
+    ) -> tuple[tuple[str, int], bytearray]:
+        return (self._host, self._port), build_dmx_packet(universe, slot_count)
+
+    def _build_sync(self, packets: list[Packet]) -> list[Packet]:
+        return [
+            Packet(address=address, buffer=build_sync_packet())
+            for address in distinct_addresses(packets)
+        ]
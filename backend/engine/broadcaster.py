@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import logging
+from collections.abc import Callable
 
 from fastapi import WebSocket
 
@@ -11,6 +12,8 @@ logger = logging.getLogger(__name__)
 class Broadcaster:
     def __init__(self) -> None:
         self._connections: set[WebSocket] = set()
+        # In-process consumers called with every message, e.g. the cluster coordinator
+        self._listeners: list[Callable[[dict], None]] = []
 
     def connect(self, ws: WebSocket) -> None:
         self._connections.add(ws)
@@ -18,7 +21,19 @@ class Broadcaster:
     def disconnect(self, ws: WebSocket) -> None:
         self._connections.discard(ws)
 
+    def add_listener(self, callback: Callable[[dict], None]) -> None:
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[dict], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
     async def broadcast(self, message: dict) -> None:
+        for callback in self._listeners:
+            try:
+                callback(message)
+            except Exception:
+                logger.exception("Broadcast listener failed")
         dead: set[WebSocket] = set()
         text = json.dumps(message)
         for ws in self._connections:
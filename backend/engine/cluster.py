@@ -0,0 +1,598 @@
+"""Distributed live rendering: one coordinator, any number of nodes.
+
+The coordinator is an ordinary PiLites instance whose live session owns the
+cue state. It sends that state (play, cue, the moment the cue started on the
+coordinator's clock, blackout) to every node over UDP whenever it changes, and
+again every second so a lost datagram is repaired. Each node renders its own
+channels from its own copy of the play. Effects depend only on a cue's elapsed
+time, so nodes that agree on the coordinator's clock produce the same frame at
+the same moment without any pixels crossing the network.
+
+Nodes estimate the coordinator's clock NTP-style: a ping carries the node's
+send time, and the reply carries the coordinator's receive and send times. Of
+the last few samples, the one with the shortest round trip gives the offset.
+Frames are rendered on a grid of ``1 / fps`` from the cue's start, so every
+node renders frame k of a cue, for the same elapsed time, at the same
+coordinator time.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from engine.session import _build_cue_table, _compile_cue, _frame_message, _render_plan
+from engine.stats import FrameStats
+from models import Channel, ClusterNodeStatus, ClusterStatus, LiveStatus, Play
+from storage import content_hash
+
+logger = logging.getLogger(__name__)
+
+_HEARTBEAT_SEC = 1.0
+# A node pings quickly until it has a full window of clock samples
+_FAST_PING_SEC = 0.1
+_PING_SEC = 1.0
+_CLOCK_WINDOW = 8
+# Silence after which the other side is considered gone
+_TIMEOUT_SEC = 5.0
+
+
+class _Datagrams(asyncio.DatagramProtocol):
+    def __init__(self, handler: Callable[[dict, tuple[str, int]], None]) -> None:
+        self._handler = handler
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        if isinstance(message, dict):
+            self._handler(message, addr)
+
+    def error_received(self, exc: Exception) -> None:
+        # An ICMP error from a node or coordinator that is not running yet
+        logger.debug("Cluster socket error: %s", exc)
+
+
+def _encode(message: dict) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode()
+
+
+class ClockOffset:
+    """Estimate of ``coordinator clock - local clock`` from ping round trips.
+
+    Each sample is NTP's: ``t0`` local send, ``t1`` remote receive, ``t2``
+    remote send, ``t3`` local receive. Queueing delay only ever lengthens a
+    round trip, so the sample with the shortest one is the most accurate.
+    """
+
+    def __init__(self, window: int = _CLOCK_WINDOW) -> None:
+        # (round trip, offset)
+        self._samples: deque[tuple[float, float]] = deque(maxlen=window)
+
+    def add(self, t0: float, t1: float, t2: float, t3: float) -> None:
+        rtt = (t3 - t0) - (t2 - t1)
+        if rtt < 0:
+            return
+        self._samples.append((rtt, ((t1 - t0) + (t2 - t3)) / 2))
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    @property
+    def synced(self) -> bool:
+        return bool(self._samples)
+
+    @property
+    def offset(self) -> float:
+        return min(self._samples)[1] if self._samples else 0.0
+
+    @property
+    def rtt(self) -> float | None:
+        return min(self._samples)[0] if self._samples else None
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+# ── Coordinator ────────────────────────────────────────────────────────────────
+
+
+@dataclass(slots=True)
+class _Node:
+    name: str
+    last_seen: float
+    offset_ms: float | None = None
+    rtt_ms: float | None = None
+    play_id: str | None = None
+    error: str | None = None
+
+
+class ClusterCoordinator:
+    """Publish a live session's cue state to the nodes that ping it.
+
+    ``session`` is the LiveSession or ProcessLiveSession this instance runs.
+    Call ``on_broadcast`` with every live broadcast message; state is sent
+    on each ``status`` message, which the sessions broadcast on every change.
+    """
+
+    role = "coordinator"
+
+    def __init__(self, session, port: int, fps: int, host: str = "0.0.0.0") -> None:
+        self._session = session
+        self._address = (host, port)
+        self._fps = fps
+        # Lets nodes tell a restarted coordinator from stale datagrams
+        self._epoch = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._nodes: dict[tuple[str, int], _Node] = {}
+        self._transport: asyncio.DatagramTransport | None = None
+        self._heartbeat: asyncio.Task | None = None
+        # (play object, its content hash), hashed in a worker thread
+        self._hashed: tuple[Play, str] | None = None
+        self._hashing: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _Datagrams(self._on_message), local_addr=self._address
+        )
+        self._heartbeat = asyncio.create_task(self._run_heartbeat())
+        logger.info("Cluster coordinator listening on UDP %s:%d", self._address[0], self.port)
+
+    @property
+    def port(self) -> int:
+        """The bound UDP port (useful when started on port 0)."""
+        if self._transport is None:
+            return self._address[1]
+        return self._transport.get_extra_info("sockname")[1]
+
+    async def stop(self) -> None:
+        for task in (self._heartbeat, self._hashing):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        if self._transport is not None:
+            self.publish()
+            self._transport.close()
+            self._transport = None
+
+    def on_broadcast(self, message: dict) -> None:
+        if message.get("type") == "status":
+            self.publish()
+
+    def _play_hash(self, play: Play) -> str | None:
+        """The play's content hash, or None while it is being computed.
+
+        Hashing a large play takes long enough to delay frames, so it runs in
+        a thread and the state is published again once it is known.
+        """
+        if self._hashed is not None and self._hashed[0] is play:
+            return self._hashed[1]
+        if self._hashing is None or self._hashing.done():
+            self._hashing = asyncio.create_task(self._hash(play))
+        return None
+
+    async def _hash(self, play: Play) -> None:
+        digest = await asyncio.to_thread(content_hash, play)
+        self._hashed = (play, digest)
+        self._hashing = None
+        current = self._session.play
+        if current is play:
+            self.publish()
+        elif current is not None:
+            # Replaced while hashing; hash the newer one
+            self._play_hash(current)
+
+    def state(self) -> dict:
+        s = self._session
+        message = {"type": "state", "epoch": self._epoch, "seq": self._seq, "running": False}
+        if s.is_running and s.play is not None:
+            message.update(
+                running=True,
+                playId=s.play_id,
+                playHash=self._play_hash(s.play),
+                cueIndex=s.cue_index,
+                cueStart=s.cue_started_at,
+                blackout=s.is_blackout,
+                fps=self._fps,
+            )
+        return message
+
+    def publish(self) -> None:
+        """Send the current state to every node."""
+        if self._transport is None or not self._nodes:
+            return
+        self._seq += 1
+        data = _encode(self.state())
+        for address in self._nodes:
+            self._transport.sendto(data, address)
+
+    async def _run_heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(_HEARTBEAT_SEC)
+            now = time.monotonic()
+            for address, node in list(self._nodes.items()):
+                if now - node.last_seen > _TIMEOUT_SEC:
+                    logger.warning("Cluster node %s (%s) stopped responding", node.name, address[0])
+                    del self._nodes[address]
+            self.publish()
+
+    def _on_message(self, message: dict, address: tuple[str, int]) -> None:
+        received = time.monotonic()
+        if message.get("type") != "ping" or self._transport is None:
+            return
+        node = self._nodes.get(address)
+        if node is None:
+            node = self._nodes[address] = _Node(str(message.get("name") or address[0]), received)
+            logger.info("Cluster node %s joined from %s", node.name, address[0])
+            self._transport.sendto(_encode(self.state()), address)
+        node.last_seen = received
+        node.offset_ms = message.get("offsetMs")
+        node.rtt_ms = message.get("rttMs")
+        node.play_id = message.get("playId")
+        node.error = message.get("error")
+        self._transport.sendto(
+            _encode(
+                {"type": "pong", "t0": message.get("t0"), "t1": received, "t2": time.monotonic()}
+            ),
+            address,
+        )
+
+    def cluster_status(self) -> ClusterStatus:
+        now = time.monotonic()
+        return ClusterStatus(
+            role=self.role,
+            nodes=[
+                ClusterNodeStatus(
+                    name=node.name,
+                    address=f"{address[0]}:{address[1]}",
+                    lastSeenSec=round(now - node.last_seen, 3),
+                    offsetMs=node.offset_ms,
+                    rttMs=node.rtt_ms,
+                    playId=node.play_id,
+                    error=node.error,
+                )
+                for address, node in self._nodes.items()
+            ],
+        )
+
+
+# ── Node ───────────────────────────────────────────────────────────────────────
+
+
+class ClusterNode:
+    """A live session that follows a coordinator instead of taking commands.
+
+    Takes the place of LiveSession on a node: the live routes read its status
+    and stats, and its frames go to ``broadcaster`` and ``hardware`` as usual.
+    The play and channels come from this node's own storage. ``clock`` is the
+    local time source; tests substitute a skewed one.
+    """
+
+    role = "node"
+
+    def __init__(
+        self,
+        coordinator: str,
+        port: int,
+        storage,
+        hardware,
+        broadcaster,
+        name: str,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.is_running: bool = False
+        self.play_id: str | None = None
+        self.cue_index: int = 0
+        self.is_blackout: bool = False
+        self.next_cue_ready: bool = False
+        self.show_mode: bool = False
+        self.realtime_report: dict[str, str] = {}
+        self.stats: FrameStats | None = None
+        # Why this node is not rendering what the coordinator is, if it isn't
+        self.error: str | None = None
+        self.offset = ClockOffset()
+        self._coordinator = (coordinator, port)
+        self._storage = storage
+        self._hardware = hardware
+        self._broadcaster = broadcaster
+        self._name = name
+        self._clock = clock
+        self._transport: asyncio.DatagramTransport | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._render: asyncio.Task | None = None
+        self._epoch: str | None = None
+        self._seq = 0
+        self._last_heard: float | None = None
+        self._latest: dict | None = None
+        self._wake = asyncio.Event()
+        self._play: Play | None = None
+        self._play_hash: str | None = None
+        # A coordinator hash this node's copy was found not to match
+        self._mismatched_hash: str | None = None
+        self._channels: list[Channel] = []
+        self._table: list = []
+        self._plan = None
+        self._cue_start: float = 0.0
+        self._fps: int = 30
+
+    @property
+    def play(self) -> Play | None:
+        return self._play
+
+    def now(self) -> float:
+        """The coordinator's clock, as estimated here."""
+        return self._clock() + self.offset.offset
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _Datagrams(self._on_message), remote_addr=self._coordinator
+        )
+        self._tasks = [
+            asyncio.create_task(self._run_pings()),
+            asyncio.create_task(self._follow()),
+        ]
+        logger.info("Cluster node %s following %s:%d", self._name, *self._coordinator)
+
+    async def stop(self, broadcaster=None, hardware=None) -> None:
+        """Stop following the coordinator and turn this node's output off."""
+        for task in self._tasks:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        await self._stop_rendering()
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    # ── Coordinator messages ───────────────────────────────────────────────────
+
+    def _send(self, message: dict) -> None:
+        if self._transport is not None:
+            self._transport.sendto(_encode(message))
+
+    async def _run_pings(self) -> None:
+        while True:
+            self._send(
+                {
+                    "type": "ping",
+                    "name": self._name,
+                    "t0": self._clock(),
+                    "offsetMs": _ms(self.offset.offset) if self.offset.synced else None,
+                    "rttMs": _ms(self.offset.rtt),
+                    "playId": self.play_id,
+                    "error": self.error,
+                }
+            )
+            full = len(self.offset) >= _CLOCK_WINDOW
+            await asyncio.sleep(_PING_SEC if full else _FAST_PING_SEC)
+
+    def _on_message(self, message: dict, address: tuple[str, int]) -> None:
+        received = self._clock()
+        kind = message.get("type")
+        if kind == "pong":
+            try:
+                self.offset.add(message["t0"], message["t1"], message["t2"], received)
+            except (KeyError, TypeError):
+                return
+            self._last_heard = received
+        elif kind == "state":
+            epoch, seq = message.get("epoch"), message.get("seq", 0)
+            if epoch == self._epoch and seq < self._seq:
+                return  # overtaken by a newer state
+            self._epoch, self._seq = epoch, seq
+            self._last_heard = received
+            # Only the newest state matters; _follow applies it
+            self._latest = message
+            self._wake.set()
+
+    async def _follow(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            # Cue start times mean nothing until the coordinator's clock is known
+            while not self.offset.synced:
+                await asyncio.sleep(_FAST_PING_SEC)
+            message, self._latest = self._latest, None
+            if message is None:
+                continue
+            try:
+                await self._apply(message)
+            except Exception as e:
+                logger.exception("Cluster node failed to apply state")
+                self.error = str(e)
+
+    async def _apply(self, message: dict) -> None:
+        if not message.get("running"):
+            if self.is_running:
+                await self._stop_rendering()
+            return
+        play_id = message["playId"]
+        expected = message.get("playHash")
+        if play_id != self.play_id or (
+            expected and expected not in (self._play_hash, self._mismatched_hash)
+        ):
+            await self._load(play_id, expected)
+        if self._play is None:
+            await self._stop_rendering()
+            return
+
+        cue_index = message["cueIndex"]
+        if not 0 <= cue_index < len(self._play.cues):
+            self.error = f"Cue {cue_index + 1} is not in this node's copy of play '{play_id}'."
+            await self._stop_rendering()
+            return
+        changed = (
+            cue_index != self.cue_index
+            or message["cueStart"] != self._cue_start
+            or message["blackout"] != self.is_blackout
+            or self._plan is None
+        )
+        if cue_index != self.cue_index or self._plan is None:
+            self._plan = _compile_cue(
+                self._play, self._channels, cue_index, self._table[cue_index]
+            )
+        self.cue_index = cue_index
+        self._cue_start = message["cueStart"]
+        self.is_blackout = message["blackout"]
+        self._fps = message["fps"]
+        if not self.is_running:
+            self.is_running = True
+            self.stats = FrameStats(self._fps)
+            self._render = asyncio.create_task(self._run())
+        if changed:
+            await self._broadcaster.broadcast(self._status_message())
+
+    async def _load(self, play_id: str, expected: str | None) -> None:
+        """Load the coordinator's play from this node's storage.
+
+        The frame loop keeps rendering the previous play until everything is
+        loaded; the new state is then swapped in without yielding.
+        """
+        play = await self._storage.aio.load_play(play_id)
+        if play is None or not play.cues:
+            self._play = None
+            self.play_id = None
+            self.error = f"Play '{play_id}' is not on this node."
+            logger.warning("Cluster node cannot render: play %s is not on this node", play_id)
+            return
+        channels = await self._storage.aio.load_channels()
+        table = await asyncio.to_thread(_build_cue_table, play)
+        play_hash = await asyncio.to_thread(content_hash, play)
+        self._play, self._channels, self._table = play, channels, table
+        self._play_hash = play_hash
+        self._plan = None
+        self.play_id = play_id
+        self.error = None
+        self._mismatched_hash = None
+        if expected and expected != play_hash:
+            # Keep rendering: a copy that differs only in an effect parameter
+            # is better than dark strips, and the status reports it
+            self._mismatched_hash = expected
+            self.error = f"This node's copy of play '{play_id}' differs from the coordinator's."
+            logger.warning("Cluster node: play %s differs from the coordinator's", play_id)
+
+    # ── Rendering ──────────────────────────────────────────────────────────────
+
+    async def _stop_rendering(self) -> None:
+        if self._render and not self._render.done():
+            self._render.cancel()
+            # wait() rather than await: a cancellation of the caller (stop()
+            # cancelling _follow) must propagate, not pass as the render task's
+            await asyncio.wait([self._render])
+        self._render = None
+        was_running = self.is_running
+        self.is_running = False
+        self._plan = None
+        if self._hardware and self._channels:
+            self._hardware.all_off(self._channels)
+        if was_running:
+            await self._broadcaster.broadcast(self._status_message())
+
+    async def _run(self) -> None:
+        hardware, broadcaster = self._hardware, self._broadcaster
+        cue_start: float | None = None
+        frame = -1
+        try:
+            while True:
+                t0 = time.monotonic()
+                interval = 1.0 / self._fps
+                if self._cue_start != cue_start:
+                    cue_start, frame = self._cue_start, -1
+                # The frame due now on the cue's grid; never repeat one
+                frame = max(frame + 1, round((self.now() - cue_start) / interval))
+                channels = self._channels
+                if self.is_blackout:
+                    await broadcaster.broadcast(
+                        {
+                            "type": "frame",
+                            "timestamp": time.time(),
+                            "channels": {ch.id: ["#000000"] * ch.ledCount for ch in channels},
+                        }
+                    )
+                    if hardware:
+                        hardware.all_off(channels)
+                else:
+                    buffers = _render_plan(self._plan, channels, frame * interval)
+                    await broadcaster.broadcast(_frame_message(buffers))
+                    if hardware:
+                        hardware.write_frame(channels, buffers)
+                self.stats.record(t0, time.monotonic() - t0)
+                await asyncio.sleep(max(0.0, cue_start + (frame + 1) * interval - self.now()))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Cluster node frame loop error")
+            self.error = str(e)
+            await broadcaster.broadcast({"type": "error", "message": str(e)})
+
+    # ── Session interface ──────────────────────────────────────────────────────
+
+    def status(self) -> LiveStatus:
+        if not self.is_running or self._play is None:
+            return LiveStatus(
+                isRunning=False,
+                playId=None,
+                cueId=None,
+                cueName=None,
+                cueIndex=None,
+                isBlackout=False,
+            )
+        cue = self._play.cues[self.cue_index]
+        return LiveStatus(
+            isRunning=True,
+            playId=self.play_id,
+            cueId=cue.id,
+            cueName=cue.name,
+            cueIndex=self.cue_index,
+            isBlackout=self.is_blackout,
+        )
+
+    def _status_message(self) -> dict:
+        s = self.status()
+        return {
+            "type": "status",
+            "playId": s.playId,
+            "cueId": s.cueId,
+            "cueName": s.cueName,
+            "cueIndex": s.cueIndex,
+            "isRunning": s.isRunning,
+            "isBlackout": s.isBlackout,
+            "nextCueReady": s.nextCueReady,
+        }
+
+    async def get_stats(self) -> dict:
+        snapshot = self.stats.snapshot() if self.stats else {}
+        return {
+            "isRunning": self.is_running,
+            "showMode": self.show_mode,
+            "realtime": self.realtime_report,
+            **snapshot,
+        }
+
+    def cluster_status(self) -> ClusterStatus:
+        error = self.error
+        if self._last_heard is not None and self._clock() - self._last_heard > _TIMEOUT_SEC:
+            error = "Coordinator is not responding; holding the last cue."
+        return ClusterStatus(
+            role=self.role,
+            coordinator=f"{self._coordinator[0]}:{self._coordinator[1]}",
+            synced=self.offset.synced,
+            offsetMs=_ms(self.offset.offset) if self.offset.synced else None,
+            rttMs=_ms(self.offset.rtt),
+            error=error,
+        )
@@ -0,0 +1,136 @@
+"""Compiled plays: a play in a form the engine can load without parsing.
+
+A compiled play file holds the validated ``Play`` and its resolved cue table
+as one pickle, followed by a table of buffer indices for every region's
+pixels. Loading unpickles the models without running pydantic validation and
+memory-maps the index table, so a large play is ready to render almost as soon
+as the file is opened. The file layout is::
+
+    header        magic, format version, model schema hash, pickle length,
+                  table offset and length
+    pickle        (play, cue table, region id -> (start, count), byte order)
+    padding       to an 8-byte boundary
+    index table   native unsigned 32-bit buffer indices, region after region
+
+Compiled files are a cache written by the storage backend from plays it has
+already validated. They are never accepted from uploads.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+
+from engine.gc_control import gc_paused
+from models import Effect, Play
+
+COMPILED_VERSION = 1
+
+_MAGIC = b"PLCP"
+_HEADER = struct.Struct("<4sHxx32sQQQ")
+
+# Files pickled against a different Play schema are rejected rather than
+# unpickled into models missing (or carrying stale) fields
+_SCHEMA_HASH = hashlib.sha256(
+    json.dumps(Play.model_json_schema(), sort_keys=True).encode()
+).digest()
+
+
+class CompiledPlayError(ValueError):
+    """The file is not a compiled play this version can read."""
+
+
+@dataclass
+class CompiledPlay:
+    play: Play
+    table: list[dict[str, Effect]]
+    # region id -> (start, count) in ``pixel_indices``
+    regions: dict[str, tuple[int, int]]
+    # Buffer index of each region pixel; a memoryview over the mapped file
+    # when loaded from disk
+    pixel_indices: memoryview
+    path: Path | None = None
+
+    def region_slots(self, region_id: str, led_count: int) -> list[tuple[int, int]] | None:
+        """``(pixel index, buffer index)`` pairs for a region, as ``_region_slots``."""
+        span = self.regions.get(region_id)
+        if span is None:
+            return None
+        start, count = span
+        indices = self.pixel_indices[start : start + count]
+        return [(px, buf) for px, buf in enumerate(indices) if buf < led_count]
+
+
+def compile_play(play: Play) -> CompiledPlay:
+    """Compile a play in memory."""
+    from engine.session import _build_cue_table
+
+    indices = array("I")
+    regions: dict[str, tuple[int, int]] = {}
+    for region in play.regions:
+        start = len(indices)
+        for pr in region.ranges:
+            indices.extend(range(pr.start, pr.end + 1))
+        regions[region.id] = (start, len(indices) - start)
+    return CompiledPlay(
+        play=play,
+        table=_build_cue_table(play),
+        regions=regions,
+        pixel_indices=memoryview(indices),
+    )
+
+
+def dump_compiled(compiled: CompiledPlay) -> bytes:
+    payload = pickle.dumps(
+        (compiled.play, compiled.table, compiled.regions, sys.byteorder),
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    table_offset = _HEADER.size + len(payload)
+    table_offset += -table_offset % 8
+    table = compiled.pixel_indices.tobytes()
+    header = _HEADER.pack(
+        _MAGIC, COMPILED_VERSION, _SCHEMA_HASH, len(payload), table_offset, len(table)
+    )
+    padding = b"\0" * (table_offset - _HEADER.size - len(payload))
+    return header + payload + padding + table
+
+
+def load_compiled(path: Path) -> CompiledPlay:
+    """Map a compiled play file. Raises ``CompiledPlayError`` if unreadable."""
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # Empty file
+            raise CompiledPlayError(f"{path.name}: {e}")
+    try:
+        magic, version, schema, payload_len, table_offset, table_len = _HEADER.unpack_from(mm)
+        if magic != _MAGIC or version != COMPILED_VERSION:
+            raise CompiledPlayError(f"{path.name}: not a version {COMPILED_VERSION} compiled play")
+        if schema != _SCHEMA_HASH:
+            raise CompiledPlayError(f"{path.name}: compiled against another play schema")
+        if table_offset + table_len > len(mm):
+            raise CompiledPlayError(f"{path.name}: truncated")
+        with gc_paused():
+            play, table, regions, byteorder = pickle.loads(
+                mm[_HEADER.size : _HEADER.size + payload_len]
+            )
+    except CompiledPlayError:
+        mm.close()
+        raise
+    except (struct.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError,
+            IndexError, TypeError, ValueError) as e:
+        # Everything a short header or a corrupt/stale pickle payload can raise
+        mm.close()
+        raise CompiledPlayError(f"{path.name}: {e}")
+    if byteorder != sys.byteorder:
+        mm.close()
+        raise CompiledPlayError(f"{path.name}: written on a {byteorder}-endian system")
+    # The view keeps the mapping alive for as long as the compiled play is used
+    indices = memoryview(mm)[table_offset : table_offset + table_len].cast("I")
+    return CompiledPlay(play=play, table=table, regions=regions, pixel_indices=indices, path=path)
@@ -0,0 +1,106 @@
+"""DDP (Distributed Display Protocol) network output.
+
+A DDP controller takes one flat RGB buffer written at byte offsets, so a
+channel maps to a controller address plus the pixel where the channel starts
+on it: ``"192.168.1.60"`` or ``"192.168.1.60:300"``. Data goes out in packets
+of up to 480 pixels.
+
+Controllers display their buffer when a packet with the PUSH flag arrives.
+Without ``sync``, a channel's last packet carries PUSH. With ``sync``, no data
+packet does; instead every frame ends with a header-only PUSH packet to each
+controller, sent back to back, so all of them latch the frame together.
+"""
+from __future__ import annotations
+
+import logging
+import struct
+
+from engine.network_output import NetworkDriver, Packet, distinct_addresses
+
+logger = logging.getLogger(__name__)
+
+DDP_PORT = 4048
+PIXELS_PER_PACKET = 480
+
+_FLAG_VERSION_1 = 0x40
+_FLAG_PUSH = 0x01
+_TYPE_RGB8 = 0x0B
+_DESTINATION_DISPLAY = 0x01
+
+HEADER_SIZE = 10
+_SEQUENCE_OFFSET = 1
+
+
+def build_packet(byte_offset: int, byte_count: int, push: bool = False) -> bytearray:
+    """A DDP RGB packet for ``byte_count`` bytes at ``byte_offset``, sequence 0."""
+    packet = bytearray(HEADER_SIZE + byte_count)
+    struct.pack_into(
+        "!BBBBIH", packet, 0,
+        _FLAG_VERSION_1 | (_FLAG_PUSH if push else 0),
+        0,                               # sequence
+        _TYPE_RGB8 if byte_count else 0,
+        _DESTINATION_DISPLAY,
+        byte_offset,
+        byte_count,
+    )
+    return packet
+
+
+def parse_output(value: str) -> tuple[str, int]:
+    """``"host"`` or ``"host:pixel"`` as (host, first pixel)."""
+    host, sep, pixel = value.rpartition(":")
+    if not sep:
+        return value, 0
+    if not pixel.isdigit():
+        raise ValueError(f"DDP output '{value}' is not 'host' or 'host:pixel'")
+    return host, int(pixel)
+
+
+class DdpDriver(NetworkDriver):
+    """Send channel buffers to DDP controllers over UDP.
+
+    ``outputs`` maps channel ids to ``"host"`` or ``"host:pixel"``.
+    """
+
+    protocol = "DDP"
+
+    def __init__(self, outputs: dict[str, str], port: int = DDP_PORT, sync: bool = False) -> None:
+        super().__init__(port, sync)
+        self._outputs = {channel_id: parse_output(v) for channel_id, v in outputs.items()}
+
+    def _next_sequence(self, sequence: int) -> int:
+        # 1-15; 0 means sequence numbers are not used
+        return sequence % 15 + 1
+
+    def _build_packets(self, channel) -> list[Packet] | None:
+        output = self._outputs.get(channel.id)
+        if output is None:
+            return None
+        host, first_pixel = output
+        packets = []
+        for start in range(0, channel.ledCount, PIXELS_PER_PACKET):
+            count = min(PIXELS_PER_PACKET, channel.ledCount - start)
+            last = start + count == channel.ledCount
+            packets.append(
+                Packet(
+                    address=(host, self._port),
+                    buffer=build_packet(
+                        (first_pixel + start) * 3, count * 3, push=last and not self._sync_enabled
+                    ),
+                    data_offset=HEADER_SIZE,
+                    first_byte=start * 3,
+                    byte_count=count * 3,
+                    sequence_offset=_SEQUENCE_OFFSET,
+                )
+            )
+        return packets
+
+    def _build_sync(self, packets: list[Packet]) -> list[Packet]:
+        return [
+            Packet(
+                address=address,
+                buffer=build_packet(0, 0, push=True),
+                sequence_offset=_SEQUENCE_OFFSET,
+            )
+            for address in distinct_addresses(packets)
+        ]
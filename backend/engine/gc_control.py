@@ -0,0 +1,111 @@
+"""Garbage-collector control for live shows.
+
+In show mode the loaded play and models are moved out of the collector's
+reach with ``gc.freeze()`` and the generation 2 threshold is raised so full
+collections effectively only happen when the show stops. Generations 0 and 1
+stay automatic, so cyclic garbage is still reclaimed on an overloaded show;
+the frame loop also runs small collections itself when a frame finishes
+early, which keeps the automatic ones from landing mid-frame.
+
+``gc_paused`` switches automatic collection off for a short burst of
+allocations, such as loading a large play, where every new object survives and
+collections triggered by the allocation count cannot free anything.
+"""
+from __future__ import annotations
+
+import gc
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from engine.stats import FrameStats
+
+# Minimum frame slack before a deliberate collection is attempted
+_GEN0_MIN_SLACK_SEC = 0.002
+_GEN1_MIN_SLACK_SEC = 0.005
+# Every Nth deliberate collection also sweeps generation 1
+_GEN1_EVERY = 10
+# Generation 1 collections before a full one while in show mode (default 10)
+_SHOW_GEN2_THRESHOLD = 1_000_000
+
+# gc_paused() nesting across threads, and whether the outermost pause found
+# collection enabled and so should turn it back on
+_pause_lock = threading.Lock()
+_pause_depth = 0
+_pause_reenable = False
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """Disable automatic collection for the duration of the block.
+
+    Pauses may nest and overlap between threads; collection comes back when
+    the last one ends.
+    """
+    global _pause_depth, _pause_reenable
+    with _pause_lock:
+        if _pause_depth == 0:
+            _pause_reenable = gc.isenabled()
+            gc.disable()
+        _pause_depth += 1
+    try:
+        yield
+    finally:
+        with _pause_lock:
+            _pause_depth -= 1
+            if _pause_depth == 0 and _pause_reenable:
+                gc.enable()
+
+
+class ShowModeGC:
+    def __init__(self, enabled: bool, stats: FrameStats) -> None:
+        self.enabled = enabled
+        self._stats = stats
+        self._thresholds: tuple[int, ...] | None = None
+        self._collections = 0
+        self._started: float | None = None
+        self._active = False
+
+    def _on_gc(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            self._stats.record_gc(time.perf_counter() - self._started)
+            self._started = None
+
+    def enter(self) -> None:
+        """Start recording GC pauses; in show mode also freeze and hold off
+        full collections."""
+        gc.callbacks.append(self._on_gc)
+        self._active = True
+        if self.enabled:
+            gc.collect()
+            gc.freeze()
+            self._thresholds = gc.get_threshold()
+            gc.set_threshold(*self._thresholds[:2], _SHOW_GEN2_THRESHOLD)
+
+    def exit(self) -> None:
+        if not self._active:
+            return
+        self._active = False
+        if self.enabled:
+            gc.unfreeze()
+            if self._thresholds is not None:
+                gc.set_threshold(*self._thresholds)
+                self._thresholds = None
+            gc.collect()
+        try:
+            gc.callbacks.remove(self._on_gc)
+        except ValueError:
+            pass
+
+    def collect_in_slack(self, slack_sec: float) -> None:
+        """Run a young-generation collection if the frame left enough time."""
+        if not self.enabled or slack_sec < _GEN0_MIN_SLACK_SEC:
+            return
+        self._collections += 1
+        if self._collections % _GEN1_EVERY == 0 and slack_sec >= _GEN1_MIN_SLACK_SEC:
+            gc.collect(1)
+        else:
+            gc.collect(0)
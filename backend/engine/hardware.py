@@ -26,28 +26,21 @@ def reorder_color(
 
 class HardwareDriver(ABC):
     @abstractmethod
-    def write_channel(
-        self,
-        gpio_pin: int,
-        led_count: int,
-        color_order: str,
-        pixels: list[tuple[int, int, int]],
-    ) -> None: ...
+    def write_frame(
+        self, channels: list, buffers: dict[str, list[tuple[int, int, int]]]
+    ) -> None:
+        """Output one frame: ``buffers`` maps each channel's id to its pixels."""
 
-    @abstractmethod
-    def all_off(self, channels: list) -> None: ...
+    def all_off(self, channels: list) -> None:
+        self.write_frame(channels, {ch.id: [(0, 0, 0)] * ch.ledCount for ch in channels})
 
     @abstractmethod
     def close(self) -> None: ...
 
 
 class MockHardware(HardwareDriver):
-    def write_channel(
-        self,
-        gpio_pin: int,
-        led_count: int,
-        color_order: str,
-        pixels: list[tuple[int, int, int]],
+    def write_frame(
+        self, channels: list, buffers: dict[str, list[tuple[int, int, int]]]
     ) -> None:
         pass  # no-op in mock mode
 
@@ -104,6 +97,12 @@ class RpiHardware(HardwareDriver):
             strip.setPixelColor(i, Color(*ordered))
         strip.show()
 
+    def write_frame(
+        self, channels: list, buffers: dict[str, list[tuple[int, int, int]]]
+    ) -> None:
+        for ch in channels:
+            self.write_channel(ch.gpioPin, ch.ledCount, ch.colorOrder, buffers[ch.id])
+
     def all_off(self, channels: list) -> None:
         for ch in channels:
             try:
@@ -122,11 +121,32 @@ class RpiHardware(HardwareDriver):
                 strip.show()
             except Exception:
                 pass
+        # Dropping the strips releases PWM/DMA; they are recreated on next write
+        self._strips.clear()
+
 
+def create_hardware(
+    mock: bool, output: str = "ws281x", options: dict | None = None
+) -> HardwareDriver:
+    """The driver for ``output``: ``"ws281x"`` GPIO strips, or ``"sacn"``,
+    ``"artnet"`` or ``"ddp"`` network output.
 
-def create_hardware(mock: bool) -> HardwareDriver:
+    ``options`` are keyword arguments for the network driver.
+    """
     if mock:
         return MockHardware()
+    if output == "sacn":
+        from engine.sacn import SacnDriver
+
+        return SacnDriver(**(options or {}))
+    if output == "artnet":
+        from engine.artnet import ArtnetDriver
+
+        return ArtnetDriver(**(options or {}))
+    if output == "ddp":
+        from engine.ddp import DdpDriver
+
+        return DdpDriver(**(options or {}))
     try:
         return RpiHardware()
     except RuntimeError:
@@ -0,0 +1,145 @@
+"""Event-loop lag monitoring.
+
+A probe task sleeps for a fixed interval and measures how late it wakes up;
+that delay is time the loop spent running something else. A watchdog thread
+watches the probe's heartbeat and, when the loop has been stuck for longer
+than the threshold, records which task and code was running at that moment.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from engine.stats import summarize_ms
+
+logger = logging.getLogger(__name__)
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _describe_stack(frame) -> list[str]:
+    """Innermost-last summary of a stack, preferring frames from our own code."""
+    stack = traceback.extract_stack(frame)
+    ours = [f for f in stack if f.filename.startswith(_BACKEND_DIR)]
+    lines = []
+    for f in (ours or stack)[-5:]:
+        filename = f.filename
+        if filename.startswith(_BACKEND_DIR):
+            filename = os.path.relpath(filename, _BACKEND_DIR)
+        lines.append(f"{filename}:{f.lineno} in {f.name}")
+    return lines
+
+
+class LoopLagMonitor:
+    def __init__(
+        self,
+        interval_sec: float = 0.05,
+        threshold_ms: float = 100.0,
+        window: int = 1200,
+        max_spikes: int = 20,
+    ) -> None:
+        self.interval = interval_sec
+        self.threshold = threshold_ms / 1000.0
+        self._lags: deque[float] = deque(maxlen=window)
+        self.spikes: deque[dict] = deque(maxlen=max_spikes)
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._beat = 0.0
+        self._captured_beat: float | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._probe(), name="loop-lag-probe")
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    async def _probe(self) -> None:
+        while True:
+            t0 = self._beat = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - t0 - self.interval)
+            self._lags.append(lag)
+            if lag > self.threshold:
+                logger.warning("Event loop lag %.1f ms", lag * 1000)
+                # The watchdog may already have captured what was running
+                if self.spikes and self.spikes[-1].get("beat") == t0:
+                    self.spikes[-1]["lagMs"] = round(lag * 1000, 3)
+                else:
+                    self.spikes.append(
+                        {
+                            "at": time.time(),
+                            "lagMs": round(lag * 1000, 3),
+                            "task": None,
+                            "coroutine": None,
+                            "where": [],
+                        }
+                    )
+
+    def _watch(self) -> None:
+        poll = min(self.interval, self.threshold / 2)
+        while not self._stop.wait(poll):
+            beat = self._beat
+            stalled = time.perf_counter() - beat - self.interval
+            if stalled <= self.threshold or self._captured_beat == beat:
+                continue
+            self._captured_beat = beat
+            self.spikes.append(self._capture(beat, stalled))
+
+    def _capture(self, beat: float, stalled: float) -> dict:
+        task = asyncio.current_task(self._loop) if self._loop else None
+        frame = sys._current_frames().get(self._loop_thread_id)
+        return {
+            "at": time.time(),
+            "lagMs": round(stalled * 1000, 3),
+            "task": task.get_name() if task else None,
+            "coroutine": getattr(task.get_coro(), "__qualname__", None) if task else None,
+            "where": _describe_stack(frame) if frame is not None else [],
+            "beat": beat,
+        }
+
+    def summary(self) -> dict:
+        return summarize_ms(self._lags)
+
+    def recent_spikes(self) -> list[dict]:
+        return [{k: v for k, v in s.items() if k != "beat"} for s in self.spikes]
+
+    def is_lagging(self) -> bool:
+        """True when the 95th percentile of recent lag exceeds the threshold."""
+        return self.summary()["p95"] > self.threshold * 1000
+
+
+# Module-level singleton started by main.lifespan
+loop_monitor = LoopLagMonitor()
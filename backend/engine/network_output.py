@@ -0,0 +1,234 @@
+"""Shared packetization for network pixel output (sACN, Art-Net, DDP).
+
+A protocol driver describes how one channel is split into datagrams; this
+module does everything else. Each datagram is built once, the first time its
+channel is sent, and reused on every frame: a frame converts each channel's
+pixels to bytes in one pass, copies slices of them into the prebuilt packets,
+stamps sequence numbers and sends the whole frame back to back from one
+non-blocking socket. Drivers that support it then send sync packets, so every
+controller shows the frame at the same moment instead of as its data arrives.
+"""
+from __future__ import annotations
+
+import logging
+import socket
+from abc import abstractmethod
+from dataclasses import dataclass
+from itertools import chain
+
+from engine.hardware import COLOR_ORDER_MAP, HardwareDriver
+
+logger = logging.getLogger(__name__)
+
+# RGB pixels in one DMX universe (510 of its 512 slots)
+PIXELS_PER_UNIVERSE = 170
+
+
+def pixel_bytes(pixels: list[tuple[int, int, int]], color_order: str) -> bytes | bytearray:
+    """Pixels as 3 bytes each in the strip's color order (W is not sent).
+
+    Reordering swaps whole byte planes with slice assignment rather than
+    rebuilding each pixel.
+    """
+    data = bytes(chain.from_iterable(pixels))
+    order = COLOR_ORDER_MAP.get(color_order, [0, 1, 2])
+    if order == [0, 1, 2]:
+        return data
+    out = bytearray(len(data))
+    for i, source in enumerate(order):
+        out[i::3] = data[source::3]
+    return out
+
+
+@dataclass(slots=True)
+class Packet:
+    """A prebuilt datagram and the slice of channel bytes it carries."""
+
+    address: tuple[str, int]
+    buffer: bytearray
+    # Where pixel bytes go in ``buffer``, and which bytes of the channel
+    data_offset: int = 0
+    first_byte: int = 0
+    byte_count: int = 0
+    # Offset of the sequence number in ``buffer``, if the protocol has one
+    sequence_offset: int | None = None
+    sequence: int = 0
+
+
+def distinct_addresses(packets: list[Packet]) -> list[tuple[str, int]]:
+    """The destinations of ``packets``, in first-seen order."""
+    return list(dict.fromkeys(p.address for p in packets))
+
+
+class NetworkDriver(HardwareDriver):
+    """Base class for drivers that send frames as UDP datagrams.
+
+    Subclasses implement ``_build_packets`` and, as needed,
+    ``_next_sequence``, ``_build_sync`` and ``_terminate``. DMX-universe
+    protocols derive from ``UniverseDriver`` instead.
+    """
+
+    protocol = "network"
+
+    def __init__(self, port: int, sync: bool = False) -> None:
+        self._port = port
+        self._sync_enabled = sync
+        self._sock: socket.socket | None = None
+        # channel id -> (led count, its packets)
+        self._layouts: dict[str, tuple[int, list[Packet]]] = {}
+        self._sync: list[Packet] | None = None
+        self._unmapped: set[str] = set()
+        self._send_failing = False
+        self.packets_sent = 0
+        self.send_errors = 0
+
+    # ── Protocol hooks ─────────────────────────────────────────────────────────
+
+    @abstractmethod
+    def _build_packets(self, channel) -> list[Packet] | None:
+        """The packets for one channel, or None if it has no destination."""
+
+    def _next_sequence(self, sequence: int) -> int:
+        return (sequence + 1) & 0xFF
+
+    def _build_sync(self, packets: list[Packet]) -> list[Packet]:
+        """Sync packets for a frame made of ``packets``; none by default."""
+        return []
+
+    def _terminate(self, packets: list[Packet]) -> None:
+        """Tell receivers the stream is ending; nothing by default."""
+
+    # ── Sending ────────────────────────────────────────────────────────────────
+
+    def _socket(self) -> socket.socket:
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            self._sock.setblocking(False)
+        return self._sock
+
+    def _layout(self, channel) -> list[Packet]:
+        """The packets a channel is sent in, built on first use."""
+        cached = self._layouts.get(channel.id)
+        if cached is not None and cached[0] == channel.ledCount:
+            return cached[1]
+        packets = self._build_packets(channel)
+        if packets is None:
+            if channel.id not in self._unmapped:
+                self._unmapped.add(channel.id)
+                logger.warning(
+                    "No %s destination for channel %s; it is not sent", self.protocol, channel.id
+                )
+            return []
+        self._layouts[channel.id] = (channel.ledCount, packets)
+        self._sync = None
+        return packets
+
+    def _all_packets(self) -> list[Packet]:
+        return [p for _, packets in self._layouts.values() for p in packets]
+
+    def _send(self, packets: list[Packet]) -> None:
+        sock = self._socket()
+        for p in packets:
+            if p.sequence_offset is not None:
+                p.sequence = self._next_sequence(p.sequence)
+                p.buffer[p.sequence_offset] = p.sequence
+            try:
+                sock.sendto(p.buffer, p.address)
+            except OSError as e:
+                # A full send buffer or unreachable network must not stop the
+                # frame loop; log once until sending works again
+                self.send_errors += 1
+                if not self._send_failing:
+                    self._send_failing = True
+                    logger.warning("%s send to %s failed: %s", self.protocol, p.address[0], e)
+                continue
+            self.packets_sent += 1
+            self._send_failing = False
+
+    def write_frame(self, channels: list, buffers: dict[str, list[tuple[int, int, int]]]) -> None:
+        """Fill every packet of the frame, send them together, then sync."""
+        batch: list[Packet] = []
+        for ch in channels:
+            packets = self._layout(ch)
+            if not packets:
+                continue
+            data = memoryview(pixel_bytes(buffers[ch.id], ch.colorOrder))
+            for p in packets:
+                chunk = data[p.first_byte : p.first_byte + p.byte_count]
+                p.buffer[p.data_offset : p.data_offset + len(chunk)] = chunk
+            batch.extend(packets)
+        if not batch:
+            return
+        self._send(batch)
+        if self._sync_enabled:
+            if self._sync is None:
+                self._sync = self._build_sync(self._all_packets())
+            self._send(self._sync)
+
+    def close(self) -> None:
+        """Release the socket; the driver opens a new one if used again."""
+        if self._sock is None:
+            return
+        self._terminate(self._all_packets())
+        self._sock.close()
+        self._sock = None
+
+
+class UniverseDriver(NetworkDriver):
+    """Base class for protocols that carry DMX universes (sACN, Art-Net).
+
+    Each channel is sent as a run of consecutive universes from its first
+    universe in ``universes``, 170 RGB pixels per universe; pixels are never
+    split across universes, matching what pixel controllers expect. Channels
+    without an entry are not sent. Subclasses set the universe range and
+    packet layout and implement ``_build_universe``.
+    """
+
+    min_universe = 0
+    max_universe = 0
+    header_size = 0
+    sequence_offset: int | None = None
+
+    def __init__(self, universes: dict[str, int], port: int, sync: bool = False) -> None:
+        for channel_id, universe in universes.items():
+            if not self.min_universe <= universe <= self.max_universe:
+                raise ValueError(
+                    f"Channel '{channel_id}': universe {universe} is not "
+                    f"{self.min_universe}-{self.max_universe}"
+                )
+        super().__init__(port, sync)
+        self._universes = dict(universes)
+
+    @abstractmethod
+    def _build_universe(
+        self, universe: int, slot_count: int
+    ) -> tuple[tuple[str, int], bytearray]:
+        """The destination and zeroed data packet for one universe."""
+
+    def _build_packets(self, channel) -> list[Packet] | None:
+        first = self._universes.get(channel.id)
+        if first is None:
+            return None
+        packets = []
+        for start in range(0, channel.ledCount, PIXELS_PER_UNIVERSE):
+            number = first + start // PIXELS_PER_UNIVERSE
+            if number > self.max_universe:
+                logger.warning(
+                    "Channel %s runs past universe %d; pixels from %d on are not sent",
+                    channel.id, self.max_universe, start,
+                )
+                break
+            count = min(PIXELS_PER_UNIVERSE, channel.ledCount - start)
+            address, buffer = self._build_universe(number, count * 3)
+            packets.append(
+                Packet(
+                    address=address,
+                    buffer=buffer,
+                    data_offset=self.header_size,
+                    first_byte=start * 3,
+                    byte_count=count * 3,
+                    sequence_offset=self.sequence_offset,
+                )
+            )
+        return packets
@@ -0,0 +1,80 @@
+"""CPU pinning and real-time scheduling for the render path.
+
+Every step is best-effort: the OS may refuse (no CAP_SYS_NICE, not Linux, CPU
+out of range) and the engine must still run. ``apply_realtime`` returns a
+report of what was requested and what actually took effect.
+"""
+from __future__ import annotations
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def apply_realtime(
+    cpu: int | None = None,
+    rt_priority: int = 0,
+    nice: int = 0,
+) -> dict[str, str]:
+    """Apply settings to the calling thread (and threads it creates later).
+
+    - ``cpu``: pin to this core with ``sched_setaffinity``.
+    - ``rt_priority``: if > 0, switch to ``SCHED_FIFO`` at this priority.
+    - ``nice``: if != 0, adjust the nice value (ignored under ``SCHED_FIFO``).
+    """
+    report: dict[str, str] = {}
+
+    if cpu is not None:
+        try:
+            os.sched_setaffinity(0, {cpu})
+            report["cpuAffinity"] = f"pinned to CPU {cpu}"
+        except (AttributeError, OSError, ValueError) as e:
+            report["cpuAffinity"] = f"failed: {e}"
+
+    if rt_priority > 0:
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(rt_priority))
+            report["scheduler"] = f"SCHED_FIFO priority {rt_priority}"
+        except (AttributeError, OSError, ValueError) as e:
+            report["scheduler"] = f"failed: {e}"
+
+    if nice != 0:
+        try:
+            value = os.nice(nice)
+            report["nice"] = f"nice {value}"
+        except (AttributeError, OSError) as e:
+            report["nice"] = f"failed: {e}"
+
+    return report
+
+
+def shared_thread_settings(realtime: dict) -> dict:
+    """Reduce ``apply_realtime`` settings to those safe on a shared thread.
+
+    Threads inherit affinity and scheduling policy from their creator, so
+    pinning or ``SCHED_FIFO`` on the event loop thread would carry over to
+    every worker started after it (the storage executor, the write-behind
+    thread, the sync route threadpool). Only ``nice`` is kept; CPU pinning
+    and real-time priority need the dedicated render process.
+    """
+    dropped = []
+    if realtime.get("cpu") is not None:
+        dropped.append("cpu")
+    if realtime.get("rt_priority", 0) > 0:
+        dropped.append("rt_priority")
+    if dropped:
+        logger.warning(
+            "Real-time scheduling: %s ignored outside a render process",
+            ", ".join(dropped),
+        )
+    return {"nice": realtime.get("nice", 0)}
+
+
+def log_report(report: dict[str, str], where: str) -> None:
+    if not report:
+        logger.info("Real-time scheduling (%s): not configured", where)
+        return
+    for key, outcome in report.items():
+        level = logging.WARNING if outcome.startswith("failed") else logging.INFO
+        logger.log(level, "Real-time scheduling (%s): %s %s", where, key, outcome)
@@ -0,0 +1,661 @@
+"""Live rendering in a dedicated process.
+
+The web process keeps the HTTP/WebSocket side; a child process owns the frame
+loop and hardware output. Commands travel over a ``multiprocessing`` pipe and
+rendered frames come back through a shared-memory ring buffer, so a slow
+request handler in the web process can delay broadcasts but never the LEDs.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing as mp
+import struct
+import time
+from itertools import chain
+from multiprocessing import shared_memory
+from pathlib import Path
+
+from engine.compiled import CompiledPlay, CompiledPlayError, load_compiled
+from engine.gc_control import ShowModeGC
+from engine.realtime import apply_realtime, log_report
+from engine.session import (
+    _build_cue_table,
+    _changed_regions,
+    _compile_cue,
+    _grid_elapsed,
+    _patch_plan,
+    _render_plan,
+    _until_grid_tick,
+)
+from engine.stats import FrameStats
+from models import Channel, Play
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("<Q")        # sequence number of the newest frame
+_SLOT_HEADER = struct.Struct("<Qd")  # frame sequence, wall-clock timestamp
+
+
+# ── Shared-memory frame ring ───────────────────────────────────────────────────
+
+
+class FrameRing:
+    """Fixed-size ring of RGB frames in shared memory.
+
+    One writer (the render process) and any number of readers. Each slot holds
+    a sequence number, a timestamp and the packed RGB bytes of every channel
+    laid out back to back in ``layout`` order. Sequence numbers start at 1;
+    0 means nothing has been written yet.
+    """
+
+    def __init__(
+        self,
+        layout: list[tuple[str, int]],
+        slots: int = 4,
+        name: str | None = None,
+    ) -> None:
+        self.layout = layout
+        self.slots = slots
+        self._frame_bytes = sum(count for _, count in layout) * 3
+        self._slot_size = _SLOT_HEADER.size + self._frame_bytes
+        size = _HEADER.size + self._slot_size * slots
+        self._owner = name is None
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            _HEADER.pack_into(self._shm.buf, 0, 0)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._seq = 0
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def _slot_offset(self, seq: int) -> int:
+        return _HEADER.size + (seq % self.slots) * self._slot_size
+
+    def latest_seq(self) -> int:
+        return _HEADER.unpack_from(self._shm.buf, 0)[0]
+
+    def write(self, buffers: dict[str, list[tuple[int, int, int]]], timestamp: float) -> int:
+        self._seq += 1
+        offset = self._slot_offset(self._seq)
+        data = bytes(
+            chain.from_iterable(chain.from_iterable(buffers[ch_id] for ch_id, _ in self.layout))
+        )
+        start = offset + _SLOT_HEADER.size
+        self._shm.buf[start : start + len(data)] = data
+        _SLOT_HEADER.pack_into(self._shm.buf, offset, self._seq, timestamp)
+        # Publishing the sequence last makes the slot visible to readers
+        _HEADER.pack_into(self._shm.buf, 0, self._seq)
+        return self._seq
+
+    def read(self, after_seq: int = 0) -> tuple[int, float, dict[str, bytes]] | None:
+        """Return ``(seq, timestamp, {channel_id: rgb_bytes})`` for the newest
+        frame, or ``None`` if there is nothing newer than ``after_seq``."""
+        seq = self.latest_seq()
+        if seq == 0 or seq <= after_seq:
+            return None
+        offset = self._slot_offset(seq)
+        slot_seq, timestamp = _SLOT_HEADER.unpack_from(self._shm.buf, offset)
+        start = offset + _SLOT_HEADER.size
+        data = bytes(self._shm.buf[start : start + self._frame_bytes])
+        # The writer lapped the ring while we were copying — drop this read
+        if slot_seq != seq or self.latest_seq() - seq >= self.slots - 1:
+            return None
+        channels = {}
+        pos = 0
+        for ch_id, count in self.layout:
+            channels[ch_id] = data[pos : pos + count * 3]
+            pos += count * 3
+        return seq, timestamp, channels
+
+    def close(self) -> None:
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _rgb_bytes_to_hex(data: bytes) -> list[str]:
+    h = data.hex()
+    return ["#" + h[i : i + 6] for i in range(0, len(h), 6)]
+
+
+# ── Render process ─────────────────────────────────────────────────────────────
+
+
+class _RenderLoop:
+    """Cue state and frame loop as run inside the render process."""
+
+    def __init__(
+        self,
+        play: Play,
+        channels: list[Channel],
+        fps: int,
+        compiled: CompiledPlay | None = None,
+    ) -> None:
+        self.play = play
+        self.channels = channels
+        self.compiled = compiled
+        self.frame_interval = 1.0 / fps
+        self.table = compiled.table if compiled else _build_cue_table(play)
+        self.cue_index = 0
+        self.is_blackout = False
+        self.plan = _compile_cue(play, channels, 0, self.table[0], compiled)
+        self.cue_start = time.monotonic()
+        self.next_plan = None
+        self.stats = FrameStats(fps)
+        self.realtime_report: dict[str, str] = {}
+
+    def enter_cue(self, cue_index: int) -> None:
+        self.cue_index = cue_index
+        self.is_blackout = False
+        if self.next_plan is not None and self.next_plan.cue_index == cue_index:
+            self.plan = self.next_plan
+        else:
+            self.plan = _compile_cue(
+                self.play, self.channels, cue_index, self.table[cue_index], self.compiled
+            )
+        self.next_plan = None
+        self.cue_start = time.monotonic()
+
+    def prepare_next(self) -> None:
+        """Compile the following cue; called from frame slack time."""
+        nxt = self.cue_index + 1
+        if self.next_plan is None and nxt < len(self.play.cues):
+            self.next_plan = _compile_cue(
+                self.play, self.channels, nxt, self.table[nxt], self.compiled
+            )
+
+    def reload(self, play: Play) -> None:
+        table = _build_cue_table(play)
+        current_id = self.play.cues[self.cue_index].id
+        cue_index = next(
+            (i for i, c in enumerate(play.cues) if c.id == current_id),
+            min(self.cue_index, len(play.cues) - 1),
+        )
+        self.plan = _patch_plan(
+            self.plan,
+            play,
+            self.channels,
+            cue_index,
+            self.table[self.cue_index],
+            table[cue_index],
+            _changed_regions(self.play, play),
+        )
+        self.play = play
+        self.compiled = None
+        self.table = table
+        self.cue_index = cue_index
+        self.next_plan = None
+
+    def handle(self, cmd: str, arg) -> dict:
+        if cmd == "next":
+            if self.cue_index < len(self.play.cues) - 1:
+                self.enter_cue(self.cue_index + 1)
+        elif cmd == "back":
+            if self.cue_index > 0:
+                self.enter_cue(self.cue_index - 1)
+        elif cmd == "goto":
+            if not 0 <= arg < len(self.play.cues):
+                return {"error": "index", "message": f"cue index {arg} out of range"}
+            self.enter_cue(arg)
+        elif cmd == "blackout":
+            self.is_blackout = True
+        elif cmd == "reload":
+            self.reload(Play.model_validate(arg))
+        elif cmd == "stats":
+            return {**self.state(), "stats": self.stats.snapshot()}
+        return self.state()
+
+    def state(self) -> dict:
+        return {
+            "cueIndex": self.cue_index,
+            "isBlackout": self.is_blackout,
+            "nextCueReady": self.next_plan is not None,
+            # CLOCK_MONOTONIC is system-wide, so this is valid in the web process
+            "cueStart": self.cue_start,
+        }
+
+
+def _render_main(
+    conn,
+    ring_name: str,
+    layout: list[tuple[str, int]],
+    play_data: dict | str,
+    channels_data: list[dict],
+    fps: int,
+    hardware_mode: str | None,
+    hardware_options: dict,
+    realtime: dict,
+    show_mode: bool,
+    align_frames: bool = False,
+) -> None:
+    """Entry point of the render process.
+
+    ``play_data`` is a dumped play, or the path of its compiled play file.
+    ``align_frames`` renders on each cue's 1/fps grid, as cluster nodes do.
+    """
+    from engine.hardware import create_hardware
+
+    realtime_report = apply_realtime(**realtime)
+    compiled = None
+    ring = None
+    hardware = None
+    try:
+        if isinstance(play_data, str):
+            try:
+                compiled = load_compiled(Path(play_data))
+            except (OSError, CompiledPlayError) as e:
+                # The web process retries with the play itself
+                conn.send({"error": str(e), "compiled": True})
+                conn.close()
+                return
+            play = compiled.play
+        else:
+            play = Play.model_validate(play_data)
+        channels = [Channel.model_validate(c) for c in channels_data]
+        ring = FrameRing(layout, name=ring_name)
+        hardware = (
+            create_hardware(hardware_mode == "mock", hardware_mode, hardware_options)
+            if hardware_mode
+            else None
+        )
+        loop = _RenderLoop(play, channels, fps, compiled)
+    except Exception as e:
+        # Tell the web process why instead of dying with the pipe open
+        logger.exception("Render process failed to start")
+        conn.send({"error": str(e)})
+        if hardware:
+            hardware.close()
+        if ring is not None:
+            ring.close()
+        conn.close()
+        return
+    black = {ch.id: [(0, 0, 0)] * ch.ledCount for ch in channels}
+    gc_control = ShowModeGC(show_mode, loop.stats)
+    gc_control.enter()
+    conn.send({**loop.state(), "realtime": realtime_report})
+
+    try:
+        running = True
+        while running:
+            t0 = time.monotonic()
+            while conn.poll():
+                cmd, arg = conn.recv()
+                if cmd == "stop":
+                    running = False
+                    break
+                try:
+                    reply = loop.handle(cmd, arg)
+                except Exception as e:
+                    # A bad command must not take the show down with it
+                    logger.exception("Render process command %r failed", cmd)
+                    reply = {"error": "failed", "message": str(e)}
+                conn.send(reply)
+            if not running:
+                break
+
+            try:
+                if loop.is_blackout:
+                    buffers = black
+                else:
+                    elapsed = t0 - loop.cue_start
+                    if align_frames:
+                        elapsed = _grid_elapsed(elapsed, loop.frame_interval)
+                    buffers = _render_plan(loop.plan, channels, elapsed)
+                ring.write(buffers, time.time())
+                if hardware:
+                    hardware.write_frame(channels, buffers)
+            except Exception as e:
+                # Stop as the in-process frame loop does, and tell the web
+                # process why before the pipe closes
+                logger.exception("Render process frame error")
+                conn.send({"fatal": str(e)})
+                break
+
+            loop.stats.record(t0, time.monotonic() - t0)
+            loop.prepare_next()
+            gc_control.collect_in_slack(loop.frame_interval - (time.monotonic() - t0))
+            if align_frames:
+                # Wake on the next tick of the cue's grid, as LiveSession does
+                wait = _until_grid_tick(time.monotonic() - loop.cue_start, loop.frame_interval)
+            else:
+                wait = loop.frame_interval - (time.monotonic() - t0)
+            # Wake early for commands instead of sleeping through them
+            conn.poll(max(0.0, wait))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        gc_control.exit()
+        if hardware:
+            hardware.all_off(channels)
+            hardware.close()
+        ring.close()
+        conn.close()
+
+
+# ── Web-process proxy ──────────────────────────────────────────────────────────
+
+
+class RenderProcessExited(RuntimeError):
+    """The render process is gone: it stopped on a frame error or died."""
+
+
+class ProcessLiveSession:
+    """Drop-in replacement for LiveSession that renders in a child process.
+
+    ``hardware_mode`` is ``"mock"`` or a ``create_hardware`` output
+    (``"ws281x"``, ``"sacn"``) with ``hardware_options``; the child creates its
+    own driver so GPIO and sockets are only ever used from the render process. ``realtime``
+    holds keyword arguments for apply_realtime(), applied inside the child;
+    ``show_mode`` enables ShowModeGC there.
+    """
+
+    def __init__(
+        self,
+        hardware_mode: str = "mock",
+        hardware_options: dict | None = None,
+        ring_slots: int = 4,
+        realtime: dict | None = None,
+        show_mode: bool = False,
+    ) -> None:
+        self.is_running: bool = False
+        self.play_id: str | None = None
+        self.cue_index: int = 0
+        self.is_blackout: bool = False
+        self.next_cue_ready: bool = False
+        self.cue_started_at: float = 0.0
+        self._hardware_mode = hardware_mode
+        self._hardware_options = hardware_options or {}
+        self._ring_slots = ring_slots
+        self._realtime = realtime or {}
+        self.show_mode = show_mode
+        # Render on each cue's 1/fps grid, as cluster nodes do; set at startup
+        self.align_frames: bool = False
+        self.realtime_report: dict[str, str] = {}
+        self._play: Play | None = None
+        self._channels: list[Channel] = []
+        self._proc = None
+        self._conn = None
+        self._ring: FrameRing | None = None
+        self._pump: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        # Read once from the dead process's pipe, for the pump and get_stats
+        self._exit_error: str | None = None
+
+    @property
+    def play(self) -> Play | None:
+        return self._play
+
+    def status(self):
+        from models import LiveStatus
+
+        if not self.is_running or self._play is None:
+            return LiveStatus(
+                isRunning=False,
+                playId=None,
+                cueId=None,
+                cueName=None,
+                cueIndex=None,
+                isBlackout=False,
+            )
+        cue = self._play.cues[self.cue_index]
+        return LiveStatus(
+            isRunning=True,
+            playId=self.play_id,
+            cueId=cue.id,
+            cueName=cue.name,
+            cueIndex=self.cue_index,
+            isBlackout=self.is_blackout,
+            nextCueReady=self.next_cue_ready,
+        )
+
+    def _status_message(self) -> dict:
+        s = self.status()
+        return {
+            "type": "status",
+            "playId": s.playId,
+            "cueId": s.cueId,
+            "cueName": s.cueName,
+            "cueIndex": s.cueIndex,
+            "isRunning": s.isRunning,
+            "isBlackout": s.isBlackout,
+            "nextCueReady": s.nextCueReady,
+        }
+
+    def _apply(self, state: dict) -> None:
+        self.cue_index = state["cueIndex"]
+        self.is_blackout = state["isBlackout"]
+        self.next_cue_ready = state["nextCueReady"]
+        self.cue_started_at = state["cueStart"]
+
+    async def _call(self, cmd: str, arg=None) -> dict:
+        """Send a command and return the render process's reply.
+
+        Raises RuntimeError if the command failed in the render process, and
+        RenderProcessExited if the process has exited. A rejected ``goto`` is
+        returned as an error.
+        """
+        async with self._lock:
+            try:
+                self._conn.send((cmd, arg))
+                state = await asyncio.to_thread(self._conn.recv)
+            except (EOFError, OSError):
+                raise RenderProcessExited("Render process exited unexpectedly.")
+        if "fatal" in state:
+            self._exit_error = f"Render process stopped: {state['fatal']}"
+            raise RenderProcessExited(self._exit_error)
+        if state.get("error") == "failed":
+            raise RuntimeError(f"Render process could not {cmd}: {state['message']}")
+        if "error" not in state:
+            self._apply(state)
+        return state
+
+    async def _exit_reason(self) -> str:
+        """Why the render process exited, if it said so before closing the pipe."""
+        async with self._lock:
+            if self._exit_error is None:
+                self._exit_error = "Render process exited unexpectedly."
+                try:
+                    while self._conn.poll():
+                        message = self._conn.recv()
+                        if "fatal" in message:
+                            self._exit_error = f"Render process stopped: {message['fatal']}"
+                            break
+                except (EOFError, OSError):
+                    pass
+        return self._exit_error
+
+    async def start(
+        self,
+        play: Play,
+        channels: list[Channel],
+        fps: int,
+        broadcaster,
+        hardware,
+        compiled: CompiledPlay | None = None,
+    ) -> None:
+        """Start the render process.
+
+        With a ``compiled`` play backed by a file, the child maps that file
+        instead of receiving and revalidating the whole play.
+        """
+        if hardware:
+            # Release PWM/DMA in this process so the render process can claim it
+            hardware.close()
+        layout = [(ch.id, ch.ledCount) for ch in channels]
+        self._ring = FrameRing(layout, slots=self._ring_slots)
+        self._exit_error = None
+        try:
+            ready = None
+            if compiled is not None and compiled.path is not None:
+                ready = await self._spawn(str(compiled.path), layout, channels, fps, hardware)
+                if ready.get("compiled"):
+                    # Replaced by a newer save since it was loaded; send the play itself
+                    logger.warning(
+                        "Render process could not load compiled play: %s", ready["error"]
+                    )
+                    await self._reap()
+                    ready = None
+            if ready is None:
+                ready = await self._spawn(play.model_dump(), layout, channels, fps, hardware)
+        except (EOFError, OSError):
+            ready = {"error": "exited unexpectedly"}
+        if "error" in ready:
+            await self._reap()
+            self._ring.close()
+            self._ring = None
+            raise RuntimeError(f"Render process failed to start: {ready['error']}")
+        self._apply(ready)
+        self.realtime_report = ready["realtime"]
+        log_report(self.realtime_report, "render process")
+
+        self.is_running = True
+        self.play_id = play.id
+        self._play = play
+        self._channels = channels
+        await broadcaster.broadcast(self._status_message())
+        self._pump = asyncio.create_task(self._pump_frames(fps, broadcaster))
+
+    async def _spawn(
+        self,
+        play_data: dict | str,
+        layout: list[tuple[str, int]],
+        channels: list[Channel],
+        fps: int,
+        hardware,
+    ) -> dict:
+        ctx = mp.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._proc = ctx.Process(
+            target=_render_main,
+            args=(
+                child_conn,
+                self._ring.name,
+                layout,
+                play_data,
+                [c.model_dump() for c in channels],
+                fps,
+                self._hardware_mode if hardware else None,
+                self._hardware_options,
+                self._realtime,
+                self.show_mode,
+                self.align_frames,
+            ),
+            name="pilites-render",
+            daemon=True,
+        )
+        self._proc.start()
+        child_conn.close()
+        return await asyncio.to_thread(self._conn.recv)
+
+    async def _reap(self) -> None:
+        """Wait for the render process to exit, then drop it and its pipe."""
+        if self._proc is None:
+            return
+        await asyncio.to_thread(self._proc.join, 5.0)
+        if self._proc.is_alive():
+            self._proc.terminate()
+        self._conn.close()
+        self._proc = None
+        self._conn = None
+
+    async def stop(self, broadcaster, hardware) -> None:
+        if self._pump and not self._pump.done():
+            self._pump.cancel()
+            try:
+                await self._pump
+            except asyncio.CancelledError:
+                pass
+        self._pump = None
+        if self._proc is not None:
+            try:
+                self._conn.send(("stop", None))
+            except (BrokenPipeError, OSError):
+                pass
+            await self._reap()
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+        self.is_running = False
+        await broadcaster.broadcast(self._status_message())
+
+    async def advance(self, broadcaster) -> None:
+        if not self.is_running:
+            return
+        await self._call("next")
+        await broadcaster.broadcast(self._status_message())
+
+    async def back(self, broadcaster) -> None:
+        if not self.is_running:
+            return
+        await self._call("back")
+        await broadcaster.broadcast(self._status_message())
+
+    async def goto(self, cue_index: int, broadcaster) -> None:
+        if not self.is_running:
+            return
+        if "error" in await self._call("goto", cue_index):
+            raise IndexError(f"cue index {cue_index} out of range")
+        await broadcaster.broadcast(self._status_message())
+
+    async def blackout(self, broadcaster) -> None:
+        await self._call("blackout")
+        await broadcaster.broadcast(self._status_message())
+
+    async def get_stats(self) -> dict:
+        base = {"showMode": self.show_mode, "realtime": self.realtime_report}
+        if not self.is_running:
+            return {"isRunning": False, **base}
+        # The pump notices a dead render process within a frame; until then
+        # report it here rather than failing the request
+        if not self._proc.is_alive():
+            return {"isRunning": False, **base, "error": await self._exit_reason()}
+        try:
+            state = await self._call("stats")
+        except RenderProcessExited:
+            return {"isRunning": False, **base, "error": await self._exit_reason()}
+        return {"isRunning": True, **base, **state["stats"]}
+
+    async def reload(self, play: Play, broadcaster) -> None:
+        if not self.is_running:
+            return
+        if not play.cues:
+            raise ValueError("Play has no cues.")
+        await self._call("reload", play.model_dump())
+        self._play = play
+        await broadcaster.broadcast(self._status_message())
+
+    async def _pump_frames(self, fps: int, broadcaster) -> None:
+        """Read new frames from the ring and broadcast them to WebSocket clients."""
+        interval = 1.0 / fps
+        last_seq = 0
+        try:
+            while self.is_running:
+                if not self._proc.is_alive():
+                    raise RuntimeError(await self._exit_reason())
+                latest = self._ring.read(last_seq)
+                if latest is not None:
+                    last_seq, timestamp, channels = latest
+                    await broadcaster.broadcast(
+                        {
+                            "type": "frame",
+                            "timestamp": timestamp,
+                            "channels": {
+                                ch_id: _rgb_bytes_to_hex(data)
+                                for ch_id, data in channels.items()
+                            },
+                        }
+                    )
+                await asyncio.sleep(interval)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.exception("Live frame pump error")
+            await broadcaster.broadcast({"type": "error", "message": str(e)})
+            self.is_running = False
@@ -0,0 +1,168 @@
+"""sACN (ANSI E1.31) network output.
+
+Each channel is sent as a run of consecutive DMX universes (see
+``UniverseDriver``), from a channel id -> first universe mapping.
+
+Packets go to ``host`` by unicast, or without one to each universe's multicast
+group (239.255.<universe high byte>.<universe low byte>). With a
+``sync_universe``, receivers hold each frame until the synchronization packet
+that follows it (E1.31 section 6.3).
+"""
+from __future__ import annotations
+
+import struct
+import uuid
+
+from engine.network_output import Packet, UniverseDriver
+
+SACN_PORT = 5568
+MAX_UNIVERSE = 63999
+
+_ACN_PACKET_ID = b"ASC-E1.17\x00\x00\x00"
+_VECTOR_ROOT_E131_DATA = 0x00000004
+_VECTOR_ROOT_E131_EXTENDED = 0x00000008
+_VECTOR_E131_DATA_PACKET = 0x00000002
+_VECTOR_E131_EXTENDED_SYNCHRONIZATION = 0x00000001
+_VECTOR_DMP_SET_PROPERTY = 0x02
+_OPTION_STREAM_TERMINATED = 0x40
+
+# Root, framing and DMP layers up to and including the DMX start code
+HEADER_SIZE = 126
+_SEQUENCE_OFFSET = 111
+_OPTIONS_OFFSET = 112
+SYNC_PACKET_SIZE = 49
+_SYNC_SEQUENCE_OFFSET = 44
+
+# The stream-terminated packet is sent this many times on close (E1.31 6.2.6)
+_TERMINATE_REPEATS = 3
+
+
+def _pack_root(packet: bytearray, vector: int, cid: bytes) -> None:
+    struct.pack_into(
+        "!HH12sHI16s", packet, 0,
+        0x0010,                          # preamble size
+        0x0000,                          # post-amble size
+        _ACN_PACKET_ID,
+        0x7000 | (len(packet) - 16),     # root layer flags and length
+        vector,
+        cid,
+    )
+
+
+def build_packet(
+    cid: bytes,
+    source_name: str,
+    priority: int,
+    universe: int,
+    slot_count: int,
+    sync_universe: int = 0,
+) -> bytearray:
+    """An E1.31 data packet for ``slot_count`` DMX slots, all zero, sequence 0."""
+    length = HEADER_SIZE + slot_count
+    name = source_name.encode("utf-8")[:63].ljust(64, b"\x00")
+    packet = bytearray(length)
+    _pack_root(packet, _VECTOR_ROOT_E131_DATA, cid)
+    struct.pack_into(
+        "!HI64sBHBBH", packet, 38,
+        0x7000 | (length - 38),          # framing layer flags and length
+        _VECTOR_E131_DATA_PACKET,
+        name,
+        priority,
+        sync_universe,                   # synchronization address
+        0,                               # sequence number
+        0,                               # options
+        universe,
+    )
+    struct.pack_into(
+        "!HBBHHHB", packet, 115,
+        0x7000 | (length - 115),         # DMP layer flags and length
+        _VECTOR_DMP_SET_PROPERTY,
+        0xA1,                            # address and data type
+        0x0000,                          # first property address
+        0x0001,                          # address increment
+        slot_count + 1,                  # property value count, with start code
+        0x00,                            # DMX start code
+    )
+    return packet
+
+
+def build_sync_packet(cid: bytes, sync_universe: int) -> bytearray:
+    """An E1.31 synchronization packet for ``sync_universe``, sequence 0."""
+    packet = bytearray(SYNC_PACKET_SIZE)
+    _pack_root(packet, _VECTOR_ROOT_E131_EXTENDED, cid)
+    struct.pack_into(
+        "!HIBHH", packet, 38,
+        0x7000 | (SYNC_PACKET_SIZE - 38),  # framing layer flags and length
+        _VECTOR_E131_EXTENDED_SYNCHRONIZATION,
+        0,                                 # sequence number
+        sync_universe,
+        0,                                 # reserved
+    )
+    return packet
+
+
+def multicast_group(universe: int) -> str:
+    return f"239.255.{universe >> 8}.{universe & 0xFF}"
+
+
+class SacnDriver(UniverseDriver):
+    """Send channel buffers as E1.31 universes over UDP.
+
+    ``universes`` maps channel ids to their first universe. ``host`` sends
+    every universe to one controller by unicast; without it each universe goes
+    to its multicast group. A nonzero ``sync_universe`` must not carry data.
+    """
+
+    protocol = "sACN"
+    min_universe = 1
+    max_universe = MAX_UNIVERSE
+    header_size = HEADER_SIZE
+    sequence_offset = _SEQUENCE_OFFSET
+
+    def __init__(
+        self,
+        universes: dict[str, int],
+        host: str | None = None,
+        port: int = SACN_PORT,
+        priority: int = 100,
+        source_name: str = "PiLites",
+        sync_universe: int = 0,
+    ) -> None:
+        if not 0 <= priority <= 200:
+            raise ValueError(f"sACN priority {priority} is not 0-200")
+        if not 0 <= sync_universe <= MAX_UNIVERSE:
+            raise ValueError(f"sACN sync universe {sync_universe} is not 0-{MAX_UNIVERSE}")
+        super().__init__(universes, port, sync=sync_universe > 0)
+        self._host = host
+        self._priority = priority
+        self._source_name = source_name
+        self._sync_universe = sync_universe
+        self._cid = uuid.uuid4().bytes
+
+    def _build_universe(
+        self, universe: int, slot_count: int
+    ) -> tuple[tuple[str, int], bytearray]:
+        packet = build_packet(
+            self._cid, self._source_name, self._priority, universe, slot_count,
+            self._sync_universe,
+        )
+        return (self._host or multicast_group(universe), self._port), packet
+
+    def _build_sync(self, packets: list[Packet]) -> list[Packet]:
+        address = (self._host or multicast_group(self._sync_universe), self._port)
+        return [
+            Packet(
+                address=address,
+                buffer=build_sync_packet(self._cid, self._sync_universe),
+                sequence_offset=_SYNC_SEQUENCE_OFFSET,
+            )
+        ]
+
+    def _terminate(self, packets: list[Packet]) -> None:
+        """Send stream-terminated packets so receivers stop holding the frame."""
+        for p in packets:
+            p.buffer[_OPTIONS_OFFSET] = _OPTION_STREAM_TERMINATED
+        for _ in range(_TERMINATE_REPEATS):
+            self._send(packets)
+        for p in packets:
+            p.buffer[_OPTIONS_OFFSET] = 0
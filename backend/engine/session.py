@@ -3,10 +3,14 @@ from __future__ import annotations
 import asyncio
 import logging
 import time
+from dataclasses import dataclass, field
 
-from models import Channel, Play
+from models import Channel, Effect, Play, Region
+from engine.compiled import CompiledPlay
 from engine.effects import render_effect
 from engine.effects.utils import rgb_to_hex
+from engine.gc_control import ShowModeGC
+from engine.stats import FrameStats
 
 logger = logging.getLogger(__name__)
 
@@ -20,54 +24,169 @@ def _resolve_effect(play: Play, from_cue_index: int, region_id: str):
     return None
 
 
-def _build_frame(
-    play: Play,
-    channels: list[Channel],
-    cue_index: int,
-    elapsed_sec: float,
-) -> dict:
-    # Initialize all-black channel buffers
-    buffers: dict[str, list[tuple[int, int, int]]] = {
-        ch.id: [(0, 0, 0)] * ch.ledCount for ch in channels
-    }
-
+@dataclass
+class _RegionPlan:
+    """A region's resolved effect plus the buffer slots its pixels land in."""
+
+    region_id: str
+    effect: Effect
+    channel_id: str
+    pixel_count: int
+    slots: list[tuple[int, int]]  # (pixel index, buffer index)
+
+
+@dataclass
+class _CuePlan:
+    cue_index: int
+    regions: list[_RegionPlan] = field(default_factory=list)
+
+
+def _region_slots(region: Region, led_count: int) -> list[tuple[int, int]]:
+    slots = []
+    px_idx = 0
+    for pr in region.ranges:
+        for buf_idx in range(pr.start, pr.end + 1):
+            if buf_idx < led_count:
+                slots.append((px_idx, buf_idx))
+            px_idx += 1
+    return slots
+
+
+def _build_cue_table(play: Play) -> list[dict[str, Effect]]:
+    """Resolve every cue's region → effect state in a single forward pass.
+
+    Equivalent to calling _resolve_effect for every tracking region of every
+    cue, but each cue only looks at the state of the cue before it.
+    """
+    table: list[dict[str, Effect]] = []
+    prev: dict[str, Effect] = {}
+    for cue in play.cues:
+        state: dict[str, Effect] = {}
+        for region_id, effect in cue.effectsByRegion.items():
+            if region_id not in cue.trackingRegions:
+                state[region_id] = effect
+        for region_id in cue.trackingRegions:
+            effect = prev.get(region_id)
+            if effect is not None:
+                state[region_id] = effect
+        table.append(state)
+        prev = state
+    return table
+
+
+def _cue_state(play: Play, cue_index: int) -> dict[str, Effect]:
+    """Resolve a single cue's state without building the whole table."""
     cue = play.cues[cue_index]
-    region_map = {r.id: r for r in play.regions}
-
-    # Process both owned effects and tracking regions
-    all_region_ids = set(cue.effectsByRegion.keys()) | set(cue.trackingRegions)
-
-    for region_id in all_region_ids:
-        # Resolve which effect to render
+    state: dict[str, Effect] = {}
+    for region_id in set(cue.effectsByRegion.keys()) | set(cue.trackingRegions):
         if region_id in cue.trackingRegions:
             if cue_index == 0:
                 continue  # first cue has nothing to track → black
             effect = _resolve_effect(play, cue_index - 1, region_id)
-            if effect is None:
-                continue  # chain resolved to black
         else:
             effect = cue.effectsByRegion.get(region_id)
-            if effect is None:
-                continue
+        if effect is not None:
+            state[region_id] = effect
+    return state
 
+
+def _compile_cue(
+    play: Play,
+    channels: list[Channel],
+    cue_index: int,
+    state: dict[str, Effect],
+    compiled: CompiledPlay | None = None,
+) -> _CuePlan:
+    """Precompute pixel slots for each region in a resolved cue state.
+
+    Slots come from ``compiled``'s pixel index table when it is of this play.
+    """
+    if compiled is not None and compiled.play is not play:
+        compiled = None
+    region_map = {r.id: r for r in play.regions}
+    led_counts = {ch.id: ch.ledCount for ch in channels}
+    plan = _CuePlan(cue_index=cue_index)
+
+    for region_id, effect in state.items():
         region = region_map.get(region_id)
         if region is None:
             continue
-        buf = buffers.get(region.channelId)
-        if buf is None:
+        led_count = led_counts.get(region.channelId)
+        if led_count is None:
             continue
 
-        pixel_count = sum(r.end - r.start + 1 for r in region.ranges)
-        pixels = render_effect(effect, elapsed_sec, pixel_count)
+        slots = compiled.region_slots(region_id, led_count) if compiled else None
+        plan.regions.append(
+            _RegionPlan(
+                region_id=region_id,
+                effect=effect,
+                channel_id=region.channelId,
+                pixel_count=sum(r.end - r.start + 1 for r in region.ranges),
+                slots=_region_slots(region, led_count) if slots is None else slots,
+            )
+        )
+    return plan
 
-        # Write pixels into buffer at the region's ranges
-        px_idx = 0
-        for pr in region.ranges:
-            for buf_idx in range(pr.start, pr.end + 1):
-                if px_idx < len(pixels):
-                    buf[buf_idx] = pixels[px_idx]
-                px_idx += 1
 
+def _changed_regions(old: Play, new: Play) -> set[str]:
+    """IDs of regions whose definition differs between two versions of a play."""
+    old_map = {r.id: r for r in old.regions}
+    new_map = {r.id: r for r in new.regions}
+    return {
+        rid
+        for rid in old_map.keys() | new_map.keys()
+        if old_map.get(rid) != new_map.get(rid)
+    }
+
+
+def _patch_plan(
+    plan: _CuePlan,
+    play: Play,
+    channels: list[Channel],
+    cue_index: int,
+    old_state: dict[str, Effect],
+    state: dict[str, Effect],
+    changed_regions: set[str],
+) -> _CuePlan:
+    """Reuse a compiled plan after a play edit, recompiling only stale regions.
+
+    Returns ``plan`` itself when nothing it depends on has changed.
+    """
+    if state == old_state and not changed_regions & state.keys():
+        if plan.cue_index == cue_index:
+            return plan
+        return _CuePlan(cue_index=cue_index, regions=plan.regions)
+    kept = [
+        rp
+        for rp in plan.regions
+        if rp.region_id not in changed_regions and state.get(rp.region_id) == rp.effect
+    ]
+    kept_ids = {rp.region_id for rp in kept}
+    stale = {rid: e for rid, e in state.items() if rid not in kept_ids}
+    fresh = _compile_cue(play, channels, cue_index, stale)
+    return _CuePlan(cue_index=cue_index, regions=kept + fresh.regions)
+
+
+def _render_plan(
+    plan: _CuePlan,
+    channels: list[Channel],
+    elapsed_sec: float,
+) -> dict[str, list[tuple[int, int, int]]]:
+    # Initialize all-black channel buffers
+    buffers: dict[str, list[tuple[int, int, int]]] = {
+        ch.id: [(0, 0, 0)] * ch.ledCount for ch in channels
+    }
+    for rp in plan.regions:
+        buf = buffers[rp.channel_id]
+        pixels = render_effect(rp.effect, elapsed_sec, rp.pixel_count)
+        n = len(pixels)
+        for px_idx, buf_idx in rp.slots:
+            if px_idx < n:
+                buf[buf_idx] = pixels[px_idx]
+    return buffers
+
+
+def _frame_message(buffers: dict[str, list[tuple[int, int, int]]]) -> dict:
     return {
         "type": "frame",
         "timestamp": time.time(),
@@ -78,6 +197,39 @@ def _build_frame(
     }
 
 
+def _build_frame(
+    play: Play,
+    channels: list[Channel],
+    cue_index: int,
+    elapsed_sec: float,
+) -> dict:
+    plan = _compile_cue(play, channels, cue_index, _cue_state(play, cue_index))
+    return _frame_message(_render_plan(plan, channels, elapsed_sec))
+
+
+def _grid_elapsed(since_cue: float, frame_interval: float) -> float:
+    """Snap time since the cue started to the cue's 1/fps frame grid."""
+    return round(since_cue / frame_interval) * frame_interval
+
+
+def _until_grid_tick(since_cue: float, frame_interval: float) -> float:
+    """Seconds until the next tick of the cue's frame grid."""
+    return frame_interval - since_cue % frame_interval
+
+
+def _prepare_cue(
+    play: Play,
+    channels: list[Channel],
+    table: list[dict[str, Effect]],
+    cue_index: int,
+    compiled: CompiledPlay | None = None,
+) -> tuple[_CuePlan, dict[str, list[tuple[int, int, int]]], dict]:
+    """Compile a cue and render its t=0 frame, ready to be swapped in on GO."""
+    plan = _compile_cue(play, channels, cue_index, table[cue_index], compiled)
+    buffers = _render_plan(plan, channels, 0.0)
+    return plan, buffers, _frame_message(buffers)
+
+
 # ── Preview Session ────────────────────────────────────────────────────────────
 
 
@@ -89,24 +241,44 @@ class PreviewSession:
         self._task: asyncio.Task | None = None
         self._cue_start: float = 0.0
         self._play: Play | None = None
+        self._channels: list[Channel] = []
+        self._table: list[dict[str, Effect]] = []
+        self._plan: _CuePlan | None = None
 
     def status(self):
         from models import PreviewStatus
         return PreviewStatus(isRunning=self.is_running, playId=self.play_id)
 
+    def _enter_cue(self, cue_index: int) -> None:
+        self.cue_index = cue_index
+        self._plan = _compile_cue(self._play, self._channels, cue_index, self._table[cue_index])
+        self._cue_start = time.monotonic()
+
     def advance(self) -> None:
         if self._play is None or self.cue_index >= len(self._play.cues) - 1:
             return
-        self.cue_index += 1
-        self._cue_start = time.monotonic()
+        self._enter_cue(self.cue_index + 1)
+
+    def back(self) -> None:
+        if self._play is None or self.cue_index == 0:
+            return
+        self._enter_cue(self.cue_index - 1)
+
+    def goto(self, cue_index: int) -> None:
+        if self._play is None:
+            return
+        if not 0 <= cue_index < len(self._play.cues):
+            raise IndexError(f"cue index {cue_index} out of range")
+        self._enter_cue(cue_index)
 
     async def start(self, play: Play, channels: list[Channel], fps: int, broadcaster) -> None:
         await self.stop()
         self.is_running = True
         self.play_id = play.id
-        self.cue_index = 0
         self._play = play
-        self._cue_start = time.monotonic()
+        self._channels = channels
+        self._table = _build_cue_table(play)
+        self._enter_cue(0)
         self._task = asyncio.create_task(
             self._run(play, channels, fps, broadcaster)
         )
@@ -127,7 +299,7 @@ class PreviewSession:
             while self.is_running:
                 t0 = time.monotonic()
                 elapsed = t0 - self._cue_start
-                frame = _build_frame(play, channels, self.cue_index, elapsed)
+                frame = _frame_message(_render_plan(self._plan, channels, elapsed))
                 await broadcaster.broadcast(frame)
                 spent = time.monotonic() - t0
                 await asyncio.sleep(max(0.0, frame_interval - spent))
@@ -155,6 +327,35 @@ class LiveSession:
         self._cue_start: float = 0.0
         self._play: Play | None = None
         self._channels: list[Channel] = []
+        self._table: list[dict[str, Effect]] = []
+        # Precompiled form of _play, if start() was given one
+        self._compiled: CompiledPlay | None = None
+        self._plan: _CuePlan | None = None
+        # Speculatively prepared next cue (plan + its t=0 frame)
+        self._prepare_task: asyncio.Task | None = None
+        self._next: tuple[_CuePlan, dict, dict] | None = None
+        self._pending: tuple[dict, dict] | None = None
+        self.stats: FrameStats | None = None
+        # What apply_realtime() achieved for the loop thread, set at startup
+        self.realtime_report: dict[str, str] = {}
+        # GC show mode (Settings.live_show_mode), set at startup
+        self.show_mode: bool = False
+        self._gc: ShowModeGC | None = None
+        # Render on each cue's 1/fps grid, as cluster nodes do; set at startup
+        self.align_frames: bool = False
+
+    @property
+    def next_cue_ready(self) -> bool:
+        return self._next is not None and self._next[0].cue_index == self.cue_index + 1
+
+    @property
+    def play(self) -> Play | None:
+        return self._play
+
+    @property
+    def cue_started_at(self) -> float:
+        """``time.monotonic()`` when the current cue was entered."""
+        return self._cue_start
 
     def status(self):
         from models import LiveStatus
@@ -176,6 +377,7 @@ class LiveSession:
             cueName=cue.name,
             cueIndex=self.cue_index,
             isBlackout=self.is_blackout,
+            nextCueReady=self.next_cue_ready,
         )
 
     def _status_message(self) -> dict:
@@ -188,6 +390,7 @@ class LiveSession:
             "cueIndex": s.cueIndex,
             "isRunning": s.isRunning,
             "isBlackout": s.isBlackout,
+            "nextCueReady": s.nextCueReady,
         }
 
     async def start(
@@ -197,20 +400,33 @@ class LiveSession:
         fps: int,
         broadcaster,
         hardware,
+        compiled: CompiledPlay | None = None,
     ) -> None:
+        """Start the frame loop; ``compiled``, if given, must be of ``play``."""
         self.is_running = True
         self.play_id = play.id
         self.cue_index = 0
         self.is_blackout = False
         self._play = play
         self._channels = channels
+        self._compiled = compiled
+        self._table = compiled.table if compiled else _build_cue_table(play)
+        self._plan = _compile_cue(play, channels, 0, self._table[0], compiled)
+        self._next = None
+        self._pending = None
+        self.stats = FrameStats(fps)
+        self._gc = ShowModeGC(self.show_mode, self.stats)
+        # Freeze only after the play and its compiled state are loaded
+        self._gc.enter()
         self._cue_start = time.monotonic()
         await broadcaster.broadcast(self._status_message())
         self._task = asyncio.create_task(
             self._run(play, channels, fps, broadcaster, hardware)
         )
+        self._schedule_prepare()
 
     async def stop(self, broadcaster, hardware) -> None:
+        self._cancel_prepare()
         if self._task and not self._task.done():
             self._task.cancel()
             try:
@@ -219,24 +435,167 @@ class LiveSession:
                 pass
         self.is_running = False
         self._task = None
+        self._next = None
+        self._pending = None
+        if self._gc is not None:
+            self._gc.exit()
+            self._gc = None
         if hardware and self._channels:
             hardware.all_off(self._channels)
         await broadcaster.broadcast(self._status_message())
 
+    def _enter_cue(self, cue_index: int) -> None:
+        self.cue_index = cue_index
+        self.is_blackout = False
+        if self._next is not None and self._next[0].cue_index == cue_index:
+            self._plan, buffers, frame = self._next
+            self._pending = (buffers, frame)
+        else:
+            self._plan = _compile_cue(
+                self._play, self._channels, cue_index, self._table[cue_index], self._compiled
+            )
+            self._pending = None
+        self._next = None
+        self._cue_start = time.monotonic()
+        self._schedule_prepare()
+
     async def advance(self, broadcaster) -> None:
         if not self.is_running or self._play is None:
             return
         if self.cue_index >= len(self._play.cues) - 1:
             return
-        self.cue_index += 1
-        self.is_blackout = False
-        self._cue_start = time.monotonic()
+        self._enter_cue(self.cue_index + 1)
+        await broadcaster.broadcast(self._status_message())
+
+    async def back(self, broadcaster) -> None:
+        if not self.is_running or self._play is None or self.cue_index == 0:
+            return
+        self._enter_cue(self.cue_index - 1)
+        await broadcaster.broadcast(self._status_message())
+
+    async def goto(self, cue_index: int, broadcaster) -> None:
+        if not self.is_running or self._play is None:
+            return
+        if not 0 <= cue_index < len(self._play.cues):
+            raise IndexError(f"cue index {cue_index} out of range")
+        self._enter_cue(cue_index)
         await broadcaster.broadcast(self._status_message())
 
     async def blackout(self, broadcaster) -> None:
         self.is_blackout = True
         await broadcaster.broadcast(self._status_message())
 
+    async def get_stats(self) -> dict:
+        snapshot = self.stats.snapshot() if self.stats else {}
+        return {
+            "isRunning": self.is_running,
+            "showMode": self.show_mode,
+            "realtime": self.realtime_report,
+            **snapshot,
+        }
+
+    async def reload(self, play: Play, broadcaster) -> None:
+        """Swap an edited version of the running play in without restarting.
+
+        The current cue (matched by id, else clamped by index) and its elapsed
+        time are preserved. Only regions whose definition or resolved effect
+        changed are recompiled; everything else keeps its compiled plan.
+        """
+        if not self.is_running or self._play is None or self._plan is None:
+            return
+        if not play.cues:
+            raise ValueError("Play has no cues.")
+        old_play, old_table = self._play, self._table
+        table = _build_cue_table(play)
+        changed_regions = _changed_regions(old_play, play)
+
+        current_id = old_play.cues[self.cue_index].id
+        cue_index = next(
+            (i for i, c in enumerate(play.cues) if c.id == current_id),
+            min(self.cue_index, len(play.cues) - 1),
+        )
+        plan = _patch_plan(
+            self._plan,
+            play,
+            self._channels,
+            cue_index,
+            old_table[self.cue_index],
+            table[cue_index],
+            changed_regions,
+        )
+
+        # A prepared next cue stays valid if its plan survives unchanged
+        next_prepared = None
+        if self.next_cue_ready and cue_index + 1 < len(play.cues):
+            next_plan = self._next[0]
+            patched = _patch_plan(
+                next_plan,
+                play,
+                self._channels,
+                cue_index + 1,
+                old_table[next_plan.cue_index],
+                table[cue_index + 1],
+                changed_regions,
+            )
+            if patched is next_plan:
+                next_prepared = self._next
+
+        # All assignments happen without yielding, so the frame loop sees
+        # either the old play or the new one — never a mix.
+        if plan is not self._plan:
+            self._pending = None
+        self._play = play
+        self._compiled = None
+        self._table = table
+        self._plan = plan
+        self.cue_index = cue_index
+        if next_prepared is not None:
+            self._cancel_prepare()
+            self._next = next_prepared
+        else:
+            self._next = None
+            self._schedule_prepare()
+        await broadcaster.broadcast(self._status_message())
+
+    # ── Next-cue preparation ───────────────────────────────────────────────────
+
+    def _cancel_prepare(self) -> None:
+        if self._prepare_task and not self._prepare_task.done():
+            self._prepare_task.cancel()
+        self._prepare_task = None
+
+    def _schedule_prepare(self) -> None:
+        """Compile and pre-render the cue after the current one in a worker thread."""
+        self._cancel_prepare()
+        if self._play is None or self.cue_index + 1 >= len(self._play.cues):
+            return
+        self._prepare_task = asyncio.create_task(
+            self._prepare(
+                self._play, self._channels, self._table, self.cue_index + 1, self._compiled
+            )
+        )
+
+    async def _prepare(
+        self,
+        play: Play,
+        channels: list[Channel],
+        table: list[dict[str, Effect]],
+        cue_index: int,
+        compiled: CompiledPlay | None = None,
+    ) -> None:
+        try:
+            prepared = await asyncio.to_thread(
+                _prepare_cue, play, channels, table, cue_index, compiled
+            )
+        except (ValueError, TypeError, KeyError, IndexError, ArithmeticError) as e:
+            # Bad effect parameters. Not fatal: advance() falls back to
+            # compiling the cue inline, which surfaces the same error there
+            logger.warning("Failed to prepare cue %d: %s", cue_index, e)
+            return
+        # Discard the result if the session moved on while we were working
+        if self._play is play and self.cue_index + 1 == cue_index:
+            self._next = prepared
+
     async def _run(
         self, play: Play, channels: list[Channel], fps: int, broadcaster, hardware
     ) -> None:
@@ -247,6 +606,8 @@ class LiveSession:
             while self.is_running:
                 t0 = time.monotonic()
                 elapsed = t0 - self._cue_start
+                if self.align_frames:
+                    elapsed = _grid_elapsed(elapsed, frame_interval)
 
                 if self.is_blackout:
                     frame = {
@@ -258,19 +619,28 @@ class LiveSession:
                     if hardware:
                         hardware.all_off(channels)
                 else:
-                    frame = _build_frame(play, channels, self.cue_index, elapsed)
+                    if self._pending is not None:
+                        # First frame of a prepared cue: already rendered at t=0
+                        buffers, frame = self._pending
+                        self._pending = None
+                        frame["timestamp"] = time.time()
+                    else:
+                        buffers = _render_plan(self._plan, channels, elapsed)
+                        frame = _frame_message(buffers)
                     await broadcaster.broadcast(frame)
                     if hardware:
-                        for ch in channels:
-                            buf_hex = frame["channels"].get(ch.id, [])
-                            pixels = [
-                                (int(h[1:3], 16), int(h[3:5], 16), int(h[5:7], 16))
-                                for h in buf_hex
-                            ]
-                            hardware.write_channel(ch.gpioPin, ch.ledCount, ch.colorOrder, pixels)
+                        hardware.write_frame(channels, buffers)
 
                 spent = time.monotonic() - t0
-                await asyncio.sleep(max(0.0, frame_interval - spent))
+                self.stats.record(t0, spent)
+                self._gc.collect_in_slack(frame_interval - spent)
+                if self.align_frames:
+                    # Wake on the next tick of the cue's grid rather than one
+                    # interval from now, so frames match the nodes' frames
+                    wait = _until_grid_tick(time.monotonic() - self._cue_start, frame_interval)
+                else:
+                    wait = frame_interval - (time.monotonic() - t0)
+                await asyncio.sleep(max(0.0, wait))
 
         except asyncio.CancelledError:
             pass
@@ -279,6 +649,8 @@ class LiveSession:
             await broadcaster.broadcast({"type": "error", "message": str(e)})
         finally:
             self.is_running = False
+            if self._gc is not None:
+                self._gc.exit()
 
 
 # Module-level singletons
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, round(pct / 100.0 * (len(sorted_values) - 1)))
+    return sorted_values[idx]
+
+
+def summarize_ms(values) -> dict:
+    ordered = sorted(values)
+    if not ordered:
+        return {"avg": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "avg": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50": round(_percentile(ordered, 50) * 1000, 3),
+        "p95": round(_percentile(ordered, 95) * 1000, 3),
+        "p99": round(_percentile(ordered, 99) * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+class FrameStats:
+    """Rolling frame timing statistics for a render loop.
+
+    ``jitter`` is how far each frame started from its ideal start time
+    (previous start + frame interval); ``render`` is time spent producing and
+    outputting the frame. Only the most recent ``window`` frames are kept.
+    """
+
+    def __init__(self, fps: int, window: int = 300) -> None:
+        self.frame_interval = 1.0 / fps
+        self.frames = 0
+        self.dropped = 0
+        self.last_frame_at: float | None = None
+        self._last_start: float | None = None
+        self._render: deque[float] = deque(maxlen=window)
+        self._jitter: deque[float] = deque(maxlen=window)
+        self._intervals: deque[float] = deque(maxlen=window)
+        self.gc_collections = 0
+        self._gc_pauses: deque[float] = deque(maxlen=window)
+
+    def record(self, frame_start: float, render_sec: float) -> None:
+        if self._last_start is not None:
+            interval = frame_start - self._last_start
+            self._intervals.append(interval)
+            self._jitter.append(abs(interval - self.frame_interval))
+            if interval > 1.5 * self.frame_interval:
+                self.dropped += 1
+        self._last_start = frame_start
+        self._render.append(render_sec)
+        self.frames += 1
+        self.last_frame_at = time.time()
+
+    def record_gc(self, pause_sec: float) -> None:
+        self.gc_collections += 1
+        self._gc_pauses.append(pause_sec)
+
+    def fps(self) -> float:
+        if not self._intervals:
+            return 0.0
+        return round(len(self._intervals) / sum(self._intervals), 2)
+
+    def snapshot(self) -> dict:
+        return {
+            "frames": self.frames,
+            "droppedFrames": self.dropped,
+            "fps": self.fps(),
+            "targetFps": round(1.0 / self.frame_interval, 2),
+            "lastFrameAt": self.last_frame_at,
+            "renderMs": summarize_ms(self._render),
+            "jitterMs": summarize_ms(self._jitter),
+            "gcCollections": self.gc_collections,
+            "gcPauseMs": summarize_ms(self._gc_pauses),
+        }
@@ -0,0 +1,149 @@
+"""Minimal RFC 6902 JSON Patch implementation.
+
+Documents may contain pydantic models as list or dict members. A model is
+only dumped to a plain dict when a patch operation reaches into it, so after
+``apply_patch`` every untouched model is still the same object and every
+touched or newly added member is a plain value that needs validating.
+"""
+from __future__ import annotations
+
+import copy
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class JsonPatchError(ValueError):
+    """The patch is malformed or cannot be applied to the document."""
+
+
+class JsonPatchTestFailed(JsonPatchError):
+    """A ``test`` operation did not match."""
+
+
+def _parse_pointer(pointer: str) -> list[str]:
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer {pointer!r}.")
+    return [p.replace("~1", "/").replace("~0", "~") for p in pointer[1:].split("/")]
+
+
+def _index(container: list, token: str, allow_end: bool) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index {token!r}.")
+    idx = int(token)
+    limit = len(container) + (1 if allow_end else 0)
+    if idx >= limit:
+        raise JsonPatchError(f"Array index {idx} out of range.")
+    return idx
+
+
+def _child(container: Any, token: str, materialize: bool = True) -> Any:
+    """Return a member of a dict or list.
+
+    A pydantic model member is dumped to a dict; with ``materialize`` the dump
+    also replaces the model in its container so later edits land in it.
+    """
+    if isinstance(container, dict):
+        if token not in container:
+            raise JsonPatchError(f"Member {token!r} not found.")
+        key: Any = token
+    elif isinstance(container, list):
+        key = _index(container, token, allow_end=False)
+    else:
+        raise JsonPatchError(f"Cannot descend into {type(container).__name__} at {token!r}.")
+    value = container[key]
+    if isinstance(value, BaseModel):
+        value = value.model_dump()
+        if materialize:
+            container[key] = value
+    return value
+
+
+def _resolve_parent(doc: Any, tokens: list[str]) -> Any:
+    node = doc
+    for token in tokens[:-1]:
+        node = _child(node, token)
+    return node
+
+
+def _get(doc: Any, pointer: str) -> Any:
+    """Read a value without materializing any model along the way."""
+    node = _jsonable(doc)
+    for token in _parse_pointer(pointer):
+        node = _child(node, token, materialize=False)
+    return node
+
+
+def _add(doc: Any, pointer: str, value: Any) -> Any:
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        return value
+    parent = _resolve_parent(doc, tokens)
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, token, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to {type(parent).__name__} at {pointer!r}.")
+    return doc
+
+
+def _remove(doc: Any, pointer: str) -> Any:
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        raise JsonPatchError("Cannot remove the whole document.")
+    parent = _resolve_parent(doc, tokens)
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Member {token!r} not found.")
+        return parent.pop(token)
+    if isinstance(parent, list):
+        return parent.pop(_index(parent, token, allow_end=False))
+    raise JsonPatchError(f"Cannot remove from {type(parent).__name__} at {pointer!r}.")
+
+
+def _jsonable(value: Any) -> Any:
+    return value.model_dump() if isinstance(value, BaseModel) else value
+
+
+def apply_patch(doc: Any, operations: list[dict]) -> Any:
+    """Apply ``operations`` to ``doc`` in place and return the new document.
+
+    On error ``doc`` may be partially modified; apply to a copy if that matters.
+    """
+    for op in operations:
+        kind = op.get("op")
+        path = op.get("path")
+        if not isinstance(path, str):
+            raise JsonPatchError("Operation is missing 'path'.")
+        if kind in ("add", "replace", "test") and "value" not in op:
+            raise JsonPatchError(f"'{kind}' operation is missing 'value'.")
+        if kind in ("move", "copy") and not isinstance(op.get("from"), str):
+            raise JsonPatchError(f"'{kind}' operation is missing 'from'.")
+
+        if kind == "add":
+            doc = _add(doc, path, copy.deepcopy(op["value"]))
+        elif kind == "remove":
+            _remove(doc, path)
+        elif kind == "replace":
+            if _parse_pointer(path):
+                _remove(doc, path)
+            doc = _add(doc, path, copy.deepcopy(op["value"]))
+        elif kind == "move":
+            if path.startswith(op["from"] + "/"):
+                raise JsonPatchError("Cannot move a value into one of its children.")
+            doc = _add(doc, path, _jsonable(_remove(doc, op["from"])))
+        elif kind == "copy":
+            doc = _add(doc, path, copy.deepcopy(_get(doc, op["from"])))
+        elif kind == "test":
+            if _get(doc, path) != op["value"]:
+                raise JsonPatchTestFailed(f"Test failed at {path!r}.")
+        else:
+            raise JsonPatchError(f"Unknown operation {kind!r}.")
+    return doc
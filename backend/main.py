@@ -1,44 +1,142 @@
 from __future__ import annotations
 
 import pathlib
+import socket
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
+from conditional import EncodingETagMiddleware
 from config import settings
 from engine.hardware import create_hardware
-from storage import Storage
+from engine.loop_monitor import loop_monitor
+from engine.realtime import apply_realtime, log_report, shared_thread_settings
+from storage import StorageBackend, create_storage
 
 # Module-level singletons shared across routers via app.state
-storage: Storage
+storage: StorageBackend
 hardware = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global hardware
-    s = Storage(settings.data_dir)
+    s = create_storage(
+        settings.storage_backend,
+        settings.data_dir,
+        write_behind_sec=settings.autosave_delay_ms / 1000 if settings.autosave_delay_ms > 0 else None,
+        max_backups=settings.max_backups_per_play,
+    )
     s.create_dirs()
     app.state.storage = s
     app.state.settings = settings
 
-    hw = create_hardware(settings.mock_hardware)
+    hardware_options = {}
+    if settings.hardware_output == "sacn":
+        hardware_options = {
+            "universes": settings.sacn_universes,
+            "host": settings.sacn_host,
+            "priority": settings.sacn_priority,
+            "sync_universe": settings.sacn_sync_universe,
+        }
+    elif settings.hardware_output == "artnet":
+        hardware_options = {
+            "universes": settings.artnet_universes,
+            "host": settings.artnet_host,
+            "sync": settings.output_sync,
+        }
+    elif settings.hardware_output == "ddp":
+        hardware_options = {"outputs": settings.ddp_outputs, "sync": settings.output_sync}
+    hw = create_hardware(settings.mock_hardware, settings.hardware_output, hardware_options)
     hardware = hw
     app.state.hardware = hw
 
+    realtime = {
+        "cpu": settings.render_cpu,
+        "rt_priority": settings.render_rt_priority,
+        "nice": settings.render_nice,
+    }
+    app.state.cluster = None
+    if settings.cluster_role == "node":
+        from engine.broadcaster import live_broadcaster
+        from engine.cluster import ClusterNode
+
+        if not settings.cluster_coordinator:
+            raise RuntimeError("CLUSTER_ROLE=node requires CLUSTER_COORDINATOR.")
+        # Follows the coordinator's cues; frames render on this (the event loop) thread
+        node = ClusterNode(
+            settings.cluster_coordinator,
+            settings.cluster_port,
+            s,
+            hw,
+            live_broadcaster,
+            settings.cluster_node_name or socket.gethostname(),
+        )
+        node.realtime_report = apply_realtime(**shared_thread_settings(realtime))
+        log_report(node.realtime_report, "event loop thread")
+        await node.start()
+        app.state.live_session = node
+        app.state.cluster = node
+    elif settings.render_process:
+        from engine.render_process import ProcessLiveSession
+
+        # Applied inside the render process when a live session starts
+        app.state.live_session = ProcessLiveSession(
+            "mock" if settings.mock_hardware else settings.hardware_output,
+            hardware_options=hardware_options,
+            realtime=realtime,
+            show_mode=settings.live_show_mode,
+        )
+    else:
+        from engine.session import live_session
+
+        # The frame loop runs on this (the event loop) thread
+        live_session.realtime_report = apply_realtime(**shared_thread_settings(realtime))
+        log_report(live_session.realtime_report, "event loop thread")
+        live_session.show_mode = settings.live_show_mode
+        app.state.live_session = live_session
+
+    if settings.cluster_role == "coordinator":
+        from engine.broadcaster import live_broadcaster
+        from engine.cluster import ClusterCoordinator
+
+        # Render on the cue's frame grid, in step with the nodes
+        app.state.live_session.align_frames = True
+
+        coordinator = ClusterCoordinator(
+            app.state.live_session, settings.cluster_port, settings.fps_target
+        )
+        await coordinator.start()
+        # Sessions broadcast a status message on every cue change
+        live_broadcaster.add_listener(coordinator.on_broadcast)
+        app.state.cluster = coordinator
+
+    loop_monitor.threshold = settings.loop_lag_threshold_ms / 1000.0
+    loop_monitor.start()
+
     yield
 
+    await loop_monitor.stop()
+
     # Shutdown: stop any running sessions and clean up hardware
-    from engine.session import live_session, preview_session
+    from engine.session import preview_session
     from engine.broadcaster import live_broadcaster, preview_broadcaster
 
     await preview_session.stop()
-    await live_session.stop(live_broadcaster, hw)
+    await app.state.live_session.stop(live_broadcaster, hw)
+    if settings.cluster_role == "coordinator":
+        # After the session, so nodes hear that it stopped
+        live_broadcaster.remove_listener(app.state.cluster.on_broadcast)
+        await app.state.cluster.stop()
     hw.close()
 
+    # Write out any plays still waiting in the write-behind queue
+    s.close()
+
 
 app = FastAPI(title="PiLites", version="1.0.0", lifespan=lifespan)
 
@@ -47,15 +145,24 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Total-Count"],
 )
 
-from routers import channels, plays, preview, live, data  # noqa: E402
+if settings.gzip_min_bytes > 0:
+    # Level 6 keeps compression of large plays cheap on a Pi; already
+    # compressed types such as show archives are left alone
+    app.add_middleware(GZipMiddleware, minimum_size=settings.gzip_min_bytes, compresslevel=6)
+    # Added after, so it wraps the gzip middleware and sees the encoding
+    app.add_middleware(EncodingETagMiddleware)
+
+from routers import channels, plays, preview, live, data, health as health_router  # noqa: E402
 
 app.include_router(channels.router, prefix="/api")
 app.include_router(plays.router, prefix="/api")
 app.include_router(preview.router, prefix="/api")
 app.include_router(live.router, prefix="/api")
 app.include_router(data.router, prefix="/api")
+app.include_router(health_router.router, prefix="/api")
 
 _DIST = pathlib.Path(__file__).parent.parent / "frontend" / "dist"
 
@@ -64,8 +171,8 @@ if _DIST.is_dir():
 
 
 @app.get("/health")
-def health():
-    return {"status": "ok"}
+async def health(request: Request):
+    return await health_router.health_summary(request)
 
 
 @app.get("/{full_path:path}")
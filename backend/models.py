@@ -2,7 +2,16 @@ from __future__ import annotations
 
 from typing import Any
 
-from pydantic import BaseModel, field_validator, model_validator
+from pydantic import BaseModel, ValidationInfo, field_validator, model_validator
+
+# Validation context for data this app wrote itself and verified by checksum.
+# Field types are still checked, but validators that re-check invariants the
+# data already satisfied when it was saved are skipped.
+TRUSTED = {"trusted": True}
+
+
+def _is_trusted(info: ValidationInfo) -> bool:
+    return bool(info.context) and info.context.get("trusted", False)
 
 
 class PixelRange(BaseModel):
@@ -10,7 +19,9 @@ class PixelRange(BaseModel):
     end: int
 
     @model_validator(mode="after")
-    def validate_range(self) -> PixelRange:
+    def validate_range(self, info: ValidationInfo) -> PixelRange:
+        if _is_trusted(info):
+            return self
         if self.start < 0:
             raise ValueError("start must be >= 0")
         if self.end < self.start:
@@ -65,8 +76,10 @@ class Region(BaseModel):
 
     @field_validator("ranges")
     @classmethod
-    def validate_no_overlap(cls, ranges: list[PixelRange]) -> list[PixelRange]:
-        if len(ranges) < 2:
+    def validate_no_overlap(
+        cls, ranges: list[PixelRange], info: ValidationInfo
+    ) -> list[PixelRange]:
+        if len(ranges) < 2 or _is_trusted(info):
             return ranges
         sorted_ranges = sorted(ranges, key=lambda r: r.start)
         for i in range(len(sorted_ranges) - 1):
@@ -92,9 +105,37 @@ class Play(BaseModel):
     cues: list[Cue] = []
 
 
+class ChannelRegionRef(BaseModel):
+    """A region that draws on a channel, with the last pixel it uses."""
+
+    playId: str
+    playName: str
+    regionId: str
+    regionName: str
+    lastPixel: int
+
+
 class PlaySummary(BaseModel):
     id: str
     name: str
+    cueCount: int = 0
+    regionCount: int = 0
+    totalPixels: int = 0
+    modifiedAt: float | None = None
+
+
+class CueSummary(BaseModel):
+    id: str
+    name: str
+
+
+class PlayOutline(BaseModel):
+    """A play without its cues' effects, for opening a play before its cues."""
+
+    id: str
+    name: str
+    regions: list[Region] = []
+    cues: list[CueSummary] = []
 
 
 # ── Request / Response bodies ──────────────────────────────────────────────────
@@ -112,6 +153,10 @@ class StartLiveRequest(BaseModel):
     playId: str
 
 
+class GotoCueRequest(BaseModel):
+    cueIndex: int
+
+
 class ImportRequest(BaseModel):
     name: str
 
@@ -123,6 +168,16 @@ class RestoreRequest(BaseModel):
 class BackupEntry(BaseModel):
     name: str
     path: str
+    createdAt: float | None = None
+    hash: str | None = None
+    size: int | None = None
+    cueCount: int | None = None
+
+
+class ChannelUpdateResponse(BaseModel):
+    ok: bool = True
+    # Regions that now extend past the channel's last LED
+    outOfBounds: list[ChannelRegionRef] = []
 
 
 class ExportResponse(BaseModel):
@@ -136,6 +191,15 @@ class UploadResponse(BaseModel):
     name: str
 
 
+class ShowImportResponse(BaseModel):
+    ok: bool = True
+    channels: int
+    plays: int
+    backups: int
+    # Regions of kept plays that extend past their imported channel
+    outOfBounds: list[ChannelRegionRef] = []
+
+
 class BackupResponse(BaseModel):
     ok: bool = True
     path: str
@@ -153,3 +217,52 @@ class LiveStatus(BaseModel):
     cueName: str | None
     cueIndex: int | None
     isBlackout: bool
+    nextCueReady: bool = False
+
+
+class TimingSummary(BaseModel):
+    avg: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+class EngineStats(BaseModel):
+    isRunning: bool
+    frames: int = 0
+    droppedFrames: int = 0
+    fps: float = 0.0
+    targetFps: float = 0.0
+    lastFrameAt: float | None = None
+    renderMs: TimingSummary | None = None
+    jitterMs: TimingSummary | None = None
+    gcCollections: int = 0
+    gcPauseMs: TimingSummary | None = None
+    showMode: bool = False
+    realtime: dict[str, str] = {}
+    error: str | None = None
+
+
+class ClusterNodeStatus(BaseModel):
+    """A node as last reported to the coordinator."""
+
+    name: str
+    address: str
+    lastSeenSec: float
+    offsetMs: float | None = None
+    rttMs: float | None = None
+    playId: str | None = None
+    error: str | None = None
+
+
+class ClusterStatus(BaseModel):
+    role: str
+    # Coordinator: the nodes that have checked in recently
+    nodes: list[ClusterNodeStatus] = []
+    # Node: its coordinator and clock estimate
+    coordinator: str | None = None
+    synced: bool = False
+    offsetMs: float | None = None
+    rttMs: float | None = None
+    error: str | None = None
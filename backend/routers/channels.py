@@ -3,9 +3,10 @@ from __future__ import annotations
 import asyncio
 import logging
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request, Response
 
-from models import Channel, OkResponse
+from conditional import conditional_get
+from models import Channel, ChannelUpdateResponse, OkResponse
 
 router = APIRouter(tags=["channels"])
 logger = logging.getLogger(__name__)
@@ -30,12 +31,7 @@ def _schedule_auto_clear(channel: Channel, hardware, timeout_sec: int) -> None:
         logger.info("Hardware test auto-clear for channel %s", channel.id)
         try:
             if hardware:
-                hardware.write_channel(
-                    channel.gpioPin,
-                    channel.ledCount,
-                    channel.colorOrder,
-                    [(0, 0, 0)] * channel.ledCount,
-                )
+                hardware.all_off([channel])
         except Exception as e:
             logger.warning("Auto-clear failed: %s", e)
         _test_timers.pop(channel.id, None)
@@ -50,25 +46,44 @@ def _schedule_auto_clear(channel: Channel, hardware, timeout_sec: int) -> None:
 
 
 @router.get("/channels", response_model=list[Channel])
-def list_channels(request: Request) -> list[Channel]:
-    return request.app.state.storage.load_channels()
+def list_channels(request: Request, response: Response) -> list[Channel]:
+    storage = request.app.state.storage
+    not_modified = conditional_get(request, response, storage.channels_tag())
+    if not_modified is not None:
+        return not_modified
+    return storage.load_channels()
+
 
+@router.post("/channels", response_model=ChannelUpdateResponse)
+def upsert_channel(channel: Channel, request: Request) -> ChannelUpdateResponse:
+    """Create or replace a channel and report regions it no longer covers.
 
-@router.post("/channels", response_model=OkResponse)
-def upsert_channel(channel: Channel, request: Request) -> OkResponse:
+    Only the plays with regions on this channel are checked, using the
+    storage's channel index.
+    """
     storage = request.app.state.storage
     channels = storage.load_channels()
     channels = [c for c in channels if c.id != channel.id]
     channels.append(channel)
     storage.save_channels(channels)
-    return OkResponse()
+    out_of_bounds = [
+        ref for ref in storage.regions_on_channel(channel.id) if ref.lastPixel >= channel.ledCount
+    ]
+    if out_of_bounds:
+        logger.warning(
+            "Channel %s has %d LEDs; %d region(s) extend past it",
+            channel.id,
+            channel.ledCount,
+            len(out_of_bounds),
+        )
+    return ChannelUpdateResponse(outOfBounds=out_of_bounds)
 
 
 # ── Hardware Test ──────────────────────────────────────────────────────────────
 
 
-def _get_channel(channel_id: str, request: Request) -> Channel:
-    channels = request.app.state.storage.load_channels()
+async def _get_channel(channel_id: str, request: Request) -> Channel:
+    channels = await request.app.state.storage.aio.load_channels()
     for ch in channels:
         if ch.id == channel_id:
             return ch
@@ -77,17 +92,12 @@ def _get_channel(channel_id: str, request: Request) -> Channel:
 
 @router.post("/channels/{channel_id}/test/white", response_model=OkResponse)
 async def test_white(channel_id: str, request: Request) -> OkResponse:
-    ch = _get_channel(channel_id, request)
+    ch = await _get_channel(channel_id, request)
     hardware = request.app.state.hardware
     timeout = request.app.state.settings.hardware_test_timeout_sec
     try:
         if hardware:
-            hardware.write_channel(
-                ch.gpioPin,
-                ch.ledCount,
-                ch.colorOrder,
-                [(255, 255, 255)] * ch.ledCount,
-            )
+            hardware.write_frame([ch], {ch.id: [(255, 255, 255)] * ch.ledCount})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     _schedule_auto_clear(ch, hardware, timeout)
@@ -96,19 +106,14 @@ async def test_white(channel_id: str, request: Request) -> OkResponse:
 
 @router.post("/channels/{channel_id}/test/off", response_model=OkResponse)
 async def test_off(channel_id: str, request: Request) -> OkResponse:
-    ch = _get_channel(channel_id, request)
+    ch = await _get_channel(channel_id, request)
     hardware = request.app.state.hardware
     if channel_id in _test_timers:
         _test_timers[channel_id].cancel()
         del _test_timers[channel_id]
     try:
         if hardware:
-            hardware.write_channel(
-                ch.gpioPin,
-                ch.ledCount,
-                ch.colorOrder,
-                [(0, 0, 0)] * ch.ledCount,
-            )
+            hardware.all_off([ch])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     return OkResponse()
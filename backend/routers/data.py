@@ -1,22 +1,48 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import time
 
-from fastapi import APIRouter, HTTPException, Request, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import ValidationError
 
 from models import (
     BackupEntry,
     BackupResponse,
+    ChannelRegionRef,
     ExportResponse,
     ImportRequest,
     OkResponse,
     RestoreRequest,
+    ShowImportResponse,
     UploadResponse,
 )
+from routers.plays import play_conflicts
+from show_archive import ShowArchive, ShowArchiveError, iter_archive, read_archive
+from uploads import UploadError, UploadTooLarge, receive_file
 
 router = APIRouter(tags=["data"])
 
+# Upper bound on how far a show archive may expand when unpacked, relative to
+# MAX_IMPORT_MB; JSON typically compresses about tenfold
+_ARCHIVE_EXPANSION_LIMIT = 20
+
+_MULTIPART_FILE_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
 
 # ── Export ─────────────────────────────────────────────────────────────────────
 
@@ -43,15 +69,32 @@ def download_export(play_id: str, filename: str, request: Request) -> FileRespon
 # ── Import ─────────────────────────────────────────────────────────────────────
 
 
-@router.post("/plays/import/upload", response_model=UploadResponse)
-async def upload_import(file: UploadFile, request: Request) -> UploadResponse:
+@router.post(
+    "/plays/import/upload", response_model=UploadResponse, openapi_extra=_MULTIPART_FILE_BODY
+)
+async def upload_import(request: Request) -> UploadResponse:
+    # The body is streamed to disk rather than declared as an UploadFile so it
+    # is never buffered whole and oversized uploads stop at the limit
     storage = request.app.state.storage
-    data = await file.read()
+    max_bytes = request.app.state.settings.max_import_mb * 1024 * 1024
+    upload_path = storage.import_upload_path()
+    try:
+        filename = await receive_file(request, upload_path, max_bytes)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
-        json.loads(data)  # Validate it's valid JSON before staging
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Uploaded file is not valid JSON.")
-    name = storage.stage_import(file.filename or "import.json", data)
+        name = await storage.aio.stage_import_file(filename or "import.json", upload_path)
+    except ValidationError as e:
+        errors = e.errors()
+        if any(err["type"] == "json_invalid" for err in errors):
+            raise HTTPException(status_code=400, detail="Uploaded file is not valid JSON.")
+        err = errors[0]
+        loc = ".".join(str(p) for p in err["loc"]) or "play"
+        raise HTTPException(
+            status_code=400, detail=f"Uploaded file is not a valid play: {loc}: {err['msg']}"
+        )
     return UploadResponse(name=name)
 
 
@@ -67,15 +110,107 @@ def apply_import(play_id: str, body: ImportRequest, request: Request) -> OkRespo
     return OkResponse()
 
 
+# ── Show archive ───────────────────────────────────────────────────────────────
+
+
+def _check_kept_plays(storage, archive: ShowArchive) -> tuple[list[str], list[ChannelRegionRef]]:
+    """Check stored plays the import keeps against the archive's channels.
+
+    Returns the regions that would be left on a channel the archive does not
+    have, as problems, and those that extend past their channel's new length.
+    Uses the storage's channel index, so no play is loaded.
+    """
+    incoming = {play.id for play in archive.plays}
+    new_channels = {ch.id: ch for ch in archive.channels}
+    problems: list[str] = []
+    out_of_bounds: list[ChannelRegionRef] = []
+    for channel in storage.load_channels():
+        for ref in storage.regions_on_channel(channel.id):
+            if ref.playId in incoming:
+                continue
+            new = new_channels.get(channel.id)
+            if new is None:
+                problems.append(
+                    f"Play '{ref.playName}' (kept): region '{ref.regionName}' uses "
+                    f"channel '{channel.id}', which the archive does not have."
+                )
+            elif ref.lastPixel >= new.ledCount:
+                out_of_bounds.append(ref)
+    return problems, out_of_bounds
+
+
+@router.get("/show/export")
+def export_show(request: Request, backups: bool = False) -> StreamingResponse:
+    storage = request.app.state.storage
+    filename = f"show-{int(time.time())}.tar.gz"
+    return StreamingResponse(
+        iter_archive(storage, include_backups=backups),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post(
+    "/show/import", response_model=ShowImportResponse, openapi_extra=_MULTIPART_FILE_BODY
+)
+async def import_show(request: Request, replace: bool = False) -> ShowImportResponse:
+    storage = request.app.state.storage
+    max_bytes = request.app.state.settings.max_import_mb * 1024 * 1024
+    upload_path = storage.import_upload_path()
+    try:
+        await receive_file(request, upload_path, max_bytes)
+        archive = await asyncio.to_thread(
+            read_archive, upload_path, max_bytes * _ARCHIVE_EXPANSION_LIMIT
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (UploadError, ShowArchiveError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        await asyncio.to_thread(upload_path.unlink, missing_ok=True)
+
+    # Check every play against the archive's channels before changing anything
+    channel_ids = {ch.id for ch in archive.channels}
+    problems = [
+        f"Play '{play.name}': {problem}"
+        for play in archive.plays
+        for problem in play_conflicts(play, channel_ids)
+    ]
+    # Without replace, plays outside the archive stay and must still fit
+    out_of_bounds: list[ChannelRegionRef] = []
+    if not replace:
+        kept_problems, out_of_bounds = await asyncio.to_thread(
+            _check_kept_plays, storage, archive
+        )
+        problems.extend(kept_problems)
+    if problems:
+        raise HTTPException(status_code=400, detail="\n".join(problems))
+
+    await asyncio.to_thread(
+        storage.import_show, archive.channels, archive.plays, archive.backups, replace
+    )
+    return ShowImportResponse(
+        channels=len(archive.channels),
+        plays=len(archive.plays),
+        backups=archive.backup_count,
+        outOfBounds=out_of_bounds,
+    )
+
+
 # ── Backup ─────────────────────────────────────────────────────────────────────
 
 
 @router.get("/plays/{play_id}/backups", response_model=list[BackupEntry])
-def list_backups(play_id: str, request: Request) -> list[BackupEntry]:
+def list_backups(
+    play_id: str,
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1),
+) -> list[BackupEntry]:
     storage = request.app.state.storage
     if storage.load_play(play_id) is None:
         raise HTTPException(status_code=404, detail=f"Play '{play_id}' not found.")
-    return storage.list_backups(play_id)
+    return storage.list_backups(play_id, offset, limit)
 
 
 @router.post("/plays/{play_id}/backup", response_model=BackupResponse)
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Request
+
+from engine.loop_monitor import loop_monitor
+from engine.session import preview_session
+
+router = APIRouter(tags=["health"])
+
+
+async def health_summary(request: Request) -> dict:
+    """Body of GET /health: overall status, loop lag and live frame timing."""
+    live = await request.app.state.live_session.get_stats()
+    return {
+        "status": "degraded" if loop_monitor.is_lagging() else "ok",
+        "loopLagMs": loop_monitor.summary(),
+        "live": {
+            "isRunning": live["isRunning"],
+            "fps": live.get("fps", 0.0),
+            "lastFrameAt": live.get("lastFrameAt"),
+        },
+    }
+
+
+@router.get("/health/engine")
+async def engine_health(request: Request) -> dict:
+    return {
+        **await health_summary(request),
+        "loopMonitor": {
+            "isRunning": loop_monitor.is_running,
+            "intervalMs": loop_monitor.interval * 1000,
+            "thresholdMs": loop_monitor.threshold * 1000,
+            "spikes": loop_monitor.recent_spikes(),
+        },
+        "liveStats": await request.app.state.live_session.get_stats(),
+        "preview": {"isRunning": preview_session.is_running},
+        "storageCache": request.app.state.storage.cache_stats(),
+        "storagePendingWrites": request.app.state.storage.pending_writes,
+    }
@@ -1,21 +1,71 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
+
 from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
 
 from engine.broadcaster import live_broadcaster
-from engine.session import live_session
-from models import LiveStatus, OkResponse, StartLiveRequest
+from models import (
+    ClusterStatus,
+    EngineStats,
+    GotoCueRequest,
+    LiveStatus,
+    OkResponse,
+    StartLiveRequest,
+)
 
 router = APIRouter(tags=["live"])
 
 
+def _session(request: Request):
+    """The configured live session — LiveSession, ProcessLiveSession or ClusterNode."""
+    return request.app.state.live_session
+
+
+def _controlled_session(request: Request):
+    """The live session, if this instance takes live commands.
+
+    A cluster node follows its coordinator's cues; commands go there.
+    """
+    if request.app.state.settings.cluster_role == "node":
+        raise HTTPException(
+            status_code=409,
+            detail="This instance is a cluster node. Control the show from the coordinator.",
+        )
+    return _session(request)
+
+
+@contextmanager
+def _render_errors():
+    """Report a failed or dead render process as 503 rather than a bare 500."""
+    try:
+        yield
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
 @router.get("/live/status", response_model=LiveStatus)
-def get_live_status() -> LiveStatus:
-    return live_session.status()
+def get_live_status(request: Request) -> LiveStatus:
+    return _session(request).status()
+
+
+@router.get("/live/stats", response_model=EngineStats)
+async def get_live_stats(request: Request) -> EngineStats:
+    with _render_errors():
+        return EngineStats.model_validate(await _session(request).get_stats())
+
+
+@router.get("/live/cluster", response_model=ClusterStatus)
+def get_cluster_status(request: Request) -> ClusterStatus:
+    cluster = getattr(request.app.state, "cluster", None)
+    if cluster is None:
+        return ClusterStatus(role="standalone")
+    return cluster.cluster_status()
 
 
 @router.post("/live/start", response_model=OkResponse)
 async def start_live(body: StartLiveRequest, request: Request) -> OkResponse:
+    live_session = _controlled_session(request)
     if live_session.is_running:
         raise HTTPException(status_code=409, detail="A live session is already running.")
 
@@ -23,42 +73,90 @@ async def start_live(body: StartLiveRequest, request: Request) -> OkResponse:
     settings = request.app.state.settings
     hardware = request.app.state.hardware
 
-    play = storage.load_play(body.playId)
-    if play is None:
+    # Compiled form skips parsing and validating the play on every start
+    compiled = await storage.aio.load_compiled(body.playId)
+    if compiled is None:
         raise HTTPException(status_code=404, detail=f"Play '{body.playId}' not found.")
+    play = compiled.play
     if not play.cues:
         raise HTTPException(status_code=400, detail="Play has no cues.")
 
-    channels = storage.load_channels()
+    channels = await storage.aio.load_channels()
 
     # Clear any active hardware test signals
     from routers.channels import clear_all_test_signals
     clear_all_test_signals(hardware, channels)
 
-    await live_session.start(play, channels, settings.fps_target, live_broadcaster, hardware)
+    with _render_errors():
+        await live_session.start(
+            play, channels, settings.fps_target, live_broadcaster, hardware, compiled=compiled
+        )
     return OkResponse()
 
 
 @router.post("/live/next", response_model=OkResponse)
-async def live_next() -> OkResponse:
+async def live_next(request: Request) -> OkResponse:
+    live_session = _controlled_session(request)
+    if not live_session.is_running:
+        raise HTTPException(status_code=409, detail="No live session is running.")
+    with _render_errors():
+        await live_session.advance(live_broadcaster)
+    return OkResponse()
+
+
+@router.post("/live/back", response_model=OkResponse)
+async def live_back(request: Request) -> OkResponse:
+    live_session = _controlled_session(request)
     if not live_session.is_running:
         raise HTTPException(status_code=409, detail="No live session is running.")
-    await live_session.advance(live_broadcaster)
+    with _render_errors():
+        await live_session.back(live_broadcaster)
+    return OkResponse()
+
+
+@router.post("/live/goto", response_model=OkResponse)
+async def live_goto(body: GotoCueRequest, request: Request) -> OkResponse:
+    live_session = _controlled_session(request)
+    if not live_session.is_running:
+        raise HTTPException(status_code=409, detail="No live session is running.")
+    try:
+        with _render_errors():
+            await live_session.goto(body.cueIndex, live_broadcaster)
+    except IndexError:
+        raise HTTPException(status_code=400, detail=f"Cue index {body.cueIndex} is out of range.")
+    return OkResponse()
+
+
+@router.post("/live/reload", response_model=OkResponse)
+async def live_reload(request: Request) -> OkResponse:
+    live_session = _controlled_session(request)
+    if not live_session.is_running:
+        raise HTTPException(status_code=409, detail="No live session is running.")
+    storage = request.app.state.storage
+    play = await storage.aio.load_play(live_session.play_id)
+    if play is None:
+        raise HTTPException(status_code=404, detail=f"Play '{live_session.play_id}' not found.")
+    if not play.cues:
+        raise HTTPException(status_code=400, detail="Play has no cues.")
+    with _render_errors():
+        await live_session.reload(play, live_broadcaster)
     return OkResponse()
 
 
 @router.post("/live/stop", response_model=OkResponse)
 async def live_stop(request: Request) -> OkResponse:
     hardware = request.app.state.hardware
-    await live_session.stop(live_broadcaster, hardware)
+    await _controlled_session(request).stop(live_broadcaster, hardware)
     return OkResponse()
 
 
 @router.post("/live/blackout", response_model=OkResponse)
-async def live_blackout() -> OkResponse:
+async def live_blackout(request: Request) -> OkResponse:
+    live_session = _controlled_session(request)
     if not live_session.is_running:
         raise HTTPException(status_code=409, detail="No live session is running.")
-    await live_session.blackout(live_broadcaster)
+    with _render_errors():
+        await live_session.blackout(live_broadcaster)
     return OkResponse()
 
 
@@ -69,7 +167,7 @@ async def live_stream(ws: WebSocket) -> None:
     # Send current state immediately on connect
     try:
         import json
-        status_msg = live_session._status_message()
+        status_msg = ws.app.state.live_session._status_message()
         await ws.send_text(json.dumps(status_msg))
         while True:
             await ws.receive_text()
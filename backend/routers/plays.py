@@ -1,8 +1,14 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Request
+import heapq
+from typing import Annotated, Any
 
-from models import OkResponse, Play, PlaySummary
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response
+from pydantic import ValidationError
+
+from conditional import check_if_match, conditional_get, set_etag
+from json_patch import JsonPatchError, JsonPatchTestFailed, apply_patch
+from models import Cue, OkResponse, Play, PlayOutline, PlaySummary
 
 router = APIRouter(tags=["plays"])
 
@@ -10,51 +16,108 @@ router = APIRouter(tags=["plays"])
 # ── Overlap validation ─────────────────────────────────────────────────────────
 
 
-def _ranges_overlap(a_start: int, a_end: int, b_start: int, b_end: int) -> bool:
-    return a_start <= b_end and b_start <= a_end
-
-
-def validate_play(play: Play, storage) -> None:
-    # Build channel lookup to validate channelIds
-    channels = {ch.id: ch for ch in storage.load_channels()}
-
-    for region in play.regions:
-        if region.channelId not in channels:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Region '{region.name}' references unknown channel '{region.channelId}'.",
-            )
-
-    # Check per-cue cross-region range overlaps on the same channel
-    region_map = {r.id: r for r in play.regions}
+def _channel_intervals(play: Play) -> dict[str, list[tuple[int, int, int]]]:
+    """Every region range as ``(start, end, region_index)``, sorted per channel."""
+    by_channel: dict[str, list[tuple[int, int, int]]] = {}
+    for idx, region in enumerate(play.regions):
+        intervals = by_channel.setdefault(region.channelId, [])
+        intervals.extend((rng.start, rng.end, idx) for rng in region.ranges)
+    for intervals in by_channel.values():
+        intervals.sort()
+    return by_channel
+
+
+def _overlapping_pairs(
+    intervals: list[tuple[int, int, int]], assigned: set[int]
+) -> set[tuple[int, int]]:
+    """Sweep one channel's sorted intervals, keeping only assigned regions.
+
+    ``active`` is a min-heap of ``(end, region_index)`` for ranges that may
+    still overlap; everything left in it when a range starts overlaps it.
+    """
+    pairs: set[tuple[int, int]] = set()
+    active: list[tuple[int, int]] = []
+    for start, end, idx in intervals:
+        if idx not in assigned:
+            continue
+        while active and active[0][0] < start:
+            heapq.heappop(active)
+        for _, other in active:
+            if other != idx:
+                pairs.add((min(idx, other), max(idx, other)))
+        heapq.heappush(active, (end, idx))
+    return pairs
+
+
+def play_conflicts(
+    play: Play,
+    channel_ids: set[str],
+    cue_ids: set[str] | None = None,
+    region_ids: set[str] | None = None,
+) -> list[str]:
+    """All unknown-channel and per-cue overlap problems, as messages.
+
+    ``cue_ids`` and ``region_ids`` limit the checks to those cues and regions;
+    ``None`` checks everything.
+    """
+    problems = [
+        f"Region '{region.name}' references unknown channel '{region.channelId}'."
+        for region in play.regions
+        if (region_ids is None or region.id in region_ids)
+        and region.channelId not in channel_ids
+    ]
+
+    # Region intervals are built once per play; each cue sweeps only the
+    # channels its regions are on.
+    by_channel = _channel_intervals(play)
+    region_index = {r.id: idx for idx, r in enumerate(play.regions)}
     for cue in play.cues:
-        assigned_regions = [
-            region_map[rid]
-            for rid in cue.effectsByRegion
-            if rid in region_map
-        ]
-        for i, ra in enumerate(assigned_regions):
-            for rb in assigned_regions[i + 1 :]:
-                if ra.channelId != rb.channelId:
-                    continue
-                for rng_a in ra.ranges:
-                    for rng_b in rb.ranges:
-                        if _ranges_overlap(rng_a.start, rng_a.end, rng_b.start, rng_b.end):
-                            raise HTTPException(
-                                status_code=400,
-                                detail=(
-                                    f"Cue '{cue.name}': regions '{ra.name}' and '{rb.name}' "
-                                    f"have overlapping pixel ranges on channel '{ra.channelId}'."
-                                ),
-                            )
+        if cue_ids is not None and cue.id not in cue_ids:
+            continue
+        assigned = {region_index[rid] for rid in cue.effectsByRegion if rid in region_index}
+        if len(assigned) < 2:
+            continue
+        for channel_id in sorted({play.regions[idx].channelId for idx in assigned}):
+            for a, b in sorted(_overlapping_pairs(by_channel[channel_id], assigned)):
+                problems.append(
+                    f"Cue '{cue.name}': regions '{play.regions[a].name}' and "
+                    f"'{play.regions[b].name}' have overlapping pixel ranges on channel "
+                    f"'{channel_id}'."
+                )
+    return problems
+
+
+def validate_play(
+    play: Play,
+    storage,
+    cue_ids: set[str] | None = None,
+    region_ids: set[str] | None = None,
+) -> None:
+    """Raise 400 listing every conflict found by ``play_conflicts``."""
+    channel_ids = {ch.id for ch in storage.load_channels()}
+    problems = play_conflicts(play, channel_ids, cue_ids=cue_ids, region_ids=region_ids)
+    if problems:
+        raise HTTPException(status_code=400, detail="\n".join(problems))
 
 
 # ── Routes ─────────────────────────────────────────────────────────────────────
 
 
 @router.get("/plays", response_model=list[PlaySummary])
-def list_plays(request: Request) -> list[PlaySummary]:
-    return request.app.state.storage.list_plays()
+def list_plays(
+    request: Request,
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1),
+    q: str | None = None,
+) -> list[PlaySummary]:
+    storage = request.app.state.storage
+    not_modified = conditional_get(request, response, storage.plays_tag())
+    if not_modified is not None:
+        return not_modified
+    plays, total = storage.query_plays(offset, limit, q)
+    response.headers["X-Total-Count"] = str(total)
+    return plays
 
 
 @router.post("/plays", response_model=OkResponse, status_code=200)
@@ -66,22 +129,137 @@ def create_play(play: Play, request: Request) -> OkResponse:
 
 
 @router.get("/plays/{play_id}", response_model=Play)
-def get_play(play_id: str, request: Request) -> Play:
-    play = request.app.state.storage.load_play(play_id)
+def get_play(play_id: str, request: Request, response: Response) -> Play:
+    storage = request.app.state.storage
+    not_modified = conditional_get(request, response, storage.play_tag(play_id))
+    if not_modified is not None:
+        return not_modified
+    play = storage.load_play(play_id)
     if play is None:
         raise HTTPException(status_code=404, detail=f"Play '{play_id}' not found.")
     return play
 
 
-@router.put("/plays/{play_id}", response_model=OkResponse)
-def update_play(play_id: str, play: Play, request: Request) -> OkResponse:
+@router.get("/plays/{play_id}/outline", response_model=PlayOutline)
+def get_play_outline(play_id: str, request: Request, response: Response) -> PlayOutline:
+    storage = request.app.state.storage
+    not_modified = conditional_get(request, response, storage.play_tag(play_id))
+    if not_modified is not None:
+        return not_modified
+    outline = storage.load_outline(play_id)
+    if outline is None:
+        raise HTTPException(status_code=404, detail=f"Play '{play_id}' not found.")
+    return outline
+
+
+@router.get("/plays/{play_id}/cues", response_model=list[Cue])
+def list_cues(
+    play_id: str,
+    request: Request,
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1),
+) -> list[Cue]:
     storage = request.app.state.storage
-    if storage.load_play(play_id) is None:
+    not_modified = conditional_get(request, response, storage.play_tag(play_id))
+    if not_modified is not None:
+        return not_modified
+    result = storage.load_cues(play_id, offset, limit)
+    if result is None:
         raise HTTPException(status_code=404, detail=f"Play '{play_id}' not found.")
+    cues, total = result
+    response.headers["X-Total-Count"] = str(total)
+    return cues
+
+
+@router.get("/plays/{play_id}/cues/{cue_id}", response_model=Cue)
+def get_cue(play_id: str, cue_id: str, request: Request, response: Response) -> Cue:
+    storage = request.app.state.storage
+    not_modified = conditional_get(request, response, storage.play_tag(play_id))
+    if not_modified is not None:
+        return not_modified
+    cue = storage.load_cue(play_id, cue_id)
+    if cue is None:
+        if storage.load_outline(play_id) is None:
+            raise HTTPException(status_code=404, detail=f"Play '{play_id}' not found.")
+        raise HTTPException(status_code=404, detail=f"Cue '{cue_id}' not found.")
+    return cue
+
+
+@router.put("/plays/{play_id}", response_model=OkResponse)
+def update_play(play_id: str, play: Play, request: Request, response: Response) -> OkResponse:
+    storage = request.app.state.storage
     # Ensure URL id and body id agree
     play = play.model_copy(update={"id": play_id})
-    validate_play(play, storage)
-    storage.save_play(play)
+    # The tag check and the save must not interleave with another save
+    with storage.play_lock(play_id):
+        tag = storage.play_tag(play_id)
+        if tag is None:
+            raise HTTPException(status_code=404, detail=f"Play '{play_id}' not found.")
+        check_if_match(request, tag)
+        validate_play(play, storage)
+        storage.save_play(play)
+        set_etag(response, storage.play_tag(play_id))
+    return OkResponse()
+
+
+@router.patch("/plays/{play_id}", response_model=OkResponse)
+def patch_play(
+    play_id: str,
+    request: Request,
+    response: Response,
+    operations: Annotated[list[dict[str, Any]], Body()],
+) -> OkResponse:
+    storage = request.app.state.storage
+    with storage.play_lock(play_id):
+        # Tag and load under the lock, so no save can land between the
+        # If-Match check and this save
+        tag = storage.play_tag(play_id)
+        play = storage.load_play(play_id)
+        if tag is None or play is None:
+            raise HTTPException(status_code=404, detail=f"Play '{play_id}' not found.")
+        check_if_match(request, tag)
+
+        # Lists are copied so the cached play is never modified; untouched cues
+        # and regions stay the same model objects and skip re-validation below.
+        doc = {
+            "id": play.id,
+            "name": play.name,
+            "regions": list(play.regions),
+            "cues": list(play.cues),
+        }
+        try:
+            doc = apply_patch(doc, operations)
+        except JsonPatchTestFailed as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except JsonPatchError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not isinstance(doc, dict):
+            raise HTTPException(status_code=400, detail="Patched document is not an object.")
+
+        try:
+            patched = Play.model_validate({**doc, "id": play_id})
+        except ValidationError as e:
+            # Same shape as FastAPI's own request validation errors
+            errors = e.errors(include_url=False, include_context=False, include_input=False)
+            raise HTTPException(
+                status_code=422,
+                detail=[{**err, "loc": ["body", *err["loc"]]} for err in errors],
+            )
+
+        old_regions = {id(r) for r in play.regions}
+        old_cues = {id(c) for c in play.cues}
+        changed_regions = {r.id for r in patched.regions if id(r) not in old_regions}
+        kept_regions = {id(r) for r in patched.regions}
+        changed_regions |= {r.id for r in play.regions if id(r) not in kept_regions}
+        cue_ids = {
+            c.id
+            for c in patched.cues
+            if id(c) not in old_cues or not changed_regions.isdisjoint(c.effectsByRegion)
+        }
+        validate_play(patched, storage, cue_ids=cue_ids, region_ids=changed_regions)
+        storage.save_play(patched)
+        set_etag(response, storage.play_tag(play_id))
     return OkResponse()
 
 
@@ -98,7 +276,7 @@ def delete_play(play_id: str, request: Request) -> OkResponse:
 @router.post("/plays/{play_id}/regions/{region_id}/test", response_model=OkResponse)
 async def test_region(play_id: str, region_id: str, request: Request) -> OkResponse:
     storage = request.app.state.storage
-    play = storage.load_play(play_id)
+    play = await storage.aio.load_play(play_id)
     if play is None:
         raise HTTPException(status_code=404, detail=f"Play '{play_id}' not found.")
 
@@ -106,7 +284,7 @@ async def test_region(play_id: str, region_id: str, request: Request) -> OkRespo
     if region is None:
         raise HTTPException(status_code=404, detail=f"Region '{region_id}' not found.")
 
-    channels = {ch.id: ch for ch in storage.load_channels()}
+    channels = {ch.id: ch for ch in await storage.aio.load_channels()}
     ch = channels.get(region.channelId)
     if ch is None:
         raise HTTPException(
@@ -125,7 +303,7 @@ async def test_region(play_id: str, region_id: str, request: Request) -> OkRespo
 
     try:
         if hardware:
-            hardware.write_channel(ch.gpioPin, ch.ledCount, ch.colorOrder, pixels)
+            hardware.write_frame([ch], {ch.id: pixels})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
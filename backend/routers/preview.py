@@ -4,7 +4,7 @@ from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisco
 
 from engine.broadcaster import preview_broadcaster
 from engine.session import preview_session
-from models import OkResponse, PreviewStatus, StartPreviewRequest
+from models import GotoCueRequest, OkResponse, PreviewStatus, StartPreviewRequest
 
 router = APIRouter(tags=["preview"])
 
@@ -19,13 +19,13 @@ async def start_preview(body: StartPreviewRequest, request: Request) -> OkRespon
     storage = request.app.state.storage
     settings = request.app.state.settings
 
-    play = storage.load_play(body.playId)
+    play = await storage.aio.load_play(body.playId)
     if play is None:
         raise HTTPException(status_code=404, detail=f"Play '{body.playId}' not found.")
     if not play.cues:
         raise HTTPException(status_code=400, detail="Play has no cues.")
 
-    channels = storage.load_channels()
+    channels = await storage.aio.load_channels()
 
     # Clear any active hardware test signals before starting
     from routers.channels import clear_all_test_signals
@@ -43,6 +43,25 @@ async def preview_next() -> OkResponse:
     return OkResponse()
 
 
+@router.post("/preview/back", response_model=OkResponse)
+async def preview_back() -> OkResponse:
+    if not preview_session.is_running:
+        raise HTTPException(status_code=409, detail="No preview session is running.")
+    preview_session.back()
+    return OkResponse()
+
+
+@router.post("/preview/goto", response_model=OkResponse)
+async def preview_goto(body: GotoCueRequest) -> OkResponse:
+    if not preview_session.is_running:
+        raise HTTPException(status_code=409, detail="No preview session is running.")
+    try:
+        preview_session.goto(body.cueIndex)
+    except IndexError:
+        raise HTTPException(status_code=400, detail=f"Cue index {body.cueIndex} is out of range.")
+    return OkResponse()
+
+
 @router.post("/preview/stop", response_model=OkResponse)
 async def preview_stop() -> OkResponse:
     await preview_session.stop()
@@ -0,0 +1,197 @@
+"""Whole-show archives.
+
+A show archive is a gzip-compressed tar stream holding everything needed to
+move a show between systems::
+
+    manifest.json               format, version, creation time, play ids
+    channels.json               the channel list
+    plays/<id>.json             one file per play
+    backups/<id>/<name>         optional backup snapshots of each play
+    backups/<id>/index.json     name and creation time of those snapshots
+
+``iter_archive`` produces the archive one play at a time, so only a single
+play and the compressor's buffer are held in memory. ``read_archive`` reads
+and validates an archive file completely before anything is applied.
+"""
+from __future__ import annotations
+
+import io
+import json
+import tarfile
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pydantic import TypeAdapter, ValidationError
+
+from models import Channel, Play
+
+ARCHIVE_FORMAT = "pilites-show"
+ARCHIVE_VERSION = 1
+
+_channels_adapter = TypeAdapter(list[Channel])
+
+
+class ShowArchiveError(ValueError):
+    """The file is not a readable show archive."""
+
+
+@dataclass
+class ShowArchive:
+    channels: list[Channel]
+    plays: list[Play]
+    # play id -> (name, created_at, snapshot), oldest first
+    backups: dict[str, list[tuple[str, float, Play]]] = field(default_factory=dict)
+
+    @property
+    def backup_count(self) -> int:
+        return sum(len(entries) for entries in self.backups.values())
+
+
+# ── Writing ────────────────────────────────────────────────────────────────────
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only file that hands back what has been written so far."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> Iterator[bytes]:
+        if self._chunks:
+            data = b"".join(self._chunks)
+            self._chunks.clear()
+            yield data
+
+
+def _add_member(tar: tarfile.TarFile, name: str, data: bytes, mtime: float) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(mtime)
+    tar.addfile(info, io.BytesIO(data))
+
+
+def iter_archive(storage, include_backups: bool = False) -> Iterator[bytes]:
+    """Yield a show archive of ``storage`` as compressed chunks."""
+    now = time.time()
+    play_ids = [summary.id for summary in storage.list_plays()]
+    manifest = {
+        "format": ARCHIVE_FORMAT,
+        "version": ARCHIVE_VERSION,
+        "createdAt": now,
+        "plays": play_ids,
+        "backups": include_backups,
+    }
+    buf = _ChunkBuffer()
+    with tarfile.open(fileobj=buf, mode="w|gz") as tar:
+        _add_member(tar, "manifest.json", json.dumps(manifest).encode(), now)
+        channels = storage.load_channels()
+        _add_member(
+            tar, "channels.json", _channels_adapter.dump_json(channels), now
+        )
+        yield from buf.drain()
+        for play_id in play_ids:
+            play = storage.load_play(play_id)
+            if play is None:  # Deleted while exporting
+                continue
+            _add_member(tar, f"plays/{play_id}.json", play.model_dump_json().encode(), now)
+            if include_backups:
+                index = []
+                for entry in reversed(storage.list_backups(play_id)):
+                    snapshot = storage.load_backup(play_id, entry.name)
+                    if snapshot is None:
+                        continue
+                    created_at = entry.createdAt if entry.createdAt is not None else now
+                    _add_member(
+                        tar,
+                        f"backups/{play_id}/{entry.name}",
+                        snapshot.model_dump_json().encode(),
+                        created_at,
+                    )
+                    index.append({"name": entry.name, "createdAt": created_at})
+                if index:
+                    _add_member(
+                        tar, f"backups/{play_id}/index.json", json.dumps(index).encode(), now
+                    )
+            yield from buf.drain()
+    yield from buf.drain()
+
+
+# ── Reading ────────────────────────────────────────────────────────────────────
+
+
+def read_archive(path: Path, max_unpacked_bytes: int) -> ShowArchive:
+    """Parse and validate the archive at ``path``.
+
+    Raises ``ShowArchiveError`` naming the offending member, or if the
+    unpacked contents exceed ``max_unpacked_bytes``.
+    """
+    manifest = None
+    channels = None
+    plays: list[Play] = []
+    snapshots: dict[tuple[str, str], Play] = {}
+    indexes: dict[str, list[dict]] = {}
+    unpacked = 0
+    try:
+        with tarfile.open(path, mode="r|gz") as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                unpacked += member.size
+                if unpacked > max_unpacked_bytes:
+                    raise ShowArchiveError(
+                        f"Archive unpacks to more than {max_unpacked_bytes} bytes."
+                    )
+                data = tar.extractfile(member).read()
+                name = member.name
+                try:
+                    if name == "manifest.json":
+                        manifest = json.loads(data)
+                    elif name == "channels.json":
+                        channels = _channels_adapter.validate_json(data)
+                    elif name.startswith("plays/") and name.endswith(".json"):
+                        plays.append(Play.model_validate_json(data))
+                    elif name.startswith("backups/") and name.count("/") == 2:
+                        _, play_id, backup_name = name.split("/")
+                        if backup_name == "index.json":
+                            indexes[play_id] = json.loads(data)
+                        else:
+                            snapshots[(play_id, backup_name)] = Play.model_validate_json(data)
+                except (ValueError, ValidationError) as e:
+                    raise ShowArchiveError(f"Invalid archive member '{name}': {e}")
+    except (tarfile.TarError, EOFError, OSError) as e:
+        raise ShowArchiveError(f"Not a show archive: {e}")
+
+    if not isinstance(manifest, dict) or manifest.get("format") != ARCHIVE_FORMAT:
+        raise ShowArchiveError("Archive has no show manifest.")
+    if manifest.get("version") != ARCHIVE_VERSION:
+        raise ShowArchiveError(f"Unsupported archive version {manifest.get('version')!r}.")
+    if channels is None:
+        raise ShowArchiveError("Archive has no channels.json.")
+
+    backups: dict[str, list[tuple[str, float, Play]]] = {}
+    for play_id, index in indexes.items():
+        if not isinstance(index, list) or not all(isinstance(i, dict) for i in index):
+            raise ShowArchiveError(f"Invalid backup index for '{play_id}'.")
+        entries = []
+        for item in index:
+            snapshot = snapshots.get((play_id, item.get("name")))
+            if snapshot is None:
+                raise ShowArchiveError(f"Backup '{item.get('name')}' of '{play_id}' is missing.")
+            try:
+                created_at = float(item.get("createdAt", 0))
+            except (TypeError, ValueError):
+                raise ShowArchiveError(
+                    f"Backup '{item['name']}' of '{play_id}' has an invalid createdAt."
+                )
+            entries.append((item["name"], created_at, snapshot))
+        backups[play_id] = entries
+    return ShowArchive(channels=channels, plays=plays, backups=backups)
@@ -1,139 +1,1204 @@
+import asyncio
+import gzip
+import hashlib
 import json
+import logging
 import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
 from pathlib import Path
+from typing import Any
 
-from models import BackupEntry, Channel, Play, PlaySummary
+from pydantic import TypeAdapter
 
+from engine.compiled import (
+    CompiledPlay,
+    CompiledPlayError,
+    compile_play,
+    dump_compiled,
+    load_compiled,
+)
+from engine.gc_control import gc_paused
+from models import (
+    TRUSTED,
+    BackupEntry,
+    Channel,
+    ChannelRegionRef,
+    Cue,
+    CueSummary,
+    Play,
+    PlayOutline,
+    PlaySummary,
+)
 
-class Storage:
-    def __init__(self, data_dir: Path) -> None:
+logger = logging.getLogger(__name__)
+
+# Validated uploads kept in memory until applied
+_STAGED_IMPORT_CACHE_SIZE = 4
+
+_channels_adapter = TypeAdapter(list[Channel])
+
+
+def summarize_play(play: Play, modified_at: float | None) -> PlaySummary:
+    return PlaySummary(
+        id=play.id,
+        name=play.name,
+        cueCount=len(play.cues),
+        regionCount=len(play.regions),
+        totalPixels=sum(
+            rng.end - rng.start + 1 for region in play.regions for rng in region.ranges
+        ),
+        modifiedAt=modified_at,
+    )
+
+
+def play_outline(play: Play) -> PlayOutline:
+    return PlayOutline(
+        id=play.id,
+        name=play.name,
+        regions=play.regions,
+        cues=[CueSummary(id=cue.id, name=cue.name) for cue in play.cues],
+    )
+
+
+def region_extents(regions: list[dict]) -> dict[str, list[list]]:
+    """Group a play's regions by channel, from the play's JSON data.
+
+    Maps each channel id to ``[region id, region name, last pixel]`` for the
+    regions drawing on it. Regions without pixels are left out.
+    """
+    extents: dict[str, list[list]] = {}
+    for region in regions:
+        ranges = region.get("ranges") or []
+        if ranges:
+            extents.setdefault(region["channelId"], []).append(
+                [region["id"], region["name"], max(rng["end"] for rng in ranges)]
+            )
+    return extents
+
+
+def load_trusted_play(raw: bytes) -> Play:
+    """Build a play from JSON this app wrote and checksummed itself.
+
+    Field types are still checked, but the range validators are skipped and
+    automatic GC is paused while the models are created.
+    """
+    with gc_paused():
+        return Play.model_validate_json(raw, context=TRUSTED)
+
+
+def _detach(play: Play) -> Play:
+    """A copy of ``play`` with its own cue and region lists.
+
+    Cached plays are handed out and taken in this way, as ``load_channels``
+    copies its list: callers may add, remove or reorder cues and regions
+    without touching the cache. The cues and regions themselves are shared
+    and read-only; replace one to change it, as ``patch_play`` does.
+    """
+    return play.model_copy(update={"cues": list(play.cues), "regions": list(play.regions)})
+
+
+def content_hash(play: Play) -> str:
+    """SHA-256 of a play's compact JSON; the same hash its backup blob gets."""
+    return hashlib.sha256(play.model_dump_json().encode("utf-8")).hexdigest()
+
+
+def pack_snapshot(play: Play) -> tuple[str, bytes, int]:
+    """Hash and compress a play for backup.
+
+    Returns the SHA-256 of its compact JSON, the gzip-compressed JSON and the
+    uncompressed size. Compression is deterministic, so equal plays give
+    byte-identical blobs.
+    """
+    data = play.model_dump_json().encode("utf-8")
+    return hashlib.sha256(data).hexdigest(), gzip.compress(data, mtime=0), len(data)
+
+
+def unpack_snapshot(blob: bytes) -> Play:
+    return Play.model_validate_json(gzip.decompress(blob))
+
+
+class StorageBackend(ABC):
+    """Behaviour shared by every storage backend.
+
+    Backends decide where channels, plays and backups live. Write-behind saves
+    and per-play write ordering are handled here, and exports and staged
+    imports are always plain files under ``data_dir`` because they are
+    downloaded and uploaded as files.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        write_behind_sec: float | None = None,
+        max_backups: int = 0,
+    ) -> None:
         self.data_dir = data_dir
-        self._plays_dir = data_dir / "plays"
-        self._backups_dir = data_dir / "backups" / "plays"
+        # Backups kept per play; 0 keeps all
+        self.max_backups = max_backups
         self._exports_dir = data_dir / "exports" / "plays"
         self._imports_dir = data_dir / "imports" / "plays"
+        self._compiled_dir = data_dir / "compiled"
+        # Staged name -> play validated at upload, so applying skips a reparse
+        self._staged_imports: OrderedDict[str, Play] = OrderedDict()
+        self._staged_imports_lock = threading.Lock()
+        # key -> lock held for the whole of each write to that file or play
+        self._write_locks: dict[Hashable, threading.RLock] = {}
+        self._write_locks_guard = threading.Lock()
+        # Write-behind: play id -> latest unsaved play, and when it became dirty
+        self.write_behind_sec = write_behind_sec
+        self._pending: dict[str, Play] = {}
+        self._dirty_since: dict[str, float] = {}
+        self._pending_cond = threading.Condition()
+        self._writer: threading.Thread | None = None
+        self._closing = False
+        # Awaitable methods for async handlers; see AsyncStorage
+        self.aio = AsyncStorage(self)
+
+    def create_dirs(self) -> None:
+        for d in (self._exports_dir, self._imports_dir, self._compiled_dir):
+            d.mkdir(parents=True, exist_ok=True)
+
+    # ── Atomic write helper ────────────────────────────────────────────────────
+
+    def _write_lock(self, key: Hashable) -> threading.RLock:
+        with self._write_locks_guard:
+            lock = self._write_locks.get(key)
+            if lock is None:
+                lock = self._write_locks[key] = threading.RLock()
+            return lock
+
+    def _play_lock(self, play_id: str) -> threading.RLock:
+        return self._write_lock(("play", play_id))
+
+    def _atomic_write(self, path: Path, data: object) -> None:
+        self._atomic_write_bytes(path, json.dumps(data, indent=2).encode("utf-8"))
+
+    def _atomic_write_bytes(self, path: Path, data: bytes) -> None:
+        # Writers of the same file share its temp name, so they must not overlap
+        with self._write_lock(path):
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+
+    # ── Backend interface ──────────────────────────────────────────────────────
+
+    @abstractmethod
+    def cache_stats(self) -> dict: ...
+
+    @abstractmethod
+    def load_channels(self) -> list[Channel]: ...
+
+    @abstractmethod
+    def save_channels(self, channels: list[Channel]) -> None: ...
+
+    @abstractmethod
+    def _read_play(self, play_id: str) -> Play | None: ...
+
+    @abstractmethod
+    def _write_play(self, play: Play) -> None: ...
+
+    @abstractmethod
+    def _delete_play(self, play_id: str) -> bool: ...
+
+    @abstractmethod
+    def _source_key(self, play_id: str) -> list | None:
+        """A JSON-serializable key that changes whenever the stored play does."""
+
+    @abstractmethod
+    def _query_plays(
+        self, offset: int, limit: int | None, name_filter: str | None
+    ) -> tuple[list[PlaySummary], int]:
+        """Stored play summaries ordered by id, paginated, plus the total."""
+
+    @abstractmethod
+    def channels_tag(self) -> str:
+        """An opaque tag that changes whenever the stored channels do."""
+
+    @abstractmethod
+    def _play_tag(self, play_id: str) -> str | None:
+        """The stored play's content hash, or another tag unique to its content."""
+
+    @abstractmethod
+    def _plays_tag(self) -> str:
+        """An opaque tag that changes whenever any stored play is written or deleted."""
+
+    @abstractmethod
+    def _read_outline(self, play_id: str) -> PlayOutline | None: ...
+
+    @abstractmethod
+    def _read_cues(
+        self, play_id: str, offset: int, limit: int | None
+    ) -> tuple[list[Cue], int] | None:
+        """A slice of a stored play's cues plus its cue count."""
+
+    @abstractmethod
+    def _read_cue(self, play_id: str, cue_id: str) -> Cue | None: ...
+
+    @abstractmethod
+    def _regions_on_channel(self, channel_id: str) -> list[ChannelRegionRef]:
+        """Stored regions drawing on a channel, found without loading every play."""
+
+    @abstractmethod
+    def list_backups(
+        self, play_id: str, offset: int = 0, limit: int | None = None
+    ) -> list[BackupEntry]:
+        """Backups of a play, newest first."""
+
+    @abstractmethod
+    def create_backup(self, play: Play) -> BackupEntry:
+        """Snapshot a play, returning the latest backup instead if unchanged.
+
+        Older backups beyond ``max_backups`` are removed.
+        """
+
+    @abstractmethod
+    def load_backup(self, play_id: str, name: str) -> Play | None: ...
+
+    @abstractmethod
+    def add_backup(self, play_id: str, play: Play, name: str, created_at: float) -> BackupEntry:
+        """Store a snapshot under a given name and time, replacing any of that name."""
+
+    # ── Plays ──────────────────────────────────────────────────────────────────
+
+    def load_play(self, play_id: str) -> Play | None:
+        play = self._pending.get(play_id)
+        if play is None:
+            play = self._read_play(play_id)
+        return None if play is None else _detach(play)
+
+    def save_play(self, play: Play) -> None:
+        # The caller keeps its own lists, so later edits cannot reach the cache
+        play = _detach(play)
+        if self.write_behind_sec is None:
+            with self._play_lock(play.id):
+                self._write_play(play)
+                self._store_compiled(play)
+            return
+        with self._pending_cond:
+            self._pending[play.id] = play
+            self._dirty_since.setdefault(play.id, time.monotonic())
+            self._pending_cond.notify()
+        self._ensure_writer()
+
+    def delete_play(self, play_id: str) -> bool:
+        with self._play_lock(play_id):
+            with self._pending_cond:
+                had_pending = self._pending.pop(play_id, None) is not None
+                self._dirty_since.pop(play_id, None)
+            if self._compiled_dir.exists():
+                self._update_compiled_index(play_id, None)
+            return self._delete_play(play_id) or had_pending
+
+    def list_plays(
+        self,
+        offset: int = 0,
+        limit: int | None = None,
+        name_filter: str | None = None,
+    ) -> list[PlaySummary]:
+        return self.query_plays(offset, limit, name_filter)[0]
+
+    def query_plays(
+        self,
+        offset: int = 0,
+        limit: int | None = None,
+        name_filter: str | None = None,
+    ) -> tuple[list[PlaySummary], int]:
+        """Filtered, paginated play summaries plus the total before paging."""
+        with self._pending_cond:
+            pending = list(self._pending.values())
+        if not pending:
+            return self._query_plays(offset, limit, name_filter)
+
+        # Overlay unsaved plays on the stored summaries, then page in memory
+        stored, _ = self._query_plays(0, None, name_filter)
+        merged = {s.id: s for s in stored}
+        needle = name_filter.casefold() if name_filter else None
+        now = time.time()
+        for play in pending:
+            merged.pop(play.id, None)
+            if needle is None or needle in play.name.casefold():
+                merged[play.id] = summarize_play(play, now)
+        summaries = [merged[play_id] for play_id in sorted(merged)]
+        end = None if limit is None else offset + limit
+        return summaries[offset:end], len(summaries)
+
+    # Tags let the API answer conditional requests without loading anything.
+    # A play's tag is the content hash of the play, so it stays the same when
+    # a write-behind save reaches disk.
+
+    def play_lock(self, play_id: str) -> threading.RLock:
+        """The lock every save of a play takes.
+
+        Hold it across checking a play's tag and saving the play, so no other
+        save can land in between (``If-Match``).
+        """
+        return self._play_lock(play_id)
+
+    def play_tag(self, play_id: str) -> str | None:
+        pending = self._pending.get(play_id)
+        if pending is not None:
+            return content_hash(pending)
+        return self._play_tag(play_id)
+
+    def plays_tag(self) -> str | None:
+        """Tag for the play list; ``None`` while write-behind saves are pending."""
+        if self._pending:
+            return None
+        return self._plays_tag()
+
+    # Partial reads validate only the part of the play they return, so a large
+    # play can be opened from its outline and then a page of cues at a time.
+
+    def load_outline(self, play_id: str) -> PlayOutline | None:
+        pending = self._pending.get(play_id)
+        if pending is not None:
+            return play_outline(pending)
+        return self._read_outline(play_id)
+
+    def load_cues(
+        self, play_id: str, offset: int = 0, limit: int | None = None
+    ) -> tuple[list[Cue], int] | None:
+        """Cues ``offset`` to ``offset + limit`` of a play, plus its cue count."""
+        pending = self._pending.get(play_id)
+        if pending is not None:
+            end = None if limit is None else offset + limit
+            return pending.cues[offset:end], len(pending.cues)
+        return self._read_cues(play_id, offset, limit)
+
+    def load_cue(self, play_id: str, cue_id: str) -> Cue | None:
+        pending = self._pending.get(play_id)
+        if pending is not None:
+            return next((cue for cue in pending.cues if cue.id == cue_id), None)
+        return self._read_cue(play_id, cue_id)
+
+    def regions_on_channel(self, channel_id: str) -> list[ChannelRegionRef]:
+        """Regions of every play that draw on a channel, ordered by play id."""
+        with self._pending_cond:
+            pending = list(self._pending.values())
+        pending_ids = {play.id for play in pending}
+        refs = [r for r in self._regions_on_channel(channel_id) if r.playId not in pending_ids]
+        for play in pending:
+            extents = region_extents([r.model_dump() for r in play.regions])
+            refs.extend(
+                ChannelRegionRef(
+                    playId=play.id,
+                    playName=play.name,
+                    regionId=region_id,
+                    regionName=region_name,
+                    lastPixel=last_pixel,
+                )
+                for region_id, region_name, last_pixel in extents.get(channel_id, ())
+            )
+        refs.sort(key=lambda r: r.playId)
+        return refs
+
+    # ── Write-behind ───────────────────────────────────────────────────────────
+    #
+    # With ``write_behind_sec`` set, save_play only records the play in memory.
+    # Repeated saves of the same play are coalesced, and a background thread
+    # writes each dirty play once ``write_behind_sec`` has passed since it
+    # first became dirty, so no save waits longer than that to reach disk.
+
+    @property
+    def pending_writes(self) -> int:
+        return len(self._pending)
+
+    def _ensure_writer(self) -> None:
+        with self._pending_cond:
+            if self._writer is not None and self._writer.is_alive():
+                return
+            self._closing = False
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="storage-write-behind", daemon=True
+            )
+            self._writer.start()
+
+    def _writer_loop(self) -> None:
+        while True:
+            with self._pending_cond:
+                while True:
+                    if self._closing:
+                        return
+                    now = time.monotonic()
+                    due = [
+                        play_id
+                        for play_id, since in self._dirty_since.items()
+                        if now - since >= self.write_behind_sec
+                    ]
+                    if due:
+                        break
+                    timeout = None
+                    if self._dirty_since:
+                        timeout = min(self._dirty_since.values()) + self.write_behind_sec - now
+                    self._pending_cond.wait(timeout)
+            for play_id in due:
+                self._flush_play(play_id)
+
+    def _flush_play(self, play_id: str) -> None:
+        # Holding the play lock keeps writes of one play in order even when
+        # flush() and the writer thread race. The play stays in ``_pending``
+        # until it is stored so loads never see the older version meanwhile.
+        with self._play_lock(play_id):
+            with self._pending_cond:
+                play = self._pending.get(play_id)
+                self._dirty_since.pop(play_id, None)
+            if play is None:
+                return
+            try:
+                self._write_play(play)
+            except Exception:
+                logger.exception("Write-behind save of play %s failed; will retry", play_id)
+                with self._pending_cond:
+                    if play_id in self._pending:
+                        self._dirty_since.setdefault(play_id, time.monotonic())
+                return
+            self._store_compiled(play)
+            with self._pending_cond:
+                # A newer save made during the write stays pending
+                if self._pending.get(play_id) is play:
+                    del self._pending[play_id]
+
+    def flush(self) -> None:
+        """Write every pending play now."""
+        with self._pending_cond:
+            play_ids = list(self._pending)
+        for play_id in play_ids:
+            self._flush_play(play_id)
+
+    def close(self) -> None:
+        """Stop the write-behind thread and flush anything still pending."""
+        with self._pending_cond:
+            self._closing = True
+            self._pending_cond.notify_all()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        self.flush()
+
+    # ── Compiled plays ─────────────────────────────────────────────────────────
+    #
+    # compiled/<hash>.plc holds a play compiled by engine.compiled, named by
+    # the SHA-256 of the file. compiled/index.json maps each play id to its
+    # file and to the backend's source key for the stored play. A compiled
+    # file is used only while that key still matches, so a play changed by
+    # anything other than save_play is recompiled on its next load.
+
+    def _read_compiled_index(self) -> dict[str, dict]:
+        try:
+            path = self._compiled_dir / "index.json"
+            return json.loads(path.read_text(encoding="utf-8"))["plays"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return {}
+
+    def _update_compiled_index(self, play_id: str, entry: dict | None) -> None:
+        with self._write_lock("compiled"):
+            plays = self._read_compiled_index()
+            old = plays.pop(play_id, None)
+            if entry is not None:
+                plays[play_id] = entry
+            self._atomic_write(self._compiled_dir / "index.json", {"version": 1, "plays": plays})
+            if old is not None and old["hash"] not in {e["hash"] for e in plays.values()}:
+                (self._compiled_dir / f"{old['hash']}.plc").unlink(missing_ok=True)
+
+    def _store_compiled(self, play: Play) -> CompiledPlay | None:
+        """Compile a play that was just written. Failures are logged, not raised."""
+        try:
+            compiled = compile_play(play)
+            data = dump_compiled(compiled)
+            digest = hashlib.sha256(data).hexdigest()
+            path = self._compiled_dir / f"{digest}.plc"
+            if not path.exists():
+                self._compiled_dir.mkdir(parents=True, exist_ok=True)
+                self._atomic_write_bytes(path, data)
+            source = self._source_key(play.id)
+            self._update_compiled_index(play.id, {"source": source, "hash": digest})
+        except Exception:
+            logger.exception("Failed to compile play %s", play.id)
+            return None
+        compiled.path = path
+        return compiled
+
+    def load_compiled(self, play_id: str) -> CompiledPlay | None:
+        """A play ready for the engine, from the compiled cache when it is current.
+
+        A stale or unreadable cache entry is rebuilt from the stored play. A
+        play waiting in write-behind is compiled in memory only.
+        """
+        pending = self._pending.get(play_id)
+        if pending is not None:
+            return compile_play(pending)
+        with self._play_lock(play_id):
+            source = self._source_key(play_id)
+            if source is None:
+                return None
+            entry = self._read_compiled_index().get(play_id)
+            if entry is not None and entry.get("source") == source:
+                try:
+                    return load_compiled(self._compiled_dir / f"{entry['hash']}.plc")
+                except (OSError, CompiledPlayError) as e:
+                    logger.warning("Recompiling play %s: %s", play_id, e)
+            play = self._read_play(play_id)
+            if play is None:
+                return None
+            return self._store_compiled(play) or compile_play(play)
+
+    # ── Show import ────────────────────────────────────────────────────────────
+
+    def import_show(
+        self,
+        channels: list[Channel],
+        plays: list[Play],
+        backups: dict[str, list[tuple[str, float, Play]]] | None = None,
+        replace: bool = False,
+    ) -> None:
+        """Replace the channels and save ``plays`` as one unit.
+
+        With ``replace`` every play not in ``plays`` is deleted. Backups are
+        added first and kept even if the rest fails. If saving channels or
+        plays fails, the previous channels and plays are written back before
+        the error is raised. Plays are written immediately, even with
+        write-behind enabled.
+        """
+        self.flush()
+        incoming = {play.id for play in plays}
+        existing = {summary.id for summary in self.list_plays()}
+        removed = existing - incoming if replace else set()
+        previous_channels = self.load_channels()
+        previous = {play_id: self._read_play(play_id) for play_id in existing & (incoming | removed)}
+
+        for play_id, entries in (backups or {}).items():
+            for name, created_at, snapshot in entries:
+                self.add_backup(play_id, snapshot, name, created_at)
+        try:
+            self.save_channels(channels)
+            for play in plays:
+                with self._play_lock(play.id):
+                    self._write_play(play)
+            for play_id in removed:
+                self.delete_play(play_id)
+        except BaseException:
+            logger.exception("Show import failed; restoring previous channels and plays")
+            self.save_channels(previous_channels)
+            for play_id in incoming | removed:
+                with self._play_lock(play_id):
+                    old = previous.get(play_id)
+                    if old is None:
+                        self._delete_play(play_id)
+                    else:
+                        self._write_play(old)
+            raise
+
+    # ── Exports ────────────────────────────────────────────────────────────────
+
+    def create_export(self, play: Play) -> tuple[str, Path]:
+        timestamp = int(time.time())
+        name = f"play-{play.id}-{timestamp}.json"
+        path = self._exports_dir / name
+        self._atomic_write(path, play.model_dump())
+        return name, path
+
+    def export_path(self, name: str) -> Path | None:
+        path = self._exports_dir / name
+        return path if path.exists() else None
+
+    # ── Imports ────────────────────────────────────────────────────────────────
+
+    def stage_import(self, name: str, data: bytes) -> str:
+        timestamp = int(time.time())
+        staged_name = f"{Path(name).stem}-{timestamp}.json"
+        path = self._imports_dir / staged_name
+        path.write_bytes(data)
+        return staged_name
+
+    def import_upload_path(self) -> Path:
+        """Return a fresh temporary path to stream an upload into."""
+        return self._imports_dir / f".upload-{uuid.uuid4().hex}.part"
+
+    def stage_import_file(self, name: str, upload_path: Path) -> str:
+        """Validate an uploaded play file and stage it under a timestamped name.
+
+        Raises pydantic's ``ValidationError`` and removes the upload if the file
+        is not a valid play.
+        """
+        try:
+            play = Play.model_validate_json(upload_path.read_bytes())
+        except BaseException:
+            upload_path.unlink(missing_ok=True)
+            raise
+        timestamp = int(time.time())
+        staged_name = f"{Path(name).stem}-{timestamp}.json"
+        os.replace(upload_path, self._imports_dir / staged_name)
+        with self._staged_imports_lock:
+            self._staged_imports[staged_name] = play
+            self._staged_imports.move_to_end(staged_name)
+            while len(self._staged_imports) > _STAGED_IMPORT_CACHE_SIZE:
+                self._staged_imports.popitem(last=False)
+        return staged_name
+
+    def load_staged_import(self, name: str) -> Play | None:
+        path = self._imports_dir / name
+        if not path.exists():
+            return None
+        with self._staged_imports_lock:
+            play = self._staged_imports.get(name)
+        if play is not None:
+            return play
+        return Play.model_validate(json.loads(path.read_text(encoding="utf-8")))
+
+
+class Storage(StorageBackend):
+    """JSON-file backend: one file per play and for channels."""
+
+    def __init__(
+        self,
+        data_dir: Path,
+        write_behind_sec: float | None = None,
+        max_backups: int = 0,
+    ) -> None:
+        super().__init__(data_dir, write_behind_sec, max_backups)
+        self._plays_dir = data_dir / "plays"
+        self._backups_dir = data_dir / "backups" / "plays"
         self._channels_file = data_dir / "channels.json"
+        self._play_index_file = data_dir / "plays-index.json"
+        self._play_index: dict | None = None
+        self._index_lock = threading.Lock()
+        # path -> ((mtime_ns, size), validated value)
+        self._cache: dict[Path, tuple[tuple[int, int], Any]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Misses served by the checksum-verified fast path
+        self.trusted_loads = 0
+        # (path, file key, parsed JSON) of the last play read in parts
+        self._partial_source: tuple[Path, tuple[int, int], dict] | None = None
+        # Page requests that arrive together wait for one parse, not one each
+        self._partial_lock = threading.Lock()
 
     def create_dirs(self) -> None:
-        for d in (
-            self._plays_dir,
-            self._backups_dir,
-            self._exports_dir,
-            self._imports_dir,
-        ):
+        super().create_dirs()
+        for d in (self._plays_dir, self._backups_dir):
             d.mkdir(parents=True, exist_ok=True)
         if not self._channels_file.exists():
             self._atomic_write(self._channels_file, [])
 
-    # ── Atomic write helper ────────────────────────────────────────────────────
+    # ── Validated model cache ──────────────────────────────────────────────────
 
-    def _atomic_write(self, path: Path, data: object) -> None:
-        tmp = path.with_suffix(".tmp")
-        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
-        os.replace(tmp, path)
+    @staticmethod
+    def _file_key(path: Path) -> tuple[int, int]:
+        st = path.stat()
+        return (st.st_mtime_ns, st.st_size)
+
+    def _cached_load(
+        self,
+        path: Path,
+        parse: Callable[[bytes], Any],
+        trusted: tuple[str, Callable[[bytes], Any]] | None = None,
+    ) -> Any:
+        """Return the parsed, validated contents of ``path``.
+
+        Reuses the cached value while the file's mtime and size are unchanged,
+        so edits made outside this process are still picked up. ``parse`` and
+        the ``trusted`` parser both take the raw JSON bytes; ``trusted`` is a
+        SHA-256 recorded when the file was written and a parser that skips
+        the validators, used instead of ``parse`` when the file still matches.
+        """
+        key = self._file_key(path)
+        entry = self._cache.get(path)
+        if entry is not None and entry[0] == key:
+            self.cache_hits += 1
+            return entry[1]
+        self.cache_misses += 1
+        raw = path.read_bytes()
+        if trusted is not None and hashlib.sha256(raw).hexdigest() == trusted[0]:
+            self.trusted_loads += 1
+            value = trusted[1](raw)
+        else:
+            value = parse(raw)
+        self._cache[path] = (key, value)
+        return value
+
+    def _cache_store(self, path: Path, value: Any) -> None:
+        """Record a value we just wrote so the next load is a hit."""
+        try:
+            self._cache[path] = (self._file_key(path), value)
+        except FileNotFoundError:
+            self._cache.pop(path, None)
+
+    def cache_stats(self) -> dict:
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "entries": len(self._cache),
+        }
 
     # ── Channels ───────────────────────────────────────────────────────────────
 
     def load_channels(self) -> list[Channel]:
-        raw = json.loads(self._channels_file.read_text(encoding="utf-8"))
-        return [Channel.model_validate(c) for c in raw]
+        channels = self._cached_load(
+            self._channels_file,
+            _channels_adapter.validate_json,
+        )
+        # Callers may add or remove entries; keep the cached list intact
+        return list(channels)
 
     def save_channels(self, channels: list[Channel]) -> None:
         self._atomic_write(
             self._channels_file,
             [c.model_dump() for c in channels],
         )
+        self._cache_store(self._channels_file, list(channels))
 
     # ── Plays ──────────────────────────────────────────────────────────────────
 
     def _play_path(self, play_id: str) -> Path:
         return self._plays_dir / f"play-{play_id}.json"
 
-    def load_play(self, play_id: str) -> Play | None:
+    def _read_play(self, play_id: str) -> Play | None:
         path = self._play_path(play_id)
-        if not path.exists():
+        index = self._read_index()
+        checksum = index["plays"].get(path.name, {}).get("sha256") if index else None
+        trusted = (checksum, load_trusted_play) if checksum else None
+        try:
+            return self._cached_load(path, Play.model_validate_json, trusted)
+        except FileNotFoundError:
+            self._cache.pop(path, None)
             return None
-        return Play.model_validate(json.loads(path.read_text(encoding="utf-8")))
 
-    def save_play(self, play: Play) -> None:
-        self._atomic_write(self._play_path(play.id), play.model_dump())
+    def _write_play(self, play: Play) -> None:
+        path = self._play_path(play.id)
+        data = play.model_dump()
+        raw = json.dumps(data, indent=2).encode("utf-8")
+        dir_mtime = self._dir_mtime()
+        self._atomic_write_bytes(path, raw)
+        self._cache_store(path, play)
+        hashes = {"sha256": hashlib.sha256(raw).hexdigest(), "contentHash": content_hash(play)}
+        self._index_update(path, data, dir_mtime, hashes, self._file_key(path))
 
-    def delete_play(self, play_id: str) -> bool:
+    def _play_source(self, play_id: str) -> Play | dict | None:
+        """The play's cached model if there is one, otherwise its parsed JSON.
+
+        The JSON of the last play read this way is kept, so paging through
+        its cues parses the file once and validates each page on its own,
+        even when the pages are requested at the same time.
+        """
+        path = self._play_path(play_id)
+        try:
+            key = self._file_key(path)
+        except FileNotFoundError:
+            return None
+        entry = self._cache.get(path)
+        if entry is not None and entry[0] == key:
+            self.cache_hits += 1
+            return entry[1]
+        with self._partial_lock:
+            source = self._partial_source
+            if source is not None and source[0] == path and source[1] == key:
+                return source[2]
+            try:
+                data = json.loads(path.read_bytes())
+            except FileNotFoundError:
+                return None
+            self._partial_source = (path, key, data)
+            return data
+
+    def _read_outline(self, play_id: str) -> PlayOutline | None:
+        source = self._play_source(play_id)
+        if isinstance(source, Play):
+            return play_outline(source)
+        # Cue summaries take only the id and name of each cue
+        return None if source is None else PlayOutline.model_validate(source)
+
+    def _read_cues(
+        self, play_id: str, offset: int, limit: int | None
+    ) -> tuple[list[Cue], int] | None:
+        source = self._play_source(play_id)
+        if source is None:
+            return None
+        end = None if limit is None else offset + limit
+        if isinstance(source, Play):
+            return source.cues[offset:end], len(source.cues)
+        cues = source.get("cues", [])
+        return [Cue.model_validate(c) for c in cues[offset:end]], len(cues)
+
+    def _read_cue(self, play_id: str, cue_id: str) -> Cue | None:
+        source = self._play_source(play_id)
+        if isinstance(source, Play):
+            return next((cue for cue in source.cues if cue.id == cue_id), None)
+        for cue in source.get("cues", []) if source is not None else ():
+            if cue.get("id") == cue_id:
+                return Cue.model_validate(cue)
+        return None
+
+    def _play_tag(self, play_id: str) -> str | None:
+        path = self._play_path(play_id)
+        try:
+            key = self._file_key(path)
+        except FileNotFoundError:
+            return None
+        index = self._read_index()
+        entry = index["plays"].get(path.name) if index else None
+        if entry is not None and tuple(entry["fileKey"]) == key and "contentHash" in entry:
+            return entry["contentHash"]
+        # Written outside this app: the file's own (mtime, size) will do
+        return f"{key[0]:x}-{key[1]:x}"
+
+    def _plays_tag(self) -> str:
+        keys = [[entry["id"], entry["fileKey"]] for entry in self._index_entries()]
+        return hashlib.sha256(json.dumps(keys).encode("utf-8")).hexdigest()
+
+    def channels_tag(self) -> str:
+        mtime_ns, size = self._file_key(self._channels_file)
+        return f"{mtime_ns:x}-{size:x}"
+
+    def _source_key(self, play_id: str) -> list | None:
+        try:
+            return list(self._file_key(self._play_path(play_id)))
+        except FileNotFoundError:
+            return None
+
+    def _delete_play(self, play_id: str) -> bool:
         path = self._play_path(play_id)
+        self._cache.pop(path, None)
         if not path.exists():
             return False
+        dir_mtime = self._dir_mtime()
         path.unlink()
+        self._index_update(path, None, dir_mtime)
         return True
 
-    def list_plays(self) -> list[PlaySummary]:
-        summaries = []
-        for path in sorted(self._plays_dir.glob("play-*.json")):
+    def _query_plays(
+        self, offset: int, limit: int | None, name_filter: str | None
+    ) -> tuple[list[PlaySummary], int]:
+        entries = self._index_entries()
+        if name_filter:
+            needle = name_filter.casefold()
+            entries = [e for e in entries if needle in e["name"].casefold()]
+        entries.sort(key=lambda e: e["id"])
+        total = len(entries)
+        end = None if limit is None else offset + limit
+        return [PlaySummary.model_validate(e) for e in entries[offset:end]], total
+
+    def _regions_on_channel(self, channel_id: str) -> list[ChannelRegionRef]:
+        return [
+            ChannelRegionRef(
+                playId=entry["id"],
+                playName=entry["name"],
+                regionId=region_id,
+                regionName=region_name,
+                lastPixel=last_pixel,
+            )
+            for entry in self._index_entries()
+            for region_id, region_name, last_pixel in entry["channels"].get(channel_id, ())
+        ]
+
+    # ── Play summary index ─────────────────────────────────────────────────────
+    #
+    # plays-index.json maps each play file name to its summary and the file's
+    # (mtime_ns, size). Each listing stats the play files and trusts the index
+    # while every file matches its entry; any outside change (a file added,
+    # removed or overwritten in place) triggers an incremental rebuild that
+    # only re-reads files whose mtime or size changed.
+    #
+    # Entries for files written by _write_play also carry the SHA-256 of the
+    # bytes written. A file that still matches it is loaded without the full
+    # model validation (see load_trusted_play). A rebuild never records a
+    # checksum for a file it had to re-read. They also carry the play's
+    # content hash, which is its ETag while the file is unchanged.
+    #
+    # Each entry also maps the channels the play draws on to its regions there
+    # and their last pixel (see region_extents), so a channel change can find
+    # the regions it affects without opening any play file. Version 1 indexes
+    # lack this and are rebuilt in full.
+
+    _INDEX_VERSION = 2
+
+    @staticmethod
+    def _summarize(data: dict, key: tuple[int, int], hashes: dict | None = None) -> dict:
+        regions = data.get("regions", [])
+        entry = {
+            "id": data["id"],
+            "name": data["name"],
+            "cueCount": len(data.get("cues", [])),
+            "regionCount": len(regions),
+            "totalPixels": sum(
+                rng["end"] - rng["start"] + 1
+                for region in regions
+                for rng in region.get("ranges", [])
+            ),
+            "modifiedAt": key[0] / 1e9,
+            "fileKey": list(key),
+            "channels": region_extents(regions),
+        }
+        if hashes:
+            entry.update(hashes)
+        return entry
+
+    def _dir_mtime(self) -> int:
+        return self._plays_dir.stat().st_mtime_ns
+
+    def _write_index(self, index: dict) -> None:
+        index["dirMtimeNs"] = self._dir_mtime()
+        self._atomic_write(self._play_index_file, index)
+        self._play_index = index
+
+    def _read_index(self) -> dict | None:
+        if self._play_index is not None:
+            return self._play_index
+        try:
+            index = json.loads(self._play_index_file.read_text(encoding="utf-8"))
+            if index.get("version") == self._INDEX_VERSION:
+                return index
+        except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+            pass
+        return None
+
+    def rebuild_play_index(self) -> None:
+        """Reconcile the index with the plays directory.
+
+        Files whose (mtime, size) match their index entry are not re-read.
+        """
+        with self._index_lock:
+            old = (self._read_index() or {}).get("plays", {})
+            plays = {}
+            for path in sorted(self._plays_dir.glob("play-*.json")):
+                try:
+                    key = self._file_key(path)
+                except FileNotFoundError:
+                    continue
+                entry = old.get(path.name)
+                if entry is not None and tuple(entry["fileKey"]) == key:
+                    plays[path.name] = entry
+                    continue
+                try:
+                    raw = json.loads(path.read_text(encoding="utf-8"))
+                    plays[path.name] = self._summarize(raw, key)
+                except (KeyError, TypeError, json.JSONDecodeError):
+                    continue
+            self._write_index({"version": self._INDEX_VERSION, "plays": plays})
+
+    def _index_current(self, index: dict) -> bool:
+        """Whether every play file matches its entry and no entry is orphaned."""
+        plays = index["plays"]
+        count = 0
+        for path in self._plays_dir.glob("play-*.json"):
+            entry = plays.get(path.name)
             try:
-                raw = json.loads(path.read_text(encoding="utf-8"))
-                summaries.append(PlaySummary(id=raw["id"], name=raw["name"]))
-            except (KeyError, json.JSONDecodeError):
-                continue
-        return summaries
+                key = self._file_key(path)
+            except FileNotFoundError:
+                return False
+            if entry is None or tuple(entry["fileKey"]) != key:
+                return False
+            count += 1
+        return count == len(plays)
+
+    def _index_entries(self) -> list[dict]:
+        index = self._read_index()
+        if index is None or not self._index_current(index):
+            self.rebuild_play_index()
+            index = self._play_index
+        return [index["plays"][name] for name in sorted(index["plays"])]
+
+    def _index_update(
+        self,
+        path: Path,
+        data: dict | None,
+        dir_mtime_before: int,
+        hashes: dict | None = None,
+        written_key: tuple[int, int] | None = None,
+    ) -> None:
+        """Apply one save or delete to the index.
+
+        ``dir_mtime_before`` is the plays directory mtime from just before the
+        write; if the index did not match it, something else changed the
+        directory too and the index is reconciled instead.
+        """
+        with self._index_lock:
+            index = self._read_index()
+            stale = index is None or index.get("dirMtimeNs") != dir_mtime_before
+        if stale:
+            self.rebuild_play_index()
+            if not hashes:
+                return
+            # The checksum is safe even if the file changed again, as loads
+            # compare it against the bytes they read; the content hash only
+            # if the rebuild saw the file as it was written
+            with self._index_lock:
+                plays = dict(self._play_index["plays"])
+                entry = plays.get(path.name)
+                if entry is not None:
+                    if tuple(entry["fileKey"]) != written_key:
+                        hashes = {"sha256": hashes["sha256"]}
+                    plays[path.name] = {**entry, **hashes}
+                    self._write_index({"version": self._INDEX_VERSION, "plays": plays})
+            return
+        with self._index_lock:
+            plays = dict(index["plays"])
+            if data is None:
+                plays.pop(path.name, None)
+            else:
+                plays[path.name] = self._summarize(data, self._file_key(path), hashes)
+            self._write_index({"version": self._INDEX_VERSION, "plays": plays})
 
     # ── Backups ────────────────────────────────────────────────────────────────
+    #
+    # backups/plays/play-<id>/ holds gzip-compressed snapshots named by the
+    # SHA-256 of their JSON (blobs/<hash>.json.gz) and index.json, which lists
+    # the backups oldest first with their name, creation time, hash, size and
+    # cue count. Backups with the same content share one blob, and a blob is
+    # deleted once no index entry refers to it. Directories written before the
+    # index existed hold one plain JSON file per backup; they are converted on
+    # first access.
 
     def _backup_dir(self, play_id: str) -> Path:
         return self._backups_dir / f"play-{play_id}"
 
-    def list_backups(self, play_id: str) -> list[BackupEntry]:
-        d = self._backup_dir(play_id)
-        if not d.exists():
-            return []
-        entries = []
-        for path in sorted(d.glob("*.json"), reverse=True):
-            entries.append(BackupEntry(name=path.name, path=str(path)))
+    def _blob_path(self, play_id: str, digest: str) -> Path:
+        return self._backup_dir(play_id) / "blobs" / f"{digest}.json.gz"
+
+    def _backup_entry(self, play_id: str, entry: dict) -> BackupEntry:
+        return BackupEntry(path=str(self._blob_path(play_id, entry["hash"])), **entry)
+
+    def _read_backup_index(self, play_id: str) -> list[dict]:
+        path = self._backup_dir(play_id) / "index.json"
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))["backups"]
+        except FileNotFoundError:
+            return self._convert_legacy_backups(play_id)
+
+    def _write_backup_index(self, play_id: str, entries: list[dict]) -> None:
+        entries.sort(key=lambda e: (e["createdAt"], e["name"]))
+        self._atomic_write(
+            self._backup_dir(play_id) / "index.json", {"version": 1, "backups": entries}
+        )
+        # Drop blobs no longer referenced, now that the index no longer needs them
+        blobs_dir = self._backup_dir(play_id) / "blobs"
+        keep = {e["hash"] for e in entries}
+        for blob in blobs_dir.glob("*.json.gz") if blobs_dir.exists() else ():
+            if blob.name.removesuffix(".json.gz") not in keep:
+                blob.unlink(missing_ok=True)
+
+    def _store_blob(self, play_id: str, play: Play, name: str, created_at: float) -> dict:
+        digest, blob, size = pack_snapshot(play)
+        path = self._blob_path(play_id, digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._atomic_write_bytes(path, blob)
+        return {
+            "name": name,
+            "createdAt": created_at,
+            "hash": digest,
+            "size": size,
+            "cueCount": len(play.cues),
+        }
+
+    def _convert_legacy_backups(self, play_id: str) -> list[dict]:
+        legacy = sorted(self._backup_dir(play_id).glob("*.json"))
+        entries, converted = [], []
+        for path in legacy:
+            try:
+                play = Play.model_validate_json(path.read_bytes())
+            except ValueError as e:
+                logger.warning("Leaving unreadable backup %s in place: %s", path, e)
+                continue
+            stamp = path.stem.rsplit("-", 1)[-1]
+            created_at = float(stamp) if stamp.isdigit() else path.stat().st_mtime
+            entries.append(self._store_blob(play_id, play, path.name, created_at))
+            converted.append(path)
+        if converted:
+            self._write_backup_index(play_id, entries)
+            for path in converted:
+                path.unlink()
         return entries
 
+    def list_backups(
+        self, play_id: str, offset: int = 0, limit: int | None = None
+    ) -> list[BackupEntry]:
+        if not self._backup_dir(play_id).exists():
+            return []
+        with self._write_lock(("backups", play_id)):
+            entries = self._read_backup_index(play_id)
+        newest_first = entries[::-1]
+        end = None if limit is None else offset + limit
+        return [self._backup_entry(play_id, e) for e in newest_first[offset:end]]
+
     def create_backup(self, play: Play) -> BackupEntry:
-        import time
+        with self._write_lock(("backups", play.id)):
+            self._backup_dir(play.id).mkdir(parents=True, exist_ok=True)
+            entries = self._read_backup_index(play.id)
+            digest = pack_snapshot(play)[0]
+            if entries and entries[-1]["hash"] == digest:
+                return self._backup_entry(play.id, entries[-1])
+            now = time.time()
+            name = f"play-{play.id}-{int(now)}.json"
+            entry = self._store_blob(play.id, play, name, now)
+            entries = [e for e in entries if e["name"] != name] + [entry]
+            if self.max_backups > 0:
+                entries = entries[-self.max_backups :]
+            self._write_backup_index(play.id, entries)
+        return self._backup_entry(play.id, entry)
 
-        d = self._backup_dir(play.id)
-        d.mkdir(parents=True, exist_ok=True)
-        timestamp = int(time.time())
-        name = f"play-{play.id}-{timestamp}.json"
-        path = d / name
-        self._atomic_write(path, play.model_dump())
-        return BackupEntry(name=name, path=str(path))
+    def add_backup(self, play_id: str, play: Play, name: str, created_at: float) -> BackupEntry:
+        with self._write_lock(("backups", play_id)):
+            self._backup_dir(play_id).mkdir(parents=True, exist_ok=True)
+            entries = self._read_backup_index(play_id)
+            entry = self._store_blob(play_id, play, name, created_at)
+            entries = [e for e in entries if e["name"] != name] + [entry]
+            self._write_backup_index(play_id, entries)
+        return self._backup_entry(play_id, entry)
 
     def load_backup(self, play_id: str, name: str) -> Play | None:
-        path = self._backup_dir(play_id) / name
-        if not path.exists():
+        if not self._backup_dir(play_id).exists():
             return None
-        return Play.model_validate(json.loads(path.read_text(encoding="utf-8")))
+        with self._write_lock(("backups", play_id)):
+            entries = self._read_backup_index(play_id)
+        entry = next((e for e in entries if e["name"] == name), None)
+        if entry is None:
+            return None
+        return unpack_snapshot(self._blob_path(play_id, entry["hash"]).read_bytes())
 
-    # ── Exports ────────────────────────────────────────────────────────────────
 
-    def create_export(self, play: Play) -> tuple[str, Path]:
-        import time
+def create_storage(
+    backend: str,
+    data_dir: Path,
+    write_behind_sec: float | None = None,
+    max_backups: int = 0,
+) -> StorageBackend:
+    if backend == "sqlite":
+        from storage_sqlite import SqliteStorage
 
-        timestamp = int(time.time())
-        name = f"play-{play.id}-{timestamp}.json"
-        path = self._exports_dir / name
-        self._atomic_write(path, play.model_dump())
-        return name, path
+        return SqliteStorage(data_dir, write_behind_sec, max_backups)
+    if backend != "json":
+        raise ValueError(f"Unknown storage backend {backend!r}; expected 'json' or 'sqlite'.")
+    return Storage(data_dir, write_behind_sec, max_backups)
 
-    def export_path(self, name: str) -> Path | None:
-        path = self._exports_dir / name
-        return path if path.exists() else None
 
-    # ── Imports ────────────────────────────────────────────────────────────────
+class AsyncStorage:
+    """Awaitable wrappers around a storage backend for async route handlers.
 
-    def stage_import(self, name: str, data: bytes) -> str:
-        import time
+    Each call runs the synchronous method in a worker thread so file reads and
+    writes never block the event loop that drives the in-process frame loop.
+    Synchronous handlers already run in a thread pool and use the backend
+    directly.
+    """
 
-        timestamp = int(time.time())
-        staged_name = f"{Path(name).stem}-{timestamp}.json"
-        path = self._imports_dir / staged_name
-        path.write_bytes(data)
-        return staged_name
+    def __init__(self, storage: StorageBackend) -> None:
+        self._storage = storage
 
-    def load_staged_import(self, name: str) -> Play | None:
-        path = self._imports_dir / name
-        if not path.exists():
-            return None
-        return Play.model_validate(json.loads(path.read_text(encoding="utf-8")))
+    async def load_channels(self) -> list[Channel]:
+        return await asyncio.to_thread(self._storage.load_channels)
+
+    async def load_play(self, play_id: str) -> Play | None:
+        return await asyncio.to_thread(self._storage.load_play, play_id)
+
+    async def save_play(self, play: Play) -> None:
+        await asyncio.to_thread(self._storage.save_play, play)
+
+    async def load_compiled(self, play_id: str) -> CompiledPlay | None:
+        return await asyncio.to_thread(self._storage.load_compiled, play_id)
+
+    async def stage_import_file(self, name: str, upload_path: Path) -> str:
+        return await asyncio.to_thread(self._storage.stage_import_file, name, upload_path)
@@ -0,0 +1,648 @@
+"""SQLite storage backend.
+
+Channels, plays and backups live in ``<data_dir>/pilites.db``, opened in WAL
+mode so readers never wait for a writer. Each play is a row in ``plays`` with
+its summary columns, and its regions and cues are rows in their own tables, so
+listing, searching and paginating are indexed queries instead of directory
+scans. Exports and staged imports stay as files (see ``StorageBackend``).
+
+An existing JSON data directory is copied in with::
+
+    python -m storage_sqlite migrate [--data-dir DIR]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from models import (
+    BackupEntry,
+    Channel,
+    ChannelRegionRef,
+    Cue,
+    Play,
+    PlayOutline,
+    PlaySummary,
+)
+from storage import (
+    Storage,
+    StorageBackend,
+    content_hash,
+    pack_snapshot,
+    summarize_play,
+    unpack_snapshot,
+)
+
+logger = logging.getLogger(__name__)
+
+DB_NAME = "pilites.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('revision', 0);
+
+CREATE TABLE IF NOT EXISTS channels (
+    position INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS plays (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    revision INTEGER NOT NULL,
+    modified_at REAL NOT NULL,
+    cue_count INTEGER NOT NULL,
+    region_count INTEGER NOT NULL,
+    total_pixels INTEGER NOT NULL,
+    content_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS plays_name ON plays (name COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS regions (
+    play_id TEXT NOT NULL REFERENCES plays (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    channel_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (play_id, position)
+);
+CREATE INDEX IF NOT EXISTS regions_channel ON regions (channel_id, play_id);
+
+CREATE TABLE IF NOT EXISTS cues (
+    play_id TEXT NOT NULL REFERENCES plays (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (play_id, position)
+);
+
+CREATE TABLE IF NOT EXISTS backup_blobs (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS backups (
+    play_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    hash TEXT NOT NULL REFERENCES backup_blobs (hash),
+    size INTEGER NOT NULL,
+    cue_count INTEGER NOT NULL,
+    PRIMARY KEY (play_id, name)
+);
+CREATE INDEX IF NOT EXISTS backups_created ON backups (play_id, created_at);
+"""
+
+# plays.content_hash is the SHA-256 of the play's compact JSON (see
+# storage.content_hash). Databases created before it existed get the column
+# on open, and their plays have none until saved again.
+#
+# Backups are not tied to the plays table so they outlive a deleted play,
+# as they do in the JSON backend. Their content is a gzip-compressed snapshot
+# in backup_blobs, keyed by SHA-256 and shared by identical backups.
+
+
+def _like_pattern(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class SqliteStorage(StorageBackend):
+    def __init__(
+        self,
+        data_dir: Path,
+        write_behind_sec: float | None = None,
+        max_backups: int = 0,
+    ) -> None:
+        super().__init__(data_dir, write_behind_sec, max_backups)
+        self.db_path = data_dir / DB_NAME
+        # One connection per thread; all are closed by close()
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        # Validated models keyed by the revision they were stored at. Every
+        # write takes a new revision from ``meta``, so a changed row (even
+        # from another process) is never mistaken for the cached one.
+        self._plays_cache: dict[str, tuple[int, Play]] = {}
+        self._channels_cache: tuple[int, list[Channel]] | None = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def create_dirs(self) -> None:
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        super().create_dirs()
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        if "content_hash" not in {row[1] for row in conn.execute("PRAGMA table_info(plays)")}:
+            conn.execute("ALTER TABLE plays ADD COLUMN content_hash TEXT")
+
+    # ── Connections ────────────────────────────────────────────────────────────
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly below
+            conn = sqlite3.connect(
+                self.db_path, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _transaction(self, write: bool = False) -> Iterator[sqlite3.Connection]:
+        """A read snapshot, or with ``write`` an immediate write transaction."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _next_revision(conn: sqlite3.Connection) -> int:
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'revision'")
+        return conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+
+    @staticmethod
+    def _meta(conn: sqlite3.Connection, key: str) -> int:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _set_plays_revision(conn: sqlite3.Connection, revision: int) -> None:
+        """Record the revision of the latest play write or delete, for ``plays_tag``."""
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('plays_revision', ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (revision,),
+        )
+
+    def close(self) -> None:
+        super().close()
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+            self._local = threading.local()
+
+    def cache_stats(self) -> dict:
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "entries": len(self._plays_cache) + (1 if self._channels_cache else 0),
+        }
+
+    # ── Channels ───────────────────────────────────────────────────────────────
+
+    def load_channels(self) -> list[Channel]:
+        with self._transaction() as conn:
+            revision = self._meta(conn, "channels_revision")
+            cached = self._channels_cache
+            if cached is not None and cached[0] == revision:
+                self.cache_hits += 1
+                return list(cached[1])
+            self.cache_misses += 1
+            rows = conn.execute("SELECT data FROM channels ORDER BY position").fetchall()
+        channels = [Channel.model_validate_json(data) for (data,) in rows]
+        self._channels_cache = (revision, channels)
+        return list(channels)
+
+    def _insert_channels(self, conn: sqlite3.Connection, channels: list[Channel]) -> int:
+        revision = self._next_revision(conn)
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('channels_revision', ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (revision,),
+        )
+        conn.execute("DELETE FROM channels")
+        conn.executemany(
+            "INSERT INTO channels (position, id, data) VALUES (?, ?, ?)",
+            [(i, c.id, c.model_dump_json()) for i, c in enumerate(channels)],
+        )
+        return revision
+
+    def channels_tag(self) -> str:
+        with self._transaction() as conn:
+            return f"r{self._meta(conn, 'channels_revision')}"
+
+    def save_channels(self, channels: list[Channel]) -> None:
+        with self._transaction(write=True) as conn:
+            revision = self._insert_channels(conn, channels)
+        self._channels_cache = (revision, list(channels))
+
+    # ── Plays ──────────────────────────────────────────────────────────────────
+
+    def _read_play(self, play_id: str) -> Play | None:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT name, revision FROM plays WHERE id = ?", (play_id,)
+            ).fetchone()
+            if row is None:
+                self._plays_cache.pop(play_id, None)
+                return None
+            name, revision = row
+            cached = self._plays_cache.get(play_id)
+            if cached is not None and cached[0] == revision:
+                self.cache_hits += 1
+                return cached[1]
+            self.cache_misses += 1
+            regions = conn.execute(
+                "SELECT data FROM regions WHERE play_id = ? ORDER BY position", (play_id,)
+            ).fetchall()
+            cues = conn.execute(
+                "SELECT data FROM cues WHERE play_id = ? ORDER BY position", (play_id,)
+            ).fetchall()
+        play = Play.model_validate(
+            {
+                "id": play_id,
+                "name": name,
+                "regions": [json.loads(data) for (data,) in regions],
+                "cues": [json.loads(data) for (data,) in cues],
+            }
+        )
+        self._plays_cache[play_id] = (revision, play)
+        return play
+
+    def _insert_play(self, conn: sqlite3.Connection, play: Play, modified_at: float) -> int:
+        revision = self._next_revision(conn)
+        summary = summarize_play(play, modified_at)
+        conn.execute(
+            "INSERT INTO plays "
+            "(id, name, revision, modified_at, cue_count, region_count, total_pixels, "
+            "content_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET name = excluded.name, "
+            "revision = excluded.revision, modified_at = excluded.modified_at, "
+            "cue_count = excluded.cue_count, region_count = excluded.region_count, "
+            "total_pixels = excluded.total_pixels, content_hash = excluded.content_hash",
+            (
+                play.id,
+                play.name,
+                revision,
+                modified_at,
+                summary.cueCount,
+                summary.regionCount,
+                summary.totalPixels,
+                content_hash(play),
+            ),
+        )
+        self._set_plays_revision(conn, revision)
+        conn.execute("DELETE FROM regions WHERE play_id = ?", (play.id,))
+        conn.execute("DELETE FROM cues WHERE play_id = ?", (play.id,))
+        conn.executemany(
+            "INSERT INTO regions (play_id, position, id, channel_id, data) VALUES (?, ?, ?, ?, ?)",
+            [
+                (play.id, i, r.id, r.channelId, r.model_dump_json())
+                for i, r in enumerate(play.regions)
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO cues (play_id, position, id, name, data) VALUES (?, ?, ?, ?, ?)",
+            [(play.id, i, c.id, c.name, c.model_dump_json()) for i, c in enumerate(play.cues)],
+        )
+        return revision
+
+    def _write_play(self, play: Play) -> None:
+        with self._transaction(write=True) as conn:
+            revision = self._insert_play(conn, play, time.time())
+        self._plays_cache[play.id] = (revision, play)
+
+    def _read_outline(self, play_id: str) -> PlayOutline | None:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT name FROM plays WHERE id = ?", (play_id,)).fetchone()
+            if row is None:
+                return None
+            regions = conn.execute(
+                "SELECT data FROM regions WHERE play_id = ? ORDER BY position", (play_id,)
+            ).fetchall()
+            cues = conn.execute(
+                "SELECT id, name FROM cues WHERE play_id = ? ORDER BY position", (play_id,)
+            ).fetchall()
+        return PlayOutline.model_validate(
+            {
+                "id": play_id,
+                "name": row[0],
+                "regions": [json.loads(data) for (data,) in regions],
+                "cues": [{"id": cue_id, "name": name} for cue_id, name in cues],
+            }
+        )
+
+    def _read_cues(
+        self, play_id: str, offset: int, limit: int | None
+    ) -> tuple[list[Cue], int] | None:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT cue_count FROM plays WHERE id = ?", (play_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            rows = conn.execute(
+                "SELECT data FROM cues WHERE play_id = ? ORDER BY position LIMIT ? OFFSET ?",
+                (play_id, -1 if limit is None else limit, offset),
+            ).fetchall()
+        return [Cue.model_validate_json(data) for (data,) in rows], row[0]
+
+    def _read_cue(self, play_id: str, cue_id: str) -> Cue | None:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT data FROM cues WHERE play_id = ? AND id = ?", (play_id, cue_id)
+            ).fetchone()
+        return None if row is None else Cue.model_validate_json(row[0])
+
+    def _source_key(self, play_id: str) -> list | None:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT revision FROM plays WHERE id = ?", (play_id,)).fetchone()
+        return None if row is None else [row[0]]
+
+    def _delete_play(self, play_id: str) -> bool:
+        self._plays_cache.pop(play_id, None)
+        with self._transaction(write=True) as conn:
+            if conn.execute("DELETE FROM plays WHERE id = ?", (play_id,)).rowcount == 0:
+                return False
+            self._set_plays_revision(conn, self._next_revision(conn))
+        return True
+
+    def _play_tag(self, play_id: str) -> str | None:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT content_hash, revision FROM plays WHERE id = ?", (play_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0] or f"r{row[1]}"
+
+    def _plays_tag(self) -> str:
+        with self._transaction() as conn:
+            return f"r{self._meta(conn, 'plays_revision')}"
+
+    def _query_plays(
+        self, offset: int, limit: int | None, name_filter: str | None
+    ) -> tuple[list[PlaySummary], int]:
+        where, params = "", []
+        if name_filter:
+            where, params = "WHERE name LIKE ? ESCAPE '\\'", [_like_pattern(name_filter)]
+        with self._transaction() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM plays {where}", params).fetchone()[0]
+            rows = conn.execute(
+                "SELECT id, name, cue_count, region_count, total_pixels, modified_at "
+                f"FROM plays {where} ORDER BY id LIMIT ? OFFSET ?",
+                [*params, -1 if limit is None else limit, offset],
+            ).fetchall()
+        return [
+            PlaySummary(
+                id=row[0],
+                name=row[1],
+                cueCount=row[2],
+                regionCount=row[3],
+                totalPixels=row[4],
+                modifiedAt=row[5],
+            )
+            for row in rows
+        ], total
+
+    def _regions_on_channel(self, channel_id: str) -> list[ChannelRegionRef]:
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT regions.play_id, plays.name, regions.data FROM regions "
+                "JOIN plays ON plays.id = regions.play_id WHERE regions.channel_id = ? "
+                "ORDER BY regions.play_id, regions.position",
+                (channel_id,),
+            ).fetchall()
+        refs = []
+        for play_id, play_name, data in rows:
+            region = json.loads(data)
+            if region["ranges"]:
+                refs.append(
+                    ChannelRegionRef(
+                        playId=play_id,
+                        playName=play_name,
+                        regionId=region["id"],
+                        regionName=region["name"],
+                        lastPixel=max(rng["end"] for rng in region["ranges"]),
+                    )
+                )
+        return refs
+
+    # ── Backups ────────────────────────────────────────────────────────────────
+
+    _BACKUP_COLUMNS = "name, created_at, hash, size, cue_count"
+
+    def _backup_entry(self, play_id: str, row: tuple) -> BackupEntry:
+        name, created_at, digest, size, cue_count = row
+        return BackupEntry(
+            name=name,
+            path=f"{self.db_path}#backups/{play_id}/{name}",
+            createdAt=created_at,
+            hash=digest,
+            size=size,
+            cueCount=cue_count,
+        )
+
+    @staticmethod
+    def _insert_backup(
+        conn: sqlite3.Connection, play: Play, name: str, created_at: float, play_id: str
+    ) -> tuple:
+        digest, blob, size = pack_snapshot(play)
+        conn.execute(
+            "INSERT OR IGNORE INTO backup_blobs (hash, data) VALUES (?, ?)", (digest, blob)
+        )
+        row = (name, created_at, digest, size, len(play.cues))
+        conn.execute(
+            "INSERT OR REPLACE INTO backups "
+            "(play_id, name, created_at, hash, size, cue_count) VALUES (?, ?, ?, ?, ?, ?)",
+            (play_id, *row),
+        )
+        return row
+
+    def list_backups(
+        self, play_id: str, offset: int = 0, limit: int | None = None
+    ) -> list[BackupEntry]:
+        with self._transaction() as conn:
+            rows = conn.execute(
+                f"SELECT {self._BACKUP_COLUMNS} FROM backups WHERE play_id = ? "
+                "ORDER BY created_at DESC, name DESC LIMIT ? OFFSET ?",
+                (play_id, -1 if limit is None else limit, offset),
+            ).fetchall()
+        return [self._backup_entry(play_id, row) for row in rows]
+
+    def create_backup(self, play: Play) -> BackupEntry:
+        digest = pack_snapshot(play)[0]
+        now = time.time()
+        with self._transaction(write=True) as conn:
+            latest = conn.execute(
+                f"SELECT {self._BACKUP_COLUMNS} FROM backups WHERE play_id = ? "
+                "ORDER BY created_at DESC, name DESC LIMIT 1",
+                (play.id,),
+            ).fetchone()
+            if latest is not None and latest[2] == digest:
+                return self._backup_entry(play.id, latest)
+            row = self._insert_backup(conn, play, f"play-{play.id}-{int(now)}.json", now, play.id)
+            if self.max_backups > 0:
+                conn.execute(
+                    "DELETE FROM backups WHERE play_id = ? AND name NOT IN ("
+                    "SELECT name FROM backups WHERE play_id = ? "
+                    "ORDER BY created_at DESC, name DESC LIMIT ?)",
+                    (play.id, play.id, self.max_backups),
+                )
+                conn.execute(
+                    "DELETE FROM backup_blobs WHERE hash NOT IN (SELECT hash FROM backups)"
+                )
+        return self._backup_entry(play.id, row)
+
+    def add_backup(self, play_id: str, play: Play, name: str, created_at: float) -> BackupEntry:
+        with self._transaction(write=True) as conn:
+            row = self._insert_backup(conn, play, name, created_at, play_id)
+        return self._backup_entry(play_id, row)
+
+    def load_backup(self, play_id: str, name: str) -> Play | None:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT backup_blobs.data FROM backups "
+                "JOIN backup_blobs ON backup_blobs.hash = backups.hash "
+                "WHERE backups.play_id = ? AND backups.name = ?",
+                (play_id, name),
+            ).fetchone()
+        return None if row is None else unpack_snapshot(row[0])
+
+    # ── Show import ────────────────────────────────────────────────────────────
+
+    def import_show(
+        self,
+        channels: list[Channel],
+        plays: list[Play],
+        backups: dict[str, list[tuple[str, float, Play]]] | None = None,
+        replace: bool = False,
+    ) -> None:
+        """Apply the whole import, backups included, in a single transaction."""
+        self.flush()
+        now = time.time()
+        with self._transaction(write=True) as conn:
+            channels_revision = self._insert_channels(conn, channels)
+            revisions = {play.id: self._insert_play(conn, play, now) for play in plays}
+            if replace:
+                existing = {row[0] for row in conn.execute("SELECT id FROM plays")}
+                conn.executemany(
+                    "DELETE FROM plays WHERE id = ?",
+                    [(play_id,) for play_id in existing - revisions.keys()],
+                )
+            for play_id, entries in (backups or {}).items():
+                for name, created_at, snapshot in entries:
+                    self._insert_backup(conn, snapshot, name, created_at, play_id)
+        self._channels_cache = (channels_revision, list(channels))
+        if replace:
+            self._plays_cache.clear()
+        for play in plays:
+            self._plays_cache[play.id] = (revisions[play.id], play)
+
+
+# ── Migration ──────────────────────────────────────────────────────────────────
+
+
+def _json_backups(source: Storage, play_id: str, counts: dict[str, int]):
+    """Yield ``(name, created_at, play)`` for each backup in the JSON layout."""
+    try:
+        entries = source.list_backups(play_id)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("Skipping backups of play %s: %s", play_id, e)
+        counts["skipped"] += 1
+        return
+    for entry in reversed(entries):
+        try:
+            play = source.load_backup(play_id, entry.name)
+        except (OSError, ValueError) as e:
+            logger.warning("Skipping backup %s: %s", entry.path, e)
+            counts["skipped"] += 1
+            continue
+        if play is not None:
+            yield entry.name, entry.createdAt, play
+
+
+def migrate_json_to_sqlite(data_dir: Path) -> dict[str, int]:
+    """Copy channels, plays and backups from the JSON layout into the database.
+
+    The JSON files are left in place. Plays and backups already in the
+    database with the same id or name are overwritten. Files that do not
+    parse as valid models are skipped with a warning.
+    """
+    source = Storage(data_dir)
+    target = SqliteStorage(data_dir)
+    target.create_dirs()
+    counts = {"channels": 0, "plays": 0, "backups": 0, "skipped": 0}
+    try:
+        channels_file = data_dir / "channels.json"
+        if channels_file.exists():
+            channels = [
+                Channel.model_validate(c)
+                for c in json.loads(channels_file.read_text(encoding="utf-8"))
+            ]
+            target.save_channels(channels)
+            counts["channels"] = len(channels)
+
+        with target._transaction(write=True) as conn:
+            for path in sorted((data_dir / "plays").glob("play-*.json")):
+                try:
+                    play = Play.model_validate_json(path.read_bytes())
+                except ValueError as e:
+                    logger.warning("Skipping %s: %s", path, e)
+                    counts["skipped"] += 1
+                    continue
+                target._insert_play(conn, play, path.stat().st_mtime)
+                counts["plays"] += 1
+
+            for play_dir in sorted((data_dir / "backups" / "plays").glob("play-*")):
+                play_id = play_dir.name.removeprefix("play-")
+                for name, created_at, play in _json_backups(source, play_id, counts):
+                    target._insert_backup(conn, play, name, created_at, play_id)
+                    counts["backups"] += 1
+    finally:
+        target.close()
+    return counts
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m storage_sqlite")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate = commands.add_parser(
+        "migrate",
+        help=f"copy the JSON files in the data directory into {DB_NAME}",
+    )
+    migrate.add_argument(
+        "--data-dir", type=Path, default=None, help="defaults to the DATA_DIR setting"
+    )
+    args = parser.parse_args(argv)
+
+    if args.data_dir is None:
+        from config import settings
+
+        args.data_dir = settings.data_dir
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    counts = migrate_json_to_sqlite(args.data_dir)
+    print(
+        f"Migrated {counts['channels']} channels, {counts['plays']} plays and "
+        f"{counts['backups']} backups into {args.data_dir / DB_NAME}"
+        + (f" ({counts['skipped']} files skipped)" if counts["skipped"] else "")
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,27 @@ from models import Channel, Cue, Effect, Play, PixelRange, Region
 from storage import Storage
 
 
+class RecordingBroadcaster:
+    """Stands in for the live or preview broadcaster and keeps every message."""
+
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+
+    async def broadcast(self, message: dict) -> None:
+        self.messages.append(message)
+
+    async def close_all(self) -> None:
+        pass
+
+    def frames(self) -> list[dict]:
+        return [m for m in self.messages if m["type"] == "frame"]
+
+
+@pytest.fixture
+def recording_broadcaster() -> RecordingBroadcaster:
+    return RecordingBroadcaster()
+
+
 @pytest.fixture
 def tmp_storage(tmp_path: Path) -> Storage:
     s = Storage(tmp_path)
@@ -69,6 +90,7 @@ def sample_play() -> Play:
 
 @pytest.fixture
 def client(tmp_path: Path, sample_channel: Channel, sample_play: Play) -> TestClient:
+    from engine.session import live_session
     from main import app
 
     storage = Storage(tmp_path)
@@ -86,5 +108,6 @@ def client(tmp_path: Path, sample_channel: Channel, sample_play: Play) -> TestCl
     app.state.storage = storage
     app.state.settings = settings
     app.state.hardware = MockHardware()
+    app.state.live_session = live_session
 
     return TestClient(app, raise_server_exceptions=True)
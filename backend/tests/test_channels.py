@@ -16,6 +16,15 @@ class TestListChannels:
         assert resp.json() == []
 
 
+    def test_unchanged_returns_304(self, client: TestClient) -> None:
+        etag = client.get("/api/channels").headers["ETag"]
+        resp = client.get("/api/channels", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        client.app.state.storage.save_channels([])
+        resp = client.get("/api/channels", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+
+
 class TestUpsertChannel:
     def test_create_new_channel(self, client: TestClient) -> None:
         payload = {
@@ -49,6 +58,41 @@ class TestUpsertChannel:
         assert ch1["name"] == "Updated"
         assert ch1["ledCount"] == 50
 
+    def test_reports_regions_past_new_led_count(self, client: TestClient) -> None:
+        payload = {
+            "id": "ch-1",
+            "name": "Shorter",
+            "gpioPin": 18,
+            "ledCount": 60,
+            "ledType": "ws281x",
+            "colorOrder": "RGB",
+        }
+        resp = client.post("/api/channels", json=payload)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["ok"] is True
+        assert data["outOfBounds"] == [
+            {
+                "playId": "play-1",
+                "playName": "Test Play",
+                "regionId": "r-2",
+                "regionName": "Stage Right",
+                "lastPixel": 99,
+            }
+        ]
+
+    def test_no_report_when_regions_fit(self, client: TestClient) -> None:
+        payload = {
+            "id": "ch-1",
+            "name": "Main Strand",
+            "gpioPin": 18,
+            "ledCount": 100,
+            "ledType": "ws281x",
+            "colorOrder": "RGB",
+        }
+        resp = client.post("/api/channels", json=payload)
+        assert resp.json()["outOfBounds"] == []
+
     def test_invalid_gpio_returns_422(self, client: TestClient) -> None:
         payload = {
             "id": "ch-x",
@@ -0,0 +1,250 @@
+"""Tests for engine.cluster: clock offset estimation and a coordinator driving
+nodes over loopback, in this process and in a separate one."""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing as mp
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from engine.cluster import ClockOffset, ClusterCoordinator, ClusterNode
+from engine.session import LiveSession
+from models import Channel, Play
+from storage import Storage
+from tests.conftest import RecordingBroadcaster
+
+
+class _ListeningBroadcaster(RecordingBroadcaster):
+    """Feeds a coordinator the way the live broadcaster's listener does."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.coordinator: ClusterCoordinator | None = None
+
+    async def broadcast(self, message: dict) -> None:
+        if self.coordinator is not None:
+            self.coordinator.on_broadcast(message)
+        await super().broadcast(message)
+
+
+async def _until(predicate, timeout: float = 3.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def node_storage(tmp_path: Path, sample_play: Play, sample_channel: Channel) -> Storage:
+    s = Storage(tmp_path / "node")
+    s.create_dirs()
+    s.save_channels([sample_channel])
+    s.save_play(sample_play)
+    return s
+
+
+class TestClockOffset:
+    def test_estimates_offset(self) -> None:
+        clock = ClockOffset()
+        # Remote clock is 5 s ahead; 1 ms each way
+        clock.add(10.0, 15.001, 15.001, 10.002)
+        assert clock.offset == pytest.approx(5.0)
+        assert clock.rtt == pytest.approx(0.002)
+
+    def test_prefers_shortest_round_trip(self) -> None:
+        clock = ClockOffset()
+        # Delayed by 20 ms on the way back: offset skewed by 10 ms
+        clock.add(0.0, 5.001, 5.001, 0.022)
+        clock.add(1.0, 6.001, 6.001, 1.002)
+        assert clock.offset == pytest.approx(5.0)
+
+    def test_unsynced(self) -> None:
+        clock = ClockOffset()
+        assert not clock.synced
+        assert clock.offset == 0.0
+        assert clock.rtt is None
+
+
+class TestCluster:
+    @pytest.mark.asyncio
+    async def test_node_follows_coordinator(
+        self, sample_play: Play, sample_channel: Channel, node_storage: Storage
+    ) -> None:
+        session = LiveSession()
+        session.align_frames = True
+        coordinator_bc = _ListeningBroadcaster()
+        coordinator = ClusterCoordinator(session, 0, 30, host="127.0.0.1")
+        await coordinator.start()
+        coordinator_bc.coordinator = coordinator
+        node_bc = RecordingBroadcaster()
+        # The node's clock runs 100 s behind the coordinator's
+        node = ClusterNode(
+            "127.0.0.1",
+            coordinator.port,
+            node_storage,
+            None,
+            node_bc,
+            "node-a",
+            clock=lambda: time.monotonic() - 100.0,
+        )
+        await node.start()
+        try:
+            await session.start(sample_play, [sample_channel], 30, coordinator_bc, None)
+            await _until(lambda: node.is_running and node_bc.frames())
+            assert node.offset.offset == pytest.approx(100.0, abs=0.005)
+            assert abs(node.now() - time.monotonic()) < 0.005
+            assert node_bc.frames()[-1]["channels"]["ch-1"][0] == "#ff0000"
+
+            await session.advance(coordinator_bc)
+            await _until(lambda: node.cue_index == 1)
+            assert node.status().cueId == "cue-2"
+            await _until(lambda: node_bc.frames()[-1]["channels"]["ch-1"][0] == "#000000")
+
+            await session.blackout(coordinator_bc)
+            await _until(lambda: node.is_blackout)
+
+            status = coordinator.cluster_status()
+            assert [n.name for n in status.nodes] == ["node-a"]
+            assert node.cluster_status().synced is True
+
+            await session.stop(coordinator_bc, None)
+            await _until(lambda: not node.is_running)
+        finally:
+            await node.stop()
+            await coordinator.stop()
+
+    @pytest.mark.asyncio
+    async def test_node_reports_missing_play(
+        self, sample_play: Play, sample_channel: Channel, tmp_path: Path
+    ) -> None:
+        empty = Storage(tmp_path / "empty")
+        empty.create_dirs()
+        session = LiveSession()
+        coordinator = ClusterCoordinator(session, 0, 30, host="127.0.0.1")
+        await coordinator.start()
+        node = ClusterNode("127.0.0.1", coordinator.port, empty, None, RecordingBroadcaster(), "n")
+        await node.start()
+        try:
+            await session.start(sample_play, [sample_channel], 30, RecordingBroadcaster(), None)
+            await _until(lambda: coordinator.cluster_status().nodes)
+            coordinator.publish()
+            await _until(lambda: node.error is not None)
+            assert "not on this node" in node.cluster_status().error
+            assert node.is_running is False
+        finally:
+            await session.stop(RecordingBroadcaster(), None)
+            await node.stop()
+            await coordinator.stop()
+
+    @pytest.mark.asyncio
+    async def test_node_reports_differing_play(
+        self, sample_play: Play, sample_channel: Channel, node_storage: Storage
+    ) -> None:
+        edited = sample_play.model_copy(update={"name": "Edited on the coordinator"})
+        session = LiveSession()
+        coordinator_bc = _ListeningBroadcaster()
+        coordinator = ClusterCoordinator(session, 0, 30, host="127.0.0.1")
+        await coordinator.start()
+        coordinator_bc.coordinator = coordinator
+        node = ClusterNode(
+            "127.0.0.1", coordinator.port, node_storage, None, RecordingBroadcaster(), "n"
+        )
+        await node.start()
+        try:
+            await session.start(edited, [sample_channel], 30, coordinator_bc, None)
+            await _until(lambda: node.error is not None)
+            assert "differs" in node.error
+            # Still renders its own copy
+            assert node.is_running
+        finally:
+            await session.stop(coordinator_bc, None)
+            await node.stop()
+            await coordinator.stop()
+
+
+def _node_process(port: int, data_dir: str, skew: float, conn) -> None:
+    """Run a node in its own process and report its clock and cue changes."""
+
+    class _PipeBroadcaster:
+        node: ClusterNode
+
+        async def broadcast(self, message: dict) -> None:
+            if message["type"] == "status":
+                conn.send(("status", message["cueIndex"], self.node.offset.offset))
+
+    async def main() -> None:
+        broadcaster = _PipeBroadcaster()
+        node = broadcaster.node = ClusterNode(
+            "127.0.0.1",
+            port,
+            Storage(Path(data_dir)),
+            None,
+            broadcaster,
+            "proc",
+            clock=lambda: time.monotonic() + skew,
+        )
+        await node.start()
+        await asyncio.to_thread(conn.recv)  # wait for "stop"
+        await node.stop()
+
+    asyncio.run(main())
+
+
+class TestClusterRoutes:
+    def test_standalone(self, client: TestClient) -> None:
+        client.app.state.cluster = None
+        resp = client.get("/api/live/cluster")
+        assert resp.status_code == 200
+        assert resp.json()["role"] == "standalone"
+        assert resp.json()["nodes"] == []
+
+    def test_node_refuses_live_commands(self, client: TestClient) -> None:
+        settings = client.app.state.settings
+        client.app.state.settings = settings.model_copy(update={"cluster_role": "node"})
+        try:
+            resp = client.post("/api/live/start", json={"playId": "play-1"})
+            assert resp.status_code == 409
+            assert "coordinator" in resp.json()["detail"]
+            assert client.post("/api/live/next").status_code == 409
+            assert client.get("/api/live/status").status_code == 200
+        finally:
+            client.app.state.settings = settings
+
+
+class TestClusterProcesses:
+    @pytest.mark.asyncio
+    async def test_node_in_separate_process(
+        self, sample_play: Play, sample_channel: Channel, node_storage: Storage
+    ) -> None:
+        session = LiveSession()
+        session.align_frames = True
+        bc = _ListeningBroadcaster()
+        coordinator = ClusterCoordinator(session, 0, 30, host="127.0.0.1")
+        await coordinator.start()
+        bc.coordinator = coordinator
+        ctx = mp.get_context("spawn")
+        parent, child = ctx.Pipe()
+        proc = ctx.Process(
+            target=_node_process,
+            args=(coordinator.port, str(node_storage.data_dir), -42.0, child),
+            daemon=True,
+        )
+        proc.start()
+        try:
+            await _until(lambda: coordinator.cluster_status().nodes, timeout=15.0)
+            await session.start(sample_play, [sample_channel], 30, bc, None)
+            kind, cue_index, offset = await asyncio.to_thread(parent.recv)
+            assert (kind, cue_index) == ("status", 0)
+            assert offset == pytest.approx(42.0, abs=0.01)
+            await session.goto(1, bc)
+            while cue_index != 1:
+                _, cue_index, _ = await asyncio.to_thread(parent.recv)
+        finally:
+            await session.stop(bc, None)
+            parent.send("stop")
+            await asyncio.to_thread(proc.join, 10.0)
+            await coordinator.stop()
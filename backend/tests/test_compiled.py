@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from engine.compiled import (
+    CompiledPlayError,
+    compile_play,
+    dump_compiled,
+    load_compiled,
+)
+from engine.session import _build_cue_table, _compile_cue, _region_slots
+from models import Channel, Play
+from storage import Storage
+
+
+class TestCompiledPlay:
+    def test_round_trip(self, tmp_path: Path, sample_play: Play) -> None:
+        path = tmp_path / "play.plc"
+        path.write_bytes(dump_compiled(compile_play(sample_play)))
+        compiled = load_compiled(path)
+        assert compiled.play == sample_play
+        assert compiled.table == _build_cue_table(sample_play)
+        assert compiled.path == path
+        # Tracked effects stay shared with the play's own effects
+        assert compiled.table[0]["r-1"] is compiled.play.cues[0].effectsByRegion["r-1"]
+
+    def test_region_slots_match(self, tmp_path: Path, sample_play: Play) -> None:
+        path = tmp_path / "play.plc"
+        path.write_bytes(dump_compiled(compile_play(sample_play)))
+        compiled = load_compiled(path)
+        for region in sample_play.regions:
+            for led_count in (100, 60, 10):
+                assert compiled.region_slots(region.id, led_count) == _region_slots(
+                    region, led_count
+                )
+        assert compiled.region_slots("missing", 100) is None
+
+    def test_plan_uses_compiled_only_for_its_play(
+        self, sample_play: Play, sample_channel: Channel
+    ) -> None:
+        compiled = compile_play(sample_play)
+        plan = _compile_cue(sample_play, [sample_channel], 0, compiled.table[0], compiled)
+        assert plan == _compile_cue(sample_play, [sample_channel], 0, compiled.table[0])
+        other = sample_play.model_copy()
+        assert _compile_cue(other, [sample_channel], 0, compiled.table[0], compiled) == plan
+
+    def test_rejects_other_files(self, tmp_path: Path, sample_play: Play) -> None:
+        path = tmp_path / "play.plc"
+        path.write_bytes(b"")
+        with pytest.raises(CompiledPlayError):
+            load_compiled(path)
+        data = bytearray(dump_compiled(compile_play(sample_play)))
+        data[8] ^= 0xFF  # Schema hash
+        path.write_bytes(bytes(data))
+        with pytest.raises(CompiledPlayError):
+            load_compiled(path)
+
+
+class TestStorageCompiledCache:
+    def test_save_compiles(self, tmp_storage: Storage, sample_play: Play) -> None:
+        tmp_storage.save_play(sample_play)
+        compiled = tmp_storage.load_compiled("play-1")
+        assert compiled.play == sample_play
+        assert compiled.path.parent == tmp_storage.data_dir / "compiled"
+        assert tmp_storage.load_compiled("missing") is None
+
+    def test_new_save_replaces_file(self, tmp_storage: Storage, sample_play: Play) -> None:
+        tmp_storage.save_play(sample_play)
+        first = tmp_storage.load_compiled("play-1").path
+        tmp_storage.save_play(sample_play.model_copy(update={"name": "Renamed"}))
+        compiled = tmp_storage.load_compiled("play-1")
+        assert compiled.play.name == "Renamed"
+        assert compiled.path != first and not first.exists()
+
+    def test_external_edit_recompiles(self, tmp_storage: Storage, sample_play: Play) -> None:
+        tmp_storage.save_play(sample_play)
+        path = tmp_storage.data_dir / "plays" / "play-play-1.json"
+        path.write_text(sample_play.model_copy(update={"name": "Edited"}).model_dump_json())
+        os.utime(path, ns=(1, 1))
+        assert tmp_storage.load_compiled("play-1").play.name == "Edited"
+
+    def test_corrupt_file_recompiles(self, tmp_storage: Storage, sample_play: Play) -> None:
+        tmp_storage.save_play(sample_play)
+        tmp_storage.load_compiled("play-1").path.write_bytes(b"junk")
+        assert tmp_storage.load_compiled("play-1").play == sample_play
+
+    def test_delete_removes_compiled(self, tmp_storage: Storage, sample_play: Play) -> None:
+        tmp_storage.save_play(sample_play)
+        path = tmp_storage.load_compiled("play-1").path
+        tmp_storage.delete_play("play-1")
+        assert not path.exists()
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import io
+import json
+import tarfile
+
+from fastapi.testclient import TestClient
+
+from models import Channel, Play
+
+
+class TestImportUpload:
+    def test_upload_then_apply(self, client: TestClient, sample_play: Play) -> None:
+        data = sample_play.model_dump_json().encode()
+        resp = client.post(
+            "/api/plays/import/upload", files={"file": ("show.json", data, "application/json")}
+        )
+        assert resp.status_code == 200
+        name = resp.json()["name"]
+        assert name.startswith("show-")
+
+        storage = client.app.state.storage
+        assert storage.load_staged_import(name) is storage.load_staged_import(name)
+        assert not list(storage._imports_dir.glob(".upload-*"))
+
+        resp = client.post("/api/plays/play-9/import", json={"name": name})
+        assert resp.status_code == 200
+        assert storage.load_play("play-9").name == sample_play.name
+
+    def test_invalid_json(self, client: TestClient) -> None:
+        resp = client.post("/api/plays/import/upload", files={"file": ("x.json", b"{nope")})
+        assert resp.status_code == 400
+        assert resp.json()["detail"] == "Uploaded file is not valid JSON."
+
+    def test_invalid_play(self, client: TestClient) -> None:
+        resp = client.post("/api/plays/import/upload", files={"file": ("x.json", b"{}")})
+        assert resp.status_code == 400
+        assert resp.json()["detail"].startswith("Uploaded file is not a valid play: id:")
+        assert not list(client.app.state.storage._imports_dir.iterdir())
+
+    def test_too_large(self, client: TestClient, monkeypatch) -> None:
+        monkeypatch.setattr(client.app.state.settings, "max_import_mb", 1)
+        data = b" " * (2 * 1024 * 1024)
+        resp = client.post("/api/plays/import/upload", files={"file": ("x.json", data)})
+        assert resp.status_code == 413
+        assert not list(client.app.state.storage._imports_dir.iterdir())
+
+    def test_malformed_multipart(self, client: TestClient) -> None:
+        resp = client.post(
+            "/api/plays/import/upload",
+            content=b"garbage that is not multipart",
+            headers={"Content-Type": "multipart/form-data; boundary=XX"},
+        )
+        assert resp.status_code == 400
+        assert resp.json()["detail"].startswith("Malformed multipart upload")
+        assert not list(client.app.state.storage._imports_dir.iterdir())
+
+    def test_missing_file_part(self, client: TestClient) -> None:
+        resp = client.post("/api/plays/import/upload", data={"other": "1"}, files={"x": ("a", b"1")})
+        assert resp.status_code == 400
+
+
+class TestShowArchive:
+    def _export(self, client: TestClient, backups: bool = False) -> bytes:
+        resp = client.get("/api/show/export", params={"backups": backups})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/gzip"
+        return resp.content
+
+    def _import(self, client: TestClient, data: bytes, replace: bool = False):
+        return client.post(
+            "/api/show/import",
+            params={"replace": replace},
+            files={"file": ("show.tar.gz", data, "application/gzip")},
+        )
+
+    def test_round_trip_with_backups(self, client: TestClient, sample_play: Play) -> None:
+        storage = client.app.state.storage
+        storage.create_backup(sample_play)
+        data = self._export(client, backups=True)
+
+        storage.delete_play("play-1")
+        storage.save_channels([])
+        resp = self._import(client, data)
+        assert resp.status_code == 200
+        assert resp.json() == {
+            "ok": True, "channels": 1, "plays": 1, "backups": 1, "outOfBounds": []
+        }
+        assert storage.load_play("play-1") == sample_play
+        assert [c.id for c in storage.load_channels()] == ["ch-1"]
+        assert len(storage.list_backups("play-1")) == 1
+        assert not list(storage._imports_dir.iterdir())
+
+    def test_replace_removes_other_plays(self, client: TestClient, sample_play: Play) -> None:
+        storage = client.app.state.storage
+        data = self._export(client)
+        storage.save_play(sample_play.model_copy(update={"id": "extra"}))
+
+        assert self._import(client, data).status_code == 200
+        assert {p.id for p in storage.list_plays()} == {"play-1", "extra"}
+        assert self._import(client, data, replace=True).status_code == 200
+        assert [p.id for p in storage.list_plays()] == ["play-1"]
+
+    def test_conflicts_change_nothing(self, client: TestClient, sample_play: Play) -> None:
+        storage = client.app.state.storage
+        storage.save_channels([])
+        data = self._export(client)
+        storage.delete_play("play-1")
+
+        resp = self._import(client, data)
+        assert resp.status_code == 400
+        assert "unknown channel 'ch-1'" in resp.json()["detail"]
+        assert storage.list_plays() == []
+
+    def test_not_an_archive(self, client: TestClient) -> None:
+        resp = self._import(client, b"not a tarball")
+        assert resp.status_code == 400
+        assert resp.json()["detail"].startswith("Not a show archive")
+
+    def test_kept_play_on_missing_channel_changes_nothing(
+        self, client: TestClient, sample_play: Play, sample_channel: Channel
+    ) -> None:
+        storage = client.app.state.storage
+        storage.save_channels([])
+        storage.delete_play("play-1")
+        data = self._export(client)
+        storage.save_channels([sample_channel])
+        storage.save_play(sample_play)
+
+        resp = self._import(client, data)
+        assert resp.status_code == 400
+        assert "'Test Play' (kept)" in resp.json()["detail"]
+        assert [c.id for c in storage.load_channels()] == ["ch-1"]
+        # With replace the play goes too, so nothing is left dangling
+        assert self._import(client, data, replace=True).status_code == 200
+        assert storage.list_plays() == []
+
+    def test_reports_kept_regions_out_of_bounds(
+        self, client: TestClient, sample_play: Play, sample_channel: Channel
+    ) -> None:
+        storage = client.app.state.storage
+        storage.save_channels([sample_channel.model_copy(update={"ledCount": 60})])
+        storage.delete_play("play-1")
+        data = self._export(client)
+        storage.save_channels([sample_channel])
+        storage.save_play(sample_play)
+
+        resp = self._import(client, data)
+        assert resp.status_code == 200
+        assert [r["regionId"] for r in resp.json()["outOfBounds"]] == ["r-2"]
+
+    def test_invalid_backup_time(self, client: TestClient, sample_play: Play) -> None:
+        client.app.state.storage.create_backup(sample_play)
+        out = io.BytesIO()
+        with (
+            tarfile.open(fileobj=io.BytesIO(self._export(client, backups=True))) as source,
+            tarfile.open(fileobj=out, mode="w:gz") as tar,
+        ):
+            for member in source.getmembers():
+                data = source.extractfile(member).read()
+                if member.name.endswith("/index.json"):
+                    index = json.loads(data)
+                    index[0]["createdAt"] = None
+                    data = json.dumps(index).encode()
+                member.size = len(data)
+                tar.addfile(member, io.BytesIO(data))
+        resp = self._import(client, out.getvalue())
+        assert resp.status_code == 400
+        assert "invalid createdAt" in resp.json()["detail"]
@@ -0,0 +1,62 @@
+"""Tests for engine.loop_monitor and the health endpoints."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from engine.loop_monitor import LoopLagMonitor
+
+
+def _block_the_loop() -> None:
+    time.sleep(0.25)
+
+
+class TestLoopLagMonitor:
+    @pytest.mark.asyncio
+    async def test_idle_loop_has_low_lag(self) -> None:
+        monitor = LoopLagMonitor(interval_sec=0.01, threshold_ms=100)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.1)
+        finally:
+            await monitor.stop()
+        assert monitor.summary()["max"] < 100
+        assert monitor.recent_spikes() == []
+        assert not monitor.is_lagging()
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_is_attributed(self) -> None:
+        monitor = LoopLagMonitor(interval_sec=0.01, threshold_ms=50)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.03)
+            _block_the_loop()
+            await asyncio.sleep(0.03)
+        finally:
+            await monitor.stop()
+        spikes = monitor.recent_spikes()
+        assert len(spikes) == 1
+        assert spikes[0]["lagMs"] >= 150
+        assert any("_block_the_loop" in line for line in spikes[0]["where"])
+        assert "beat" not in spikes[0]
+
+
+class TestHealthRoutes:
+    def test_health_reports_lag_and_live(self, client: TestClient) -> None:
+        resp = client.get("/health")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["status"] in ("ok", "degraded")
+        assert "p95" in data["loopLagMs"]
+        assert data["live"]["isRunning"] is False
+
+    def test_engine_health_detail(self, client: TestClient) -> None:
+        resp = client.get("/api/health/engine")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert "spikes" in data["loopMonitor"]
+        assert data["liveStats"]["isRunning"] is False
+        assert data["preview"]["isRunning"] is False
@@ -0,0 +1,49 @@
+import pytest
+
+from json_patch import JsonPatchError, JsonPatchTestFailed, apply_patch
+from models import Cue
+
+
+class TestApplyPatch:
+    def test_rfc_operations(self) -> None:
+        doc = {"a": [1, 2, {"b": "c"}]}
+        result = apply_patch(
+            doc,
+            [
+                {"op": "replace", "path": "/a/2/b", "value": "x"},
+                {"op": "add", "path": "/a/-", "value": 9},
+                {"op": "move", "from": "/a/0", "path": "/z"},
+                {"op": "copy", "from": "/z", "path": "/y"},
+                {"op": "test", "path": "/y", "value": 1},
+                {"op": "remove", "path": "/a/0"},
+            ],
+        )
+        assert result == {"a": [{"b": "x"}, 9], "z": 1, "y": 1}
+
+    def test_escaped_pointer(self) -> None:
+        assert apply_patch({"a/b": 1, "m~n": 2}, [
+            {"op": "replace", "path": "/a~1b", "value": 3},
+            {"op": "remove", "path": "/m~0n"},
+        ]) == {"a/b": 3}
+
+    def test_models_only_dumped_when_touched(self) -> None:
+        first = Cue(id="c1", name="One")
+        second = Cue(id="c2", name="Two")
+        doc = {"cues": [first, second]}
+        apply_patch(doc, [
+            {"op": "test", "path": "/cues/0/name", "value": "One"},
+            {"op": "replace", "path": "/cues/1/name", "value": "Deux"},
+        ])
+        assert doc["cues"][0] is first
+        assert doc["cues"][1] == {"id": "c2", "name": "Deux", "effectsByRegion": {}, "trackingRegions": []}
+        assert second.name == "Two"
+
+    def test_errors(self) -> None:
+        with pytest.raises(JsonPatchTestFailed):
+            apply_patch({"a": 1}, [{"op": "test", "path": "/a", "value": 2}])
+        with pytest.raises(JsonPatchError):
+            apply_patch({"a": [1]}, [{"op": "add", "path": "/a/5", "value": 2}])
+        with pytest.raises(JsonPatchError):
+            apply_patch({}, [{"op": "frobnicate", "path": "/a"}])
+        with pytest.raises(JsonPatchError):
+            apply_patch({"a": {}}, [{"op": "move", "from": "/a", "path": "/a/b"}])
@@ -1,7 +1,7 @@
 import pytest
 from pydantic import ValidationError
 
-from models import Channel, Cue, Effect, PixelRange, Play, Region
+from models import TRUSTED, Channel, Cue, Effect, PixelRange, Play, Region
 
 
 class TestPixelRange:
@@ -88,6 +88,20 @@ class TestRegion:
         )
         assert len(r.ranges) == 1
 
+    def test_trusted_context_skips_range_checks(self) -> None:
+        data = {
+            "id": "r",
+            "name": "R",
+            "channelId": "ch-1",
+            "ranges": [{"start": 0, "end": 50}, {"start": 40, "end": 30}],
+        }
+        assert len(Region.model_validate(data, context=TRUSTED).ranges) == 2
+        with pytest.raises(ValidationError):
+            Region.model_validate(data)
+        # Types are still checked
+        with pytest.raises(ValidationError):
+            Region.model_validate({**data, "ranges": "x"}, context=TRUSTED)
+
 
 class TestPlay:
     def test_empty_play(self) -> None:
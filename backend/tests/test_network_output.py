@@ -0,0 +1,149 @@
+"""Tests for the shared network packetizer and the Art-Net and DDP drivers."""
+from __future__ import annotations
+
+import socket
+import struct
+
+import pytest
+
+from engine import artnet, ddp
+from engine.artnet import ArtnetDriver
+from engine.ddp import DdpDriver, parse_output
+from engine.hardware import create_hardware
+from engine.network_output import pixel_bytes
+from engine.sacn import SYNC_PACKET_SIZE, SacnDriver
+from models import Channel
+
+
+def _channel(id: str = "ch-1", count: int = 4, order: str = "RGB") -> Channel:
+    return Channel(
+        id=id, name=id, gpioPin=18, ledCount=count, ledType="WS2812B", colorOrder=order
+    )
+
+
+@pytest.fixture
+def receiver():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(1.0)
+    yield sock
+    sock.close()
+
+
+def _port(sock: socket.socket) -> int:
+    return sock.getsockname()[1]
+
+
+def _recv(sock: socket.socket, n: int) -> list[bytes]:
+    return [sock.recv(2048) for _ in range(n)]
+
+
+class TestPixelBytes:
+    def test_rgb_is_flattened(self) -> None:
+        assert pixel_bytes([(1, 2, 3), (4, 5, 6)], "RGB") == bytes([1, 2, 3, 4, 5, 6])
+
+    def test_grb_swaps_planes(self) -> None:
+        assert pixel_bytes([(1, 2, 3), (4, 5, 6)], "GRBW") == bytes([2, 1, 3, 5, 4, 6])
+
+
+class TestArtnet:
+    def test_dmx_packet(self, receiver) -> None:
+        driver = ArtnetDriver({"ch-1": 0x123}, host="127.0.0.1", port=_port(receiver))
+        driver.write_frame([_channel(count=1)], {"ch-1": [(7, 8, 9)]})
+        (packet,) = _recv(receiver, 1)
+        driver.close()
+        assert packet[:8] == b"Art-Net\x00"
+        assert struct.unpack_from("<H", packet, 8)[0] == 0x5000
+        assert packet[10:12] == bytes([0, 14])
+        assert packet[12] == 1  # sequence
+        assert packet[14] == 0x23 and packet[15] == 0x01
+        # Odd slot counts are padded to an even length
+        assert struct.unpack_from("!H", packet, 16)[0] == 4
+        assert packet[artnet.HEADER_SIZE :] == bytes([7, 8, 9, 0])
+
+    def test_splits_into_universes(self, receiver) -> None:
+        driver = ArtnetDriver({"ch-1": 0}, host="127.0.0.1", port=_port(receiver))
+        driver.write_frame([_channel(count=171)], {"ch-1": [(1, 1, 1)] * 171})
+        first, second = _recv(receiver, 2)
+        driver.close()
+        assert (first[14], second[14]) == (0, 1)
+        assert len(first) == artnet.HEADER_SIZE + 510
+
+    def test_sequence_skips_zero(self, receiver) -> None:
+        driver = ArtnetDriver({"ch-1": 0}, host="127.0.0.1", port=_port(receiver))
+        assert driver._next_sequence(255) == 1
+        assert driver._next_sequence(0) == 1
+
+    def test_sync_follows_frame(self, receiver) -> None:
+        driver = ArtnetDriver(
+            {"ch-1": 0, "ch-2": 1}, host="127.0.0.1", port=_port(receiver), sync=True
+        )
+        a, b = _channel("ch-1", 1), _channel("ch-2", 1)
+        driver.write_frame([a, b], {"ch-1": [(1, 1, 1)], "ch-2": [(2, 2, 2)]})
+        *data, sync = _recv(receiver, 3)
+        driver.close()
+        assert [struct.unpack_from("<H", p, 8)[0] for p in data] == [0x5000, 0x5000]
+        # One ArtSync per destination
+        assert len(sync) == artnet.SYNC_PACKET_SIZE
+        assert struct.unpack_from("<H", sync, 8)[0] == 0x5200
+
+
+class TestDdp:
+    def test_parse_output(self) -> None:
+        assert parse_output("10.0.0.5") == ("10.0.0.5", 0)
+        assert parse_output("10.0.0.5:300") == ("10.0.0.5", 300)
+        with pytest.raises(ValueError):
+            parse_output("10.0.0.5:x")
+
+    def test_packets_and_push(self, receiver) -> None:
+        driver = DdpDriver({"ch-1": "127.0.0.1:10"}, port=_port(receiver))
+        driver.write_frame([_channel(count=500)], {"ch-1": [(3, 2, 1)] * 500})
+        first, second = _recv(receiver, 2)
+        driver.close()
+        assert first[0] == 0x40  # version 1, no push
+        assert second[0] == 0x41  # last packet pushes
+        assert first[1] == 1 and first[2] == 0x0B
+        assert struct.unpack_from("!IH", first, 4) == (10 * 3, 480 * 3)
+        assert struct.unpack_from("!IH", second, 4) == ((10 + 480) * 3, 20 * 3)
+        assert second[ddp.HEADER_SIZE : ddp.HEADER_SIZE + 3] == bytes([3, 2, 1])
+
+    def test_sequence_wraps_at_15(self, receiver) -> None:
+        driver = DdpDriver({"ch-1": "127.0.0.1"}, port=_port(receiver))
+        ch = _channel(count=1)
+        for _ in range(16):
+            driver.write_frame([ch], {"ch-1": [(0, 0, 0)]})
+        packets = _recv(receiver, 16)
+        driver.close()
+        assert [p[1] for p in packets][-2:] == [15, 1]
+
+    def test_sync_pushes_after_data(self, receiver) -> None:
+        driver = DdpDriver(
+            {"ch-1": "127.0.0.1", "ch-2": "127.0.0.1:1"}, port=_port(receiver), sync=True
+        )
+        a, b = _channel("ch-1", 1), _channel("ch-2", 1)
+        driver.write_frame([a, b], {"ch-1": [(1, 1, 1)], "ch-2": [(2, 2, 2)]})
+        first, second, push = _recv(receiver, 3)
+        driver.close()
+        assert first[0] == second[0] == 0x40
+        assert push[0] == 0x41
+        assert len(push) == ddp.HEADER_SIZE
+
+    def test_create_hardware(self) -> None:
+        assert isinstance(create_hardware(False, "ddp", {"outputs": {}}), DdpDriver)
+        assert isinstance(create_hardware(False, "artnet", {"universes": {}}), ArtnetDriver)
+
+
+class TestSacnSync:
+    def test_sync_packet_follows_frame(self, receiver) -> None:
+        driver = SacnDriver(
+            {"ch-1": 1}, host="127.0.0.1", port=_port(receiver), sync_universe=7000
+        )
+        driver.write_frame([_channel(count=1)], {"ch-1": [(0, 0, 0)]})
+        data, sync = _recv(receiver, 2)
+        assert struct.unpack_from("!H", data, 109)[0] == 7000
+        assert len(sync) == SYNC_PACKET_SIZE
+        assert struct.unpack_from("!I", sync, 18)[0] == 0x00000008
+        assert struct.unpack_from("!I", sync, 40)[0] == 0x00000001
+        assert sync[44] == 1
+        assert struct.unpack_from("!H", sync, 45)[0] == 7000
+        driver.close()
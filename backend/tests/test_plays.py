@@ -1,6 +1,13 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from fastapi.testclient import TestClient
 
+from models import Cue, Effect, PixelRange, Play, Region
+from routers.plays import play_conflicts
+
 
 class TestListPlays:
     def test_returns_summaries(self, client: TestClient) -> None:
@@ -11,6 +18,15 @@ class TestListPlays:
         assert data[0]["id"] == "play-1"
         assert "name" in data[0]
         assert "regions" not in data[0]
+        assert data[0]["cueCount"] == 2
+        assert resp.headers["X-Total-Count"] == "1"
+
+    def test_filter_and_limit(self, client: TestClient) -> None:
+        client.post("/api/plays", json={"id": "play-2", "name": "Act 2", "regions": [], "cues": []})
+        resp = client.get("/api/plays", params={"q": "act", "limit": 1})
+        assert resp.status_code == 200
+        assert [p["id"] for p in resp.json()] == ["play-2"]
+        assert resp.headers["X-Total-Count"] == "1"
 
 
 class TestGetPlay:
@@ -27,6 +43,134 @@ class TestGetPlay:
         assert resp.status_code == 404
 
 
+class TestPartialPlay:
+    def test_outline(self, client: TestClient) -> None:
+        resp = client.get("/api/plays/play-1/outline")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [r["id"] for r in data["regions"]] == ["r-1", "r-2"]
+        assert data["cues"] == [{"id": "cue-1", "name": "Intro"}, {"id": "cue-2", "name": "Outro"}]
+
+    def test_cue_page(self, client: TestClient) -> None:
+        resp = client.get("/api/plays/play-1/cues", params={"offset": 1, "limit": 5})
+        assert resp.status_code == 200
+        assert [c["id"] for c in resp.json()] == ["cue-2"]
+        assert resp.headers["X-Total-Count"] == "2"
+        assert len(client.get("/api/plays/play-1/cues").json()) == 2
+
+    def test_single_cue(self, client: TestClient) -> None:
+        resp = client.get("/api/plays/play-1/cues/cue-1")
+        assert resp.status_code == 200
+        assert resp.json()["effectsByRegion"]["r-1"]["type"] == "static_color"
+
+    def test_not_found_returns_404(self, client: TestClient) -> None:
+        assert client.get("/api/plays/nope/outline").status_code == 404
+        assert client.get("/api/plays/nope/cues").status_code == 404
+        assert client.get("/api/plays/nope/cues/cue-1").status_code == 404
+        resp = client.get("/api/plays/play-1/cues/nope")
+        assert resp.status_code == 404
+        assert "Cue" in resp.json()["detail"]
+
+
+class TestConditionalRequests:
+    def test_unchanged_play_returns_304(self, client: TestClient) -> None:
+        resp = client.get("/api/plays/play-1")
+        etag = resp.headers["ETag"]
+        resp = client.get("/api/plays/play-1", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.content == b""
+        assert client.get("/api/plays/play-1/outline").headers["ETag"] == etag
+
+    def test_changed_play_returns_200(self, client: TestClient, sample_play: Play) -> None:
+        etag = client.get("/api/plays/play-1").headers["ETag"]
+        renamed = sample_play.model_copy(update={"name": "Renamed"})
+        client.put("/api/plays/play-1", json=renamed.model_dump())
+        resp = client.get("/api/plays/play-1", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.json()["name"] == "Renamed"
+        assert resp.headers["ETag"] != etag
+
+    def test_play_list_etag(self, client: TestClient) -> None:
+        etag = client.get("/api/plays").headers["ETag"]
+        assert client.get("/api/plays", headers={"If-None-Match": etag}).status_code == 304
+        client.delete("/api/plays/play-1")
+        assert client.get("/api/plays", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_put_with_stale_if_match_returns_412(
+        self, client: TestClient, sample_play: Play
+    ) -> None:
+        etag = client.get("/api/plays/play-1").headers["ETag"]
+        body = sample_play.model_dump()
+        resp = client.put("/api/plays/play-1", json=body, headers={"If-Match": etag})
+        assert resp.status_code == 200
+        # Same content, same tag
+        assert resp.headers["ETag"] == etag
+        body["name"] = "Other"
+        assert client.put("/api/plays/play-1", json=body).status_code == 200
+        body["name"] = "Lost update"
+        resp = client.put("/api/plays/play-1", json=body, headers={"If-Match": etag})
+        assert resp.status_code == 412
+        assert client.get("/api/plays/play-1").json()["name"] == "Other"
+
+    def test_patch_honours_if_match(self, client: TestClient) -> None:
+        ops = [{"op": "replace", "path": "/name", "value": "Patched"}]
+        resp = client.patch("/api/plays/play-1", json=ops, headers={"If-Match": '"stale"'})
+        assert resp.status_code == 412
+        etag = client.get("/api/plays/play-1").headers["ETag"]
+        resp = client.patch("/api/plays/play-1", json=ops, headers={"If-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["ETag"] != etag
+
+    def test_large_responses_are_gzipped(self, client: TestClient, sample_play: Play) -> None:
+        cues = [Cue(id=f"cue-{i}", name=f"Cue {i}") for i in range(100)]
+        client.app.state.storage.save_play(sample_play.model_copy(update={"cues": cues}))
+        resp = client.get("/api/plays/play-1", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert resp.json()["id"] == "play-1"
+
+    def test_gzipped_responses_have_their_own_etag(
+        self, client: TestClient, sample_play: Play
+    ) -> None:
+        cues = [Cue(id=f"cue-{i}", name=f"Cue {i}") for i in range(100)]
+        client.app.state.storage.save_play(sample_play.model_copy(update={"cues": cues}))
+        plain = client.get("/api/plays/play-1", headers={"Accept-Encoding": "identity"})
+        gzipped = client.get("/api/plays/play-1", headers={"Accept-Encoding": "gzip"})
+        etag = gzipped.headers["ETag"]
+        assert etag == plain.headers["ETag"][:-1] + '-gzip"'
+        resp = client.get(
+            "/api/plays/play-1", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+        )
+        assert resp.status_code == 304
+        body = sample_play.model_dump()
+        resp = client.put("/api/plays/play-1", json=body, headers={"If-Match": etag})
+        assert resp.status_code == 200
+
+    def test_concurrent_puts_with_same_if_match(
+        self, client: TestClient, sample_play: Play, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        from routers import plays as plays_router
+
+        validate = plays_router.validate_play
+
+        def slow_validate(*args, **kwargs):
+            time.sleep(0.2)
+            return validate(*args, **kwargs)
+
+        monkeypatch.setattr(plays_router, "validate_play", slow_validate)
+        etag = client.get("/api/plays/play-1").headers["ETag"]
+
+        def put(name: str) -> int:
+            body = sample_play.model_dump()
+            body["name"] = name
+            return client.put(
+                "/api/plays/play-1", json=body, headers={"If-Match": etag}
+            ).status_code
+
+        with ThreadPoolExecutor(2) as pool:
+            codes = sorted(pool.map(put, ["First", "Second"]))
+        assert codes == [200, 412]
+
+
 class TestCreatePlay:
     def test_create_new_play(self, client: TestClient) -> None:
         payload = {
@@ -71,6 +215,7 @@ class TestCreatePlay:
         }
         resp = client.post("/api/plays", json=payload)
         assert resp.status_code == 400
+        assert "regions 'A' and 'B'" in resp.json()["detail"]
 
     def test_unknown_channel_id_returns_400(self, client: TestClient) -> None:
         payload = {
@@ -122,6 +267,77 @@ class TestCreatePlay:
         assert resp.status_code == 200
 
 
+class TestPlayConflicts:
+    @staticmethod
+    def _region(rid: str, channel: str, *ranges: tuple[int, int]) -> Region:
+        return Region(
+            id=rid,
+            name=rid.upper(),
+            channelId=channel,
+            ranges=[PixelRange(start=a, end=b) for a, b in ranges],
+        )
+
+    @staticmethod
+    def _cue(cid: str, *region_ids: str) -> Cue:
+        return Cue(
+            id=cid,
+            name=cid,
+            effectsByRegion={rid: Effect(id=f"e-{rid}", type="static_color") for rid in region_ids},
+        )
+
+    def test_reports_every_conflict(self) -> None:
+        play = Play(
+            id="p",
+            name="P",
+            regions=[
+                self._region("a", "ch-1", (0, 49)),
+                self._region("b", "ch-1", (40, 59), (100, 109)),
+                self._region("c", "ch-1", (50, 99)),
+                self._region("d", "ch-2", (0, 9)),
+                self._region("e", "ghost", (0, 9)),
+            ],
+            cues=[self._cue("one", "a", "b", "c", "d"), self._cue("two", "a", "c")],
+        )
+        problems = play_conflicts(play, {"ch-1", "ch-2"})
+        assert problems == [
+            "Region 'E' references unknown channel 'ghost'.",
+            "Cue 'one': regions 'A' and 'B' have overlapping pixel ranges on channel 'ch-1'.",
+            "Cue 'one': regions 'B' and 'C' have overlapping pixel ranges on channel 'ch-1'.",
+        ]
+        assert play_conflicts(play, {"ch-1", "ch-2"}, cue_ids={"two"}, region_ids=set()) == []
+
+    def test_matches_pairwise_check(self) -> None:
+        rng = random.Random(7)
+        regions = []
+        for i in range(40):
+            starts = sorted(rng.sample(range(0, 300, 10), 3))
+            regions.append(
+                self._region(f"r{i}", f"ch-{i % 3}", *[(s, s + rng.randint(0, 9)) for s in starts])
+            )
+        cues = [
+            self._cue(f"c{j}", *[r.id for r in rng.sample(regions, 8)]) for j in range(30)
+        ]
+        play = Play(id="p", name="P", regions=regions, cues=cues)
+
+        expected = set()
+        by_id = {r.id: r for r in regions}
+        for cue in cues:
+            assigned = [by_id[rid] for rid in cue.effectsByRegion]
+            for i, ra in enumerate(assigned):
+                for rb in assigned[i + 1 :]:
+                    if ra.channelId == rb.channelId and any(
+                        a.start <= b.end and b.start <= a.end for a in ra.ranges for b in rb.ranges
+                    ):
+                        expected.add((cue.name, frozenset((ra.name, rb.name))))
+
+        found = set()
+        for msg in play_conflicts(play, {"ch-0", "ch-1", "ch-2"}):
+            cue_name = msg.split("'")[1]
+            found.add((cue_name, frozenset((msg.split("'")[3], msg.split("'")[5]))))
+        assert found == expected
+        assert expected
+
+
 class TestUpdatePlay:
     def test_update_play(self, client: TestClient) -> None:
         play = client.get("/api/plays/play-1").json()
@@ -136,6 +352,63 @@ class TestUpdatePlay:
         assert resp.status_code == 404
 
 
+class TestPatchPlay:
+    def test_patch_cue_name(self, client: TestClient) -> None:
+        ops = [{"op": "replace", "path": "/cues/1/name", "value": "Finale"}]
+        resp = client.patch("/api/plays/play-1", json=ops)
+        assert resp.status_code == 200
+        play = client.get("/api/plays/play-1").json()
+        assert play["cues"][1]["name"] == "Finale"
+        assert play["cues"][0]["name"] == "Intro"
+
+    def test_json_patch_media_type(self, client: TestClient) -> None:
+        resp = client.patch(
+            "/api/plays/play-1",
+            content='[{"op": "add", "path": "/cues/-", "value": {"id": "cue-3", "name": "Bow"}}]',
+            headers={"Content-Type": "application/json-patch+json"},
+        )
+        assert resp.status_code == 200
+        assert [c["id"] for c in client.get("/api/plays/play-1").json()["cues"]] == [
+            "cue-1", "cue-2", "cue-3",
+        ]
+
+    def test_region_change_revalidates_cues_using_it(self, client: TestClient) -> None:
+        # r-2 moves onto r-1's pixels; cue-1 uses both, so this must be rejected
+        ops = [{"op": "replace", "path": "/regions/1/ranges/0/start", "value": 10}]
+        resp = client.patch("/api/plays/play-1", json=ops)
+        assert resp.status_code == 400
+        assert "overlapping" in resp.json()["detail"]
+        assert client.get("/api/plays/play-1").json()["regions"][1]["ranges"][0]["start"] == 50
+
+    def test_invalid_value_returns_422(self, client: TestClient) -> None:
+        ops = [{"op": "replace", "path": "/regions/0/ranges/0", "value": {"start": 5, "end": 1}}]
+        resp = client.patch("/api/plays/play-1", json=ops)
+        assert resp.status_code == 422
+
+    def test_failed_test_op_returns_409(self, client: TestClient) -> None:
+        ops = [
+            {"op": "test", "path": "/name", "value": "Someone else's edit"},
+            {"op": "replace", "path": "/name", "value": "Mine"},
+        ]
+        resp = client.patch("/api/plays/play-1", json=ops)
+        assert resp.status_code == 409
+        assert client.get("/api/plays/play-1").json()["name"] == "Test Play"
+
+    def test_bad_path_returns_400(self, client: TestClient) -> None:
+        resp = client.patch("/api/plays/play-1", json=[{"op": "remove", "path": "/cues/9"}])
+        assert resp.status_code == 400
+
+    def test_id_cannot_be_changed(self, client: TestClient) -> None:
+        ops = [{"op": "replace", "path": "/id", "value": "other"}]
+        assert client.patch("/api/plays/play-1", json=ops).status_code == 200
+        assert client.get("/api/plays/play-1").status_code == 200
+        assert client.get("/api/plays/other").status_code == 404
+
+    def test_patch_nonexistent_returns_404(self, client: TestClient) -> None:
+        resp = client.patch("/api/plays/ghost", json=[])
+        assert resp.status_code == 404
+
+
 class TestDeletePlay:
     def test_delete_play(self, client: TestClient) -> None:
         resp = client.delete("/api/plays/play-1")
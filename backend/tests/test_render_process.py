@@ -0,0 +1,227 @@
+"""Tests for engine.render_process: the shared-memory frame ring and the
+out-of-process live session."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from engine.hardware import MockHardware
+from engine.render_process import FrameRing, ProcessLiveSession, _rgb_bytes_to_hex
+from models import Channel, Effect, Play
+from tests.conftest import RecordingBroadcaster
+
+
+class TestFrameRing:
+    def test_empty_ring_reads_nothing(self) -> None:
+        ring = FrameRing([("a", 2)])
+        try:
+            assert ring.read() is None
+        finally:
+            ring.close()
+
+    def test_reader_sees_latest_frame(self) -> None:
+        writer = FrameRing([("a", 2), ("b", 1)], slots=3)
+        reader = FrameRing(writer.layout, slots=3, name=writer.name)
+        try:
+            writer.write({"a": [(1, 2, 3), (4, 5, 6)], "b": [(7, 8, 9)]}, 1.0)
+            writer.write({"a": [(255, 0, 0), (0, 255, 0)], "b": [(0, 0, 255)]}, 2.0)
+            seq, ts, channels = reader.read()
+            assert seq == 2
+            assert ts == 2.0
+            assert channels["a"] == bytes([255, 0, 0, 0, 255, 0])
+            assert channels["b"] == bytes([0, 0, 255])
+            assert reader.read(after_seq=seq) is None
+        finally:
+            reader.close()
+            writer.close()
+
+    def test_wraps_around(self) -> None:
+        ring = FrameRing([("a", 1)], slots=2)
+        try:
+            for i in range(5):
+                ring.write({"a": [(i, i, i)]}, float(i))
+            seq, _, channels = ring.read()
+            assert seq == 5
+            assert channels["a"] == bytes([4, 4, 4])
+        finally:
+            ring.close()
+
+    def test_rgb_bytes_to_hex(self) -> None:
+        assert _rgb_bytes_to_hex(bytes([255, 0, 16, 0, 0, 0])) == ["#ff0010", "#000000"]
+
+
+class TestProcessLiveSession:
+    @pytest.mark.asyncio
+    async def test_renders_and_follows_commands(
+        self,
+        sample_play: Play,
+        sample_channel: Channel,
+        recording_broadcaster: RecordingBroadcaster,
+    ) -> None:
+        session = ProcessLiveSession("mock")
+        bc = recording_broadcaster
+        await session.start(sample_play, [sample_channel], 30, bc, None)
+        try:
+            for _ in range(200):
+                if bc.frames():
+                    break
+                await asyncio.sleep(0.01)
+            frame = bc.frames()[-1]
+            assert frame["channels"]["ch-1"][0] == "#ff0000"
+            assert len(frame["channels"]["ch-1"]) == 100
+
+            await session.advance(bc)
+            assert session.status().cueId == "cue-2"
+            with pytest.raises(IndexError):
+                await session.goto(5, bc)
+            await session.blackout(bc)
+            assert session.status().isBlackout is True
+        finally:
+            await session.stop(bc, None)
+        assert session.status().isRunning is False
+
+    @pytest.mark.asyncio
+    async def test_renders_on_frame_grid(
+        self,
+        sample_play: Play,
+        sample_channel: Channel,
+        recording_broadcaster: RecordingBroadcaster,
+    ) -> None:
+        session = ProcessLiveSession("mock")
+        session.align_frames = True
+        bc = recording_broadcaster
+        await session.start(sample_play, [sample_channel], 30, bc, None)
+        try:
+            for _ in range(200):
+                if bc.frames():
+                    break
+                await asyncio.sleep(0.01)
+            assert bc.frames()[-1]["channels"]["ch-1"][0] == "#ff0000"
+            await session.advance(bc)
+            assert session.status().cueId == "cue-2"
+        finally:
+            await session.stop(bc, None)
+
+    @pytest.mark.asyncio
+    async def test_starts_from_compiled_file(
+        self, tmp_path, sample_play: Play, sample_channel: Channel
+    ) -> None:
+        from engine.compiled import compile_play, dump_compiled, load_compiled
+
+        path = tmp_path / "play.plc"
+        path.write_bytes(dump_compiled(compile_play(sample_play)))
+        compiled = load_compiled(path)
+        # A vanished file falls back to sending the play itself
+        missing = compile_play(sample_play)
+        missing.path = tmp_path / "gone.plc"
+
+        for source in (compiled, missing):
+            session = ProcessLiveSession("mock")
+            bc = RecordingBroadcaster()
+            await session.start(sample_play, [sample_channel], 30, bc, None, compiled=source)
+            try:
+                for _ in range(200):
+                    if bc.frames():
+                        break
+                    await asyncio.sleep(0.01)
+                assert bc.frames()[-1]["channels"]["ch-1"][0] == "#ff0000"
+            finally:
+                await session.stop(bc, None)
+
+    @pytest.mark.asyncio
+    async def test_failed_command_keeps_rendering(
+        self,
+        sample_play: Play,
+        sample_channel: Channel,
+        recording_broadcaster: RecordingBroadcaster,
+    ) -> None:
+        session = ProcessLiveSession("mock")
+        bc = recording_broadcaster
+        await session.start(sample_play, [sample_channel], 30, bc, None)
+        try:
+            with pytest.raises(RuntimeError, match="could not goto"):
+                await session._call("goto", "not an index")
+            await session.advance(bc)
+            assert session.status().cueIndex == 1
+        finally:
+            await session.stop(bc, None)
+
+    @pytest.mark.asyncio
+    async def test_frame_error_is_reported(
+        self,
+        sample_play: Play,
+        sample_channel: Channel,
+        recording_broadcaster: RecordingBroadcaster,
+    ) -> None:
+        broken = sample_play.model_copy(deep=True)
+        broken.cues[1].effectsByRegion["r-1"] = Effect(
+            id="e-bad", type="static_color", params={"color": "not a color"}
+        )
+        session = ProcessLiveSession("mock")
+        bc = recording_broadcaster
+        await session.start(broken, [sample_channel], 30, bc, None)
+        try:
+            await session.advance(bc)
+            for _ in range(300):
+                if not session.is_running:
+                    break
+                await asyncio.sleep(0.01)
+            errors = [m for m in bc.messages if m["type"] == "error"]
+            assert "Invalid hex color" in errors[-1]["message"]
+        finally:
+            await session.stop(bc, None)
+
+    @pytest.mark.asyncio
+    async def test_setup_error_is_reported(
+        self,
+        sample_play: Play,
+        sample_channel: Channel,
+        recording_broadcaster: RecordingBroadcaster,
+    ) -> None:
+        # The driver rejects its options inside the child
+        session = ProcessLiveSession("sacn", hardware_options={"bogus": 1})
+        with pytest.raises(RuntimeError, match="failed to start.*bogus"):
+            await session.start(
+                sample_play, [sample_channel], 30, recording_broadcaster, MockHardware()
+            )
+        assert session.status().isRunning is False
+        assert session._ring is None
+        assert session._proc is None
+
+    @pytest.mark.asyncio
+    async def test_stats_after_process_death(
+        self,
+        sample_play: Play,
+        sample_channel: Channel,
+        recording_broadcaster: RecordingBroadcaster,
+    ) -> None:
+        session = ProcessLiveSession("mock")
+        bc = recording_broadcaster
+        await session.start(sample_play, [sample_channel], 30, bc, None)
+        try:
+            # Stand in for the window before the pump notices
+            session._pump.cancel()
+            session._proc.kill()
+            await asyncio.to_thread(session._proc.join, 5.0)
+            stats = await session.get_stats()
+            assert stats["isRunning"] is False
+            assert stats["error"] == "Render process exited unexpectedly."
+            with pytest.raises(RuntimeError, match="exited unexpectedly"):
+                await session.advance(bc)
+        finally:
+            await session.stop(bc, None)
+
+
+class TestRenderProcessRoutes:
+    def test_start_failure_is_503(self, client: TestClient) -> None:
+        live = client.app.state.live_session
+        client.app.state.live_session = ProcessLiveSession("sacn", hardware_options={"bogus": 1})
+        try:
+            resp = client.post("/api/live/start", json={"playId": "play-1"})
+            assert resp.status_code == 503
+            assert "failed to start" in resp.json()["detail"]
+            assert client.get("/health").json()["live"]["isRunning"] is False
+        finally:
+            client.app.state.live_session = live
@@ -0,0 +1,146 @@
+"""Tests for engine.sacn: E1.31 packet layout and the sACN output driver."""
+from __future__ import annotations
+
+import socket
+import struct
+
+import pytest
+
+from engine.hardware import create_hardware
+from engine.sacn import HEADER_SIZE, SacnDriver, build_packet, multicast_group
+from models import Channel
+
+
+def _channel(id: str = "ch-1", count: int = 4, order: str = "RGB") -> Channel:
+    return Channel(
+        id=id, name=id, gpioPin=18, ledCount=count, ledType="WS2812B", colorOrder=order
+    )
+
+
+@pytest.fixture
+def receiver():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(1.0)
+    yield sock
+    sock.close()
+
+
+def _driver(receiver: socket.socket, universes: dict[str, int]) -> SacnDriver:
+    return SacnDriver(universes, host="127.0.0.1", port=receiver.getsockname()[1])
+
+
+def _recv(sock: socket.socket, n: int) -> list[bytes]:
+    return [sock.recv(2048) for _ in range(n)]
+
+
+def _universe(packet: bytes) -> int:
+    return struct.unpack_from("!H", packet, 113)[0]
+
+
+def _slots(packet: bytes) -> bytes:
+    return packet[HEADER_SIZE:]
+
+
+class TestPacket:
+    def test_layout(self) -> None:
+        cid = bytes(range(16))
+        packet = build_packet(cid, "Test", 150, 7, 6)
+        assert len(packet) == HEADER_SIZE + 6
+        assert packet[4:16] == b"ASC-E1.17\x00\x00\x00"
+        assert struct.unpack_from("!H", packet, 16)[0] == 0x7000 | (len(packet) - 16)
+        assert packet[22:38] == cid
+        assert struct.unpack_from("!H", packet, 38)[0] == 0x7000 | (len(packet) - 38)
+        assert packet[44:48] == b"Test"
+        assert packet[108] == 150
+        assert _universe(packet) == 7
+        assert struct.unpack_from("!H", packet, 115)[0] == 0x7000 | (len(packet) - 115)
+        # Property value count includes the start code
+        assert struct.unpack_from("!H", packet, 123)[0] == 7
+
+    def test_multicast_group(self) -> None:
+        assert multicast_group(1) == "239.255.0.1"
+        assert multicast_group(0x1234) == "239.255.18.52"
+
+
+class TestSacnDriver:
+    def test_sends_pixels(self, receiver) -> None:
+        driver = _driver(receiver, {"ch-1": 5})
+        ch = _channel(count=2)
+        driver.write_frame([ch], {"ch-1": [(1, 2, 3), (4, 5, 6)]})
+        (packet,) = _recv(receiver, 1)
+        driver.close()
+        assert _universe(packet) == 5
+        assert _slots(packet) == bytes([1, 2, 3, 4, 5, 6])
+
+    def test_splits_into_universes(self, receiver) -> None:
+        driver = _driver(receiver, {"ch-1": 1})
+        ch = _channel(count=200)
+        pixels = [(i, 0, 0) for i in range(200)]
+        driver.write_frame([ch], {"ch-1": pixels})
+        first, second = _recv(receiver, 2)
+        driver.close()
+        assert _universe(first) == 1
+        assert len(_slots(first)) == 170 * 3
+        assert _universe(second) == 2
+        assert len(_slots(second)) == 30 * 3
+        assert _slots(second)[:3] == bytes([170, 0, 0])
+
+    def test_sequence_increments_per_universe(self, receiver) -> None:
+        driver = _driver(receiver, {"ch-1": 1})
+        ch = _channel(count=1)
+        for _ in range(3):
+            driver.write_frame([ch], {"ch-1": [(0, 0, 0)]})
+        packets = _recv(receiver, 3)
+        driver.close()
+        assert [p[111] for p in packets] == [1, 2, 3]
+
+    def test_color_order(self, receiver) -> None:
+        driver = _driver(receiver, {"ch-1": 1})
+        ch = _channel(count=1, order="GRB")
+        driver.write_frame([ch], {"ch-1": [(10, 20, 30)]})
+        (packet,) = _recv(receiver, 1)
+        driver.close()
+        assert _slots(packet) == bytes([20, 10, 30])
+
+    def test_unmapped_channel_is_not_sent(self, receiver) -> None:
+        driver = _driver(receiver, {"ch-2": 9})
+        a, b = _channel("ch-1", 1), _channel("ch-2", 1)
+        driver.write_frame([a, b], {"ch-1": [(1, 1, 1)], "ch-2": [(2, 2, 2)]})
+        (packet,) = _recv(receiver, 1)
+        driver.close()
+        assert _universe(packet) == 9
+        assert driver.packets_sent == 1 + 3  # the frame, then 3 terminations
+
+    def test_close_sends_stream_terminated(self, receiver) -> None:
+        driver = _driver(receiver, {"ch-1": 1})
+        ch = _channel(count=1)
+        driver.write_frame([ch], {"ch-1": [(0, 0, 0)]})
+        driver.close()
+        frame, *terminated = _recv(receiver, 4)
+        assert frame[112] == 0
+        assert [p[112] for p in terminated] == [0x40] * 3
+        # Still usable, with the options byte reset
+        driver.write_frame([ch], {"ch-1": [(0, 0, 0)]})
+        (again,) = _recv(receiver, 1)
+        driver.close()
+        assert again[112] == 0
+
+    def test_all_off_sends_black(self, receiver) -> None:
+        driver = _driver(receiver, {"ch-1": 1})
+        ch = _channel(count=2)
+        driver.write_frame([ch], {"ch-1": [(9, 9, 9)] * 2})
+        driver.all_off([ch])
+        _, off = _recv(receiver, 2)
+        driver.close()
+        assert _slots(off) == bytes(6)
+
+    def test_rejects_invalid_universe(self) -> None:
+        with pytest.raises(ValueError):
+            SacnDriver({"ch-1": 0})
+        with pytest.raises(ValueError):
+            SacnDriver({"ch-1": 1}, priority=201)
+
+    def test_create_hardware(self) -> None:
+        driver = create_hardware(False, "sacn", {"universes": {"ch-1": 1}})
+        assert isinstance(driver, SacnDriver)
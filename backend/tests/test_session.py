@@ -1,10 +1,21 @@
-"""Tests for engine.session._resolve_effect and _build_frame (tracking inheritance)."""
+"""Tests for engine.session: tracking inheritance, frame building and LiveSession."""
 from __future__ import annotations
 
+import asyncio
+
 import pytest
 
-from engine.session import _build_frame, _resolve_effect
+from engine.session import (
+    LiveSession,
+    PreviewSession,
+    _build_cue_table,
+    _build_frame,
+    _grid_elapsed,
+    _resolve_effect,
+    _until_grid_tick,
+)
 from models import Channel, Cue, Effect, Play, PixelRange, Region
+from tests.conftest import RecordingBroadcaster
 
 
 # ── Shared fixtures ────────────────────────────────────────────────────────────
@@ -152,6 +163,63 @@ class TestResolveEffect:
         assert effect.params["color"] == "#0000ff"
 
 
+# ── _build_cue_table ───────────────────────────────────────────────────────────
+
+
+class TestBuildCueTable:
+    def test_matches_resolve_effect_for_every_cue(self, play_with_tracking: Play) -> None:
+        table = _build_cue_table(play_with_tracking)
+        assert len(table) == 3
+        for i, cue in enumerate(play_with_tracking.cues):
+            for region_id in ("r-1", "r-2"):
+                if region_id in cue.trackingRegions:
+                    expected = _resolve_effect(play_with_tracking, i - 1, region_id) if i else None
+                else:
+                    expected = cue.effectsByRegion.get(region_id)
+                assert table[i].get(region_id) is expected
+
+    def test_tracking_never_owned_is_absent(self) -> None:
+        play = Play(
+            id="p",
+            name="P",
+            cues=[
+                Cue(id="c-0", name="C0", trackingRegions=["r-1"]),
+                Cue(id="c-1", name="C1", trackingRegions=["r-1"]),
+            ],
+        )
+        assert _build_cue_table(play) == [{}, {}]
+
+    def test_chain_breaks_when_region_absent_from_cue(self) -> None:
+        """A cue that neither owns nor tracks a region ends the chain (black)."""
+        red = Effect(id="e-1", type="static_color", params={"color": "#ff0000"})
+        play = Play(
+            id="p",
+            name="P",
+            cues=[
+                Cue(id="c-0", name="C0", effectsByRegion={"r-1": red}),
+                Cue(id="c-1", name="C1"),
+                Cue(id="c-2", name="C2", trackingRegions=["r-1"]),
+            ],
+        )
+        table = _build_cue_table(play)
+        assert table[2] == {}
+        assert _resolve_effect(play, 1, "r-1") is None
+
+
+# ── Frame grid ────────────────────────────────────────────────────────────────
+
+
+class TestFrameGrid:
+    def test_elapsed_snaps_to_nearest_frame(self) -> None:
+        assert _grid_elapsed(0.049, 0.1) == pytest.approx(0.0)
+        assert _grid_elapsed(0.051, 0.1) == pytest.approx(0.1)
+        assert _grid_elapsed(1.02, 0.1) == pytest.approx(1.0)
+
+    def test_wait_reaches_next_tick(self) -> None:
+        assert _until_grid_tick(1.03, 0.1) == pytest.approx(0.07)
+        assert _until_grid_tick(0.0, 0.1) == pytest.approx(0.1)
+
+
 # ── _build_frame ──────────────────────────────────────────────────────────────
 
 
@@ -358,3 +426,228 @@ class TestBuildFrame:
         assert all(pixels[i] == "#ffffff" for i in range(0, 5))
         assert all(pixels[i] == "#000000" for i in range(5, 20))
         assert all(pixels[i] == "#ffffff" for i in range(20, 25))
+
+
+# ── LiveSession next-cue preparation ───────────────────────────────────────────
+
+
+async def _wait_until_ready(session: LiveSession) -> None:
+    for _ in range(100):
+        if session.next_cue_ready:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("next cue was never prepared")
+
+
+class TestLiveSessionPrepare:
+    @pytest.mark.asyncio
+    async def test_next_cue_prepared_after_start(
+        self,
+        play_with_tracking: Play,
+        channel: Channel,
+        recording_broadcaster: RecordingBroadcaster,
+    ) -> None:
+        session = LiveSession()
+        bc = recording_broadcaster
+        await session.start(play_with_tracking, [channel], 30, bc, None)
+        try:
+            await _wait_until_ready(session)
+            assert session.status().nextCueReady is True
+        finally:
+            await session.stop(bc, None)
+
+    @pytest.mark.asyncio
+    async def test_advance_uses_prepared_frame(
+        self,
+        play_with_tracking: Play,
+        channel: Channel,
+        recording_broadcaster: RecordingBroadcaster,
+    ) -> None:
+        session = LiveSession()
+        bc = recording_broadcaster
+        await session.start(play_with_tracking, [channel], 30, bc, None)
+        try:
+            await _wait_until_ready(session)
+            prepared_plan = session._next[0]
+            await session.advance(bc)
+            assert session._plan is prepared_plan
+            assert session._pending is not None
+            _, frame = session._pending
+            assert frame["channels"]["ch-1"][0] == "#ff0000"   # r-1 tracked red
+            assert frame["channels"]["ch-1"][50] == "#00ff00"  # r-2 owned green
+        finally:
+            await session.stop(bc, None)
+
+    @pytest.mark.asyncio
+    async def test_last_cue_has_nothing_to_prepare(
+        self,
+        play_with_tracking: Play,
+        channel: Channel,
+        recording_broadcaster: RecordingBroadcaster,
+    ) -> None:
+        session = LiveSession()
+        bc = recording_broadcaster
+        await session.start(play_with_tracking, [channel], 30, bc, None)
+        try:
+            await session.advance(bc)
+            await session.advance(bc)
+            await asyncio.sleep(0.05)
+            assert session.cue_index == 2
+            assert session.status().nextCueReady is False
+        finally:
+            await session.stop(bc, None)
+
+
+# ── Cue navigation ─────────────────────────────────────────────────────────────
+
+
+class TestCueNavigation:
+    @pytest.mark.asyncio
+    async def test_live_goto_and_back(
+        self,
+        play_with_tracking: Play,
+        channel: Channel,
+        recording_broadcaster: RecordingBroadcaster,
+    ) -> None:
+        session = LiveSession()
+        bc = recording_broadcaster
+        await session.start(play_with_tracking, [channel], 30, bc, None)
+        try:
+            await session.goto(2, bc)
+            assert session.status().cueId == "cue-2"
+            assert bc.messages[-1]["cueIndex"] == 2
+            await session.back(bc)
+            assert session.cue_index == 1
+            await session.back(bc)
+            await session.back(bc)  # already on the first cue → no-op
+            assert session.cue_index == 0
+        finally:
+            await session.stop(bc, None)
+
+    @pytest.mark.asyncio
+    async def test_live_goto_out_of_range(
+        self,
+        play_with_tracking: Play,
+        channel: Channel,
+        recording_broadcaster: RecordingBroadcaster,
+    ) -> None:
+        session = LiveSession()
+        bc = recording_broadcaster
+        await session.start(play_with_tracking, [channel], 30, bc, None)
+        try:
+            with pytest.raises(IndexError):
+                await session.goto(3, bc)
+            assert session.cue_index == 0
+        finally:
+            await session.stop(bc, None)
+
+    @pytest.mark.asyncio
+    async def test_preview_goto_renders_resolved_state(
+        self,
+        play_with_tracking: Play,
+        channel: Channel,
+        recording_broadcaster: RecordingBroadcaster,
+    ) -> None:
+        session = PreviewSession()
+        bc = recording_broadcaster
+        await session.start(play_with_tracking, [channel], 30, bc)
+        try:
+            session.goto(2)
+            assert session.cue_index == 2
+            assert sorted(rp.effect.params["color"] for rp in session._plan.regions) == [
+                "#00ff00",
+                "#ff0000",
+            ]
+            session.back()
+            assert session.cue_index == 1
+        finally:
+            await session.stop()
+
+
+# ── Hot reload ─────────────────────────────────────────────────────────────────
+
+
+class TestLiveReload:
+    @pytest.mark.asyncio
+    async def test_reload_preserves_cue_and_elapsed(
+        self,
+        play_with_tracking: Play,
+        channel: Channel,
+        recording_broadcaster: RecordingBroadcaster,
+    ) -> None:
+        session = LiveSession()
+        bc = recording_broadcaster
+        await session.start(play_with_tracking, [channel], 30, bc, None)
+        try:
+            await session.advance(bc)
+            cue_start = session._cue_start
+            edited = play_with_tracking.model_copy(deep=True)
+            edited.cues.insert(0, Cue(id="cue-new", name="Preshow"))
+            await session.reload(edited, bc)
+            assert session.status().cueId == "cue-1"
+            assert session.cue_index == 2
+            assert session._cue_start == cue_start
+        finally:
+            await session.stop(bc, None)
+
+    @pytest.mark.asyncio
+    async def test_reload_keeps_plan_when_current_cue_unchanged(
+        self,
+        play_with_tracking: Play,
+        channel: Channel,
+        recording_broadcaster: RecordingBroadcaster,
+    ) -> None:
+        session = LiveSession()
+        bc = recording_broadcaster
+        await session.start(play_with_tracking, [channel], 30, bc, None)
+        try:
+            plan = session._plan
+            edited = play_with_tracking.model_copy(deep=True)
+            edited.cues[2].name = "Renamed"
+            await session.reload(edited, bc)
+            assert session._plan is plan
+            assert session._play is edited
+        finally:
+            await session.stop(bc, None)
+
+    @pytest.mark.asyncio
+    async def test_reload_recompiles_only_changed_region(
+        self,
+        play_with_tracking: Play,
+        channel: Channel,
+        recording_broadcaster: RecordingBroadcaster,
+    ) -> None:
+        session = LiveSession()
+        bc = recording_broadcaster
+        await session.start(play_with_tracking, [channel], 30, bc, None)
+        try:
+            old = {rp.region_id: rp for rp in session._plan.regions}
+            edited = play_with_tracking.model_copy(deep=True)
+            edited.cues[0].effectsByRegion["r-2"].params["color"] = "#ffffff"
+            await session.reload(edited, bc)
+            new = {rp.region_id: rp for rp in session._plan.regions}
+            assert new["r-1"] is old["r-1"]
+            assert new["r-2"] is not old["r-2"]
+            assert new["r-2"].effect.params["color"] == "#ffffff"
+        finally:
+            await session.stop(bc, None)
+
+    @pytest.mark.asyncio
+    async def test_reload_clamps_when_current_cue_deleted(
+        self,
+        play_with_tracking: Play,
+        channel: Channel,
+        recording_broadcaster: RecordingBroadcaster,
+    ) -> None:
+        session = LiveSession()
+        bc = recording_broadcaster
+        await session.start(play_with_tracking, [channel], 30, bc, None)
+        try:
+            await session.goto(2, bc)
+            edited = play_with_tracking.model_copy(deep=True)
+            del edited.cues[2]
+            await session.reload(edited, bc)
+            assert session.cue_index == 1
+            assert session.status().cueId == "cue-1"
+        finally:
+            await session.stop(bc, None)
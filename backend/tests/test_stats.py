@@ -0,0 +1,139 @@
+"""Tests for engine.stats (frame timing), engine.realtime (scheduling) and
+engine.gc_control (show mode)."""
+from __future__ import annotations
+
+import gc
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from engine.gc_control import ShowModeGC, gc_paused
+from engine.realtime import apply_realtime, shared_thread_settings
+from engine.stats import FrameStats
+
+
+class TestFrameStats:
+    def test_empty_snapshot(self) -> None:
+        snap = FrameStats(30).snapshot()
+        assert snap["frames"] == 0
+        assert snap["fps"] == 0.0
+        assert snap["jitterMs"]["max"] == 0.0
+
+    def test_steady_frames_have_no_jitter(self) -> None:
+        stats = FrameStats(10)
+        for i in range(11):
+            stats.record(i * 0.1, 0.01)
+        snap = stats.snapshot()
+        assert snap["frames"] == 11
+        assert snap["fps"] == pytest.approx(10.0)
+        assert snap["jitterMs"]["max"] == pytest.approx(0.0, abs=1e-6)
+        assert snap["renderMs"]["avg"] == pytest.approx(10.0)
+        assert snap["droppedFrames"] == 0
+
+    def test_late_frame_counts_as_jitter_and_drop(self) -> None:
+        stats = FrameStats(10)
+        for t in (0.0, 0.1, 0.2, 0.5):
+            stats.record(t, 0.0)
+        snap = stats.snapshot()
+        assert snap["jitterMs"]["max"] == pytest.approx(200.0)
+        assert snap["droppedFrames"] == 1
+
+
+class TestApplyRealtime:
+    def test_nothing_requested(self) -> None:
+        assert apply_realtime() == {}
+
+    @pytest.mark.skipif(not hasattr(os, "sched_getaffinity"), reason="Linux only")
+    def test_pin_to_allowed_cpu(self) -> None:
+        original = os.sched_getaffinity(0)
+        cpu = min(original)
+        try:
+            report = apply_realtime(cpu=cpu)
+            assert report["cpuAffinity"] == f"pinned to CPU {cpu}"
+            assert os.sched_getaffinity(0) == {cpu}
+        finally:
+            os.sched_setaffinity(0, original)
+
+    def test_failure_is_reported_not_raised(self) -> None:
+        report = apply_realtime(cpu=100000)
+        assert report["cpuAffinity"].startswith("failed")
+
+    def test_shared_thread_keeps_only_nice(self, caplog: pytest.LogCaptureFixture) -> None:
+        settings = shared_thread_settings({"cpu": 0, "rt_priority": 10, "nice": -5})
+        assert settings == {"nice": -5}
+        assert "cpu, rt_priority ignored" in caplog.text
+
+    def test_shared_thread_quiet_when_unset(self, caplog: pytest.LogCaptureFixture) -> None:
+        assert shared_thread_settings({"cpu": None, "rt_priority": 0, "nice": 0}) == {"nice": 0}
+        assert caplog.text == ""
+
+
+class TestShowModeGC:
+    def test_show_mode_freezes_and_holds_off_full_collections(self) -> None:
+        thresholds = gc.get_threshold()
+        stats = FrameStats(30)
+        control = ShowModeGC(True, stats)
+        control.enter()
+        try:
+            # Young generations stay automatic
+            assert gc.isenabled()
+            assert gc.get_threshold()[:2] == thresholds[:2]
+            assert gc.get_threshold()[2] > thresholds[2]
+            assert gc.get_freeze_count() > 0
+            control.collect_in_slack(0.010)
+            assert stats.gc_collections >= 1
+            assert stats.snapshot()["gcPauseMs"]["max"] >= 0.0
+        finally:
+            control.exit()
+        assert gc.get_threshold() == thresholds
+        assert gc.get_freeze_count() == 0
+
+    def test_no_collection_without_slack(self) -> None:
+        stats = FrameStats(30)
+        control = ShowModeGC(True, stats)
+        control.enter()
+        try:
+            before = stats.gc_collections
+            control.collect_in_slack(0.0)
+            assert stats.gc_collections == before
+        finally:
+            control.exit()
+
+    def test_disabled_only_records_pauses(self) -> None:
+        stats = FrameStats(30)
+        control = ShowModeGC(False, stats)
+        control.enter()
+        try:
+            assert gc.isenabled()
+            gc.collect(0)
+            assert stats.gc_collections == 1
+        finally:
+            control.exit()
+        control.exit()  # idempotent
+
+    def test_gc_paused_nests(self) -> None:
+        with gc_paused():
+            with gc_paused():
+                assert not gc.isenabled()
+            assert not gc.isenabled()
+        assert gc.isenabled()
+
+    def test_pause_ending_mid_show_restores_gc(self) -> None:
+        control = ShowModeGC(True, FrameStats(30))
+        with gc_paused():
+            control.enter()
+        try:
+            assert gc.isenabled()
+        finally:
+            control.exit()
+        assert gc.isenabled()
+
+
+class TestLiveStatsRoute:
+    def test_stats_when_idle(self, client: TestClient) -> None:
+        resp = client.get("/api/live/stats")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["isRunning"] is False
+        assert data["frames"] == 0
@@ -1,10 +1,13 @@
 import json
+import os
+import threading
+import time
 from pathlib import Path
 
 import pytest
 
 from models import Channel, Play, Region, PixelRange, Effect, Cue
-from storage import Storage
+from storage import Storage, content_hash
 
 
 @pytest.fixture
@@ -122,6 +125,336 @@ class TestPlayStorage:
         assert storage.list_plays() == []
 
 
+class TestPlayIndex:
+    def test_summary_fields(self, storage: Storage) -> None:
+        storage.save_play(make_play())
+        [summary] = storage.list_plays()
+        assert summary.cueCount == 1
+        assert summary.regionCount == 1
+        assert summary.totalPixels == 50
+        assert summary.modifiedAt is not None
+
+    def test_index_file_maintained_by_save_and_delete(self, storage: Storage) -> None:
+        storage.save_play(make_play("p-1"))
+        storage.save_play(make_play("p-2"))
+        index = json.loads((storage.data_dir / "plays-index.json").read_text())
+        assert set(index["plays"]) == {"play-p-1.json", "play-p-2.json"}
+        storage.delete_play("p-1")
+        index = json.loads((storage.data_dir / "plays-index.json").read_text())
+        assert set(index["plays"]) == {"play-p-2.json"}
+
+    def test_rebuilds_after_file_overwritten_in_place(self, storage: Storage) -> None:
+        storage.save_play(make_play("p1"))
+        path = storage.data_dir / "plays" / "play-p1.json"
+        raw = make_play("p1").model_dump()
+        raw["name"] = "New name"
+        path.write_text(json.dumps(raw))
+        assert [p.name for p in storage.list_plays()] == ["New name"]
+        assert [p.name for p in Storage(storage.data_dir).list_plays()] == ["New name"]
+
+    def test_rebuilds_after_external_change(self, storage: Storage) -> None:
+        storage.save_play(make_play("p-1"))
+        raw = make_play("p-2").model_dump()
+        (storage.data_dir / "plays" / "play-p-2.json").write_text(json.dumps(raw))
+        assert {p.id for p in Storage(storage.data_dir).list_plays()} == {"p-1", "p-2"}
+        assert {p.id for p in storage.list_plays()} == {"p-1", "p-2"}
+
+    def test_rebuilds_when_index_missing(self, storage: Storage) -> None:
+        storage.save_play(make_play())
+        (storage.data_dir / "plays-index.json").unlink()
+        assert [p.id for p in Storage(storage.data_dir).list_plays()] == ["play-1"]
+
+    def test_filter_and_paginate(self, storage: Storage) -> None:
+        for i in range(5):
+            play = make_play(f"p-{i}")
+            play.name = "Hamlet" if i % 2 else "Macbeth"
+            storage.save_play(play)
+        page, total = storage.query_plays(offset=1, limit=1, name_filter="ham")
+        assert total == 2
+        assert [p.id for p in page] == ["p-3"]
+
+    def test_regions_on_channel(self, storage: Storage) -> None:
+        storage.save_play(make_play("p-2"))
+        play = make_play("p-1")
+        play.regions.append(
+            Region(id="r-2", name="Balcony", channelId="ch-2", ranges=[PixelRange(start=5, end=9)])
+        )
+        storage.save_play(play)
+        refs = storage.regions_on_channel("ch-1")
+        assert [(r.playId, r.regionId, r.lastPixel) for r in refs] == [
+            ("p-1", "r-1", 49),
+            ("p-2", "r-1", 49),
+        ]
+        [ref] = storage.regions_on_channel("ch-2")
+        assert (ref.playName, ref.regionName, ref.lastPixel) == ("Test Play", "Balcony", 9)
+        assert storage.regions_on_channel("ch-3") == []
+
+    def test_regions_on_channel_does_not_read_plays(self, storage: Storage) -> None:
+        storage.save_play(make_play())
+        path = storage.data_dir / "plays" / "play-play-1.json"
+        with path.open("r+") as f:
+            f.write("{")
+        assert [r.regionId for r in storage.regions_on_channel("ch-1")] == ["r-1"]
+
+    def test_partial_reads_validate_only_the_slice(self, storage: Storage) -> None:
+        play = make_play()
+        play.cues.append(Cue(id="cue-2", name="Outro"))
+        storage.save_play(play)
+        path = storage.data_dir / "plays" / "play-play-1.json"
+        raw = json.loads(path.read_text())
+        raw["cues"][0]["effectsByRegion"] = "not effects"
+        path.write_text(json.dumps(raw))
+        other = Storage(storage.data_dir)
+        assert [c.name for c in other.load_outline("play-1").cues] == ["Intro", "Outro"]
+        cues, total = other.load_cues("play-1", offset=1)
+        assert [c.id for c in cues] == ["cue-2"] and total == 2
+        assert other.load_cue("play-1", "cue-2").name == "Outro"
+        assert other.load_cue("play-1", "missing") is None
+        assert other.load_cues("missing") is None
+
+    def test_concurrent_page_reads_parse_once(
+        self, storage: Storage, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        import storage as storage_module
+
+        storage.save_play(make_play())
+        other = Storage(storage.data_dir)
+        loads = storage_module.json.loads
+        parsed = []
+
+        def slow_loads(data, *args, **kwargs):
+            if isinstance(data, bytes):
+                parsed.append(data)
+                time.sleep(0.05)
+            return loads(data, *args, **kwargs)
+
+        monkeypatch.setattr(storage_module.json, "loads", slow_loads)
+        threads = [
+            threading.Thread(target=other.load_cues, args=("play-1", 0, 1)) for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(parsed) == 1
+
+    def test_play_tag_is_content_hash(self, storage: Storage) -> None:
+        play = make_play()
+        storage.save_play(play)
+        assert storage.play_tag("play-1") == content_hash(play)
+        assert Storage(storage.data_dir).play_tag("play-1") == content_hash(play)
+        assert storage.play_tag("missing") is None
+
+    def test_external_edit_changes_tags(self, storage: Storage) -> None:
+        storage.save_play(make_play())
+        plays_tag = storage.plays_tag()
+        path = storage.data_dir / "plays" / "play-play-1.json"
+        path.write_text(make_play().model_copy(update={"name": "Edited"}).model_dump_json())
+        os.utime(path, ns=(1, 1))
+        assert storage.play_tag("play-1") != content_hash(make_play())
+        # The list follows the index, which notices files added or removed
+        (path.parent / "play-p-2.json").write_text(make_play("p-2").model_dump_json())
+        assert storage.plays_tag() != plays_tag
+
+    def test_version_1_index_rebuilt(self, storage: Storage) -> None:
+        storage.save_play(make_play())
+        path = storage.data_dir / "plays-index.json"
+        index = json.loads(path.read_text())
+        index["version"] = 1
+        for entry in index["plays"].values():
+            del entry["channels"]
+        path.write_text(json.dumps(index))
+        assert len(Storage(storage.data_dir).regions_on_channel("ch-1")) == 1
+
+
+class TestStorageCache:
+    def test_cached_play_lists_are_not_shared(self, storage: Storage) -> None:
+        play = make_play()
+        storage.save_play(play)
+        play.cues.append(Cue(id="cue-x", name="Added after save"))
+        loaded = storage.load_play("play-1")
+        assert [c.id for c in loaded.cues] == ["cue-1"]
+        loaded.cues.clear()
+        loaded.regions.clear()
+        again = storage.load_play("play-1")
+        assert [c.id for c in again.cues] == ["cue-1"]
+        assert again.cues[0] is storage.load_play("play-1").cues[0]
+
+    def test_repeated_load_hits_cache(self, storage: Storage) -> None:
+        storage.save_play(make_play())
+        first = storage.load_play("play-1")
+        second = storage.load_play("play-1")
+        assert first.cues[0] is second.cues[0]
+        assert storage.cache_stats()["hits"] == 2
+        assert storage.cache_stats()["misses"] == 0
+
+    def test_fresh_storage_misses_then_hits(self, storage: Storage) -> None:
+        storage.save_play(make_play())
+        other = Storage(storage.data_dir)
+        other.load_play("play-1")
+        other.load_play("play-1")
+        assert other.cache_stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    def test_external_edit_invalidates(self, storage: Storage) -> None:
+        import os
+
+        storage.save_play(make_play())
+        storage.load_play("play-1")
+        path = storage.data_dir / "plays" / "play-play-1.json"
+        raw = json.loads(path.read_text())
+        raw["name"] = "Edited By Hand"
+        path.write_text(json.dumps(raw))
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert storage.load_play("play-1").name == "Edited By Hand"
+
+    def test_external_delete_returns_none(self, storage: Storage) -> None:
+        storage.save_play(make_play())
+        storage.load_play("play-1")
+        (storage.data_dir / "plays" / "play-play-1.json").unlink()
+        assert storage.load_play("play-1") is None
+
+    def test_own_files_load_through_trusted_path(self, storage: Storage) -> None:
+        storage.save_play(make_play())
+        other = Storage(storage.data_dir)
+        assert other.load_play("play-1") == make_play()
+        assert other.trusted_loads == 1
+
+    def test_edited_file_is_fully_validated(self, storage: Storage) -> None:
+        from pydantic import ValidationError
+
+        storage.save_play(make_play())
+        path = storage.data_dir / "plays" / "play-play-1.json"
+        raw = json.loads(path.read_text())
+        raw["regions"][0]["ranges"] = [{"start": 0, "end": 10}, {"start": 5, "end": 20}]
+        path.write_text(json.dumps(raw))
+        other = Storage(storage.data_dir)
+        with pytest.raises(ValidationError):
+            other.load_play("play-1")
+        assert other.trusted_loads == 0
+
+    def test_channels_list_is_copied(self, storage: Storage) -> None:
+        storage.save_channels([make_channel()])
+        channels = storage.load_channels()
+        channels.append(make_channel("ch-2"))
+        assert len(storage.load_channels()) == 1
+
+
+class TestWriteBehind:
+    @pytest.fixture
+    def wb_storage(self, tmp_path: Path):
+        s = Storage(tmp_path, write_behind_sec=0.05)
+        s.create_dirs()
+        yield s
+        s.close()
+
+    def test_save_is_visible_before_write(self, wb_storage: Storage, tmp_path: Path) -> None:
+        play = make_play()
+        wb_storage.save_play(play)
+        assert wb_storage.load_play("play-1") == play
+        assert [p.id for p in wb_storage.list_plays()] == ["play-1"]
+        assert wb_storage.pending_writes == 1
+
+    def test_saves_coalesce_and_flush_after_delay(self, wb_storage: Storage, tmp_path: Path) -> None:
+        path = tmp_path / "plays" / "play-play-1.json"
+        for i in range(20):
+            wb_storage.save_play(make_play().model_copy(update={"name": f"Edit {i}"}))
+        assert not path.exists()
+        deadline = time.monotonic() + 2
+        while wb_storage.pending_writes and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert json.loads(path.read_text())["name"] == "Edit 19"
+        assert wb_storage.list_plays()[0].name == "Edit 19"
+
+    def test_close_flushes(self, tmp_path: Path) -> None:
+        s = Storage(tmp_path, write_behind_sec=60)
+        s.create_dirs()
+        s.save_play(make_play())
+        s.close()
+        assert Storage(tmp_path).load_play("play-1") is not None
+
+    def test_delete_drops_pending(self, wb_storage: Storage, tmp_path: Path) -> None:
+        wb_storage.save_play(make_play())
+        assert wb_storage.delete_play("play-1") is True
+        wb_storage.flush()
+        assert not (tmp_path / "plays" / "play-play-1.json").exists()
+        assert wb_storage.load_play("play-1") is None
+
+    def test_partial_reads_see_pending(self, wb_storage: Storage) -> None:
+        play = make_play()
+        wb_storage.save_play(play)
+        assert wb_storage.load_outline("play-1").cues[0].name == "Intro"
+        assert wb_storage.load_cues("play-1") == (play.cues, 1)
+        assert wb_storage.load_cue("play-1", "cue-1") is play.cues[0]
+
+    def test_play_tag_survives_flush(self, wb_storage: Storage) -> None:
+        wb_storage.save_play(make_play())
+        tag = wb_storage.play_tag("play-1")
+        assert wb_storage.plays_tag() is None
+        wb_storage.flush()
+        assert wb_storage.play_tag("play-1") == tag
+        assert wb_storage.plays_tag() is not None
+
+    def test_regions_on_channel_sees_pending(self, wb_storage: Storage) -> None:
+        wb_storage.save_play(make_play())
+        wb_storage.flush()
+        play = make_play()
+        play.regions[0].ranges = [PixelRange(start=0, end=149)]
+        wb_storage.save_play(play)
+        [ref] = wb_storage.regions_on_channel("ch-1")
+        assert ref.lastPixel == 149
+
+
+class TestConcurrentWrites:
+    def test_concurrent_saves_leave_valid_file(self, storage: Storage, tmp_path: Path) -> None:
+        errors = []
+
+        def writer(n: int) -> None:
+            try:
+                for i in range(20):
+                    storage.save_play(make_play().model_copy(update={"name": f"{n}-{i}"}))
+            except (OSError, ValueError) as e:  # pragma: no cover - reported below
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+        data = json.loads((tmp_path / "plays" / "play-play-1.json").read_text())
+        assert data["name"].endswith("-19")
+
+
+class TestAsyncStorage:
+    @pytest.mark.asyncio
+    async def test_calls_run_off_the_event_loop_thread(
+        self, storage: Storage, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        storage.save_play(make_play())
+        threads = []
+        real_load = storage.load_play
+
+        def load_play(play_id: str):
+            threads.append(threading.get_ident())
+            return real_load(play_id)
+
+        monkeypatch.setattr(storage, "load_play", load_play)
+        play = await storage.aio.load_play("play-1")
+        assert play is not None and play.id == "play-1"
+        assert threads and threads[0] != threading.get_ident()
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self, storage: Storage) -> None:
+        await storage.aio.save_play(make_play("p-2"))
+        assert (await storage.aio.load_play("p-2")).id == "p-2"
+        assert await storage.aio.load_channels() == []
+        upload = storage.import_upload_path()
+        upload.write_text(make_play("p-3").model_dump_json())
+        name = await storage.aio.stage_import_file("show.json", upload)
+        assert name.startswith("show-")
+
+
 class TestBackupStorage:
     def test_create_and_list_backup(self, storage: Storage) -> None:
         play = make_play()
@@ -137,7 +470,7 @@ class TestBackupStorage:
         play = make_play()
         storage.create_backup(play)
         time.sleep(1.1)
-        storage.create_backup(play)
+        storage.create_backup(play.model_copy(update={"name": "Changed"}))
         backups = storage.list_backups("play-1")
         assert backups[0].name > backups[1].name  # lexicographic = timestamp order
 
@@ -151,6 +484,63 @@ class TestBackupStorage:
     def test_list_backups_no_dir(self, storage: Storage) -> None:
         assert storage.list_backups("never-backed-up") == []
 
+    def test_unchanged_play_is_not_backed_up_twice(self, storage: Storage) -> None:
+        first = storage.create_backup(make_play())
+        again = storage.create_backup(make_play())
+        assert again == first
+        assert len(storage.list_backups("play-1")) == 1
+
+    def test_backups_are_compressed_blobs_with_metadata(
+        self, storage: Storage, tmp_path: Path
+    ) -> None:
+        entry = storage.create_backup(make_play())
+        blob = Path(entry.path)
+        assert blob.name == f"{entry.hash}.json.gz"
+        assert blob.read_bytes()[:2] == b"\x1f\x8b"
+        assert entry.cueCount == 1 and entry.size > 0 and entry.createdAt is not None
+        index = json.loads((blob.parent.parent / "index.json").read_text())
+        assert [e["name"] for e in index["backups"]] == [entry.name]
+
+    def test_identical_content_shares_a_blob(self, storage: Storage, tmp_path: Path) -> None:
+        import time
+
+        a = storage.create_backup(make_play())
+        time.sleep(1.1)
+        storage.create_backup(make_play().model_copy(update={"name": "Other"}))
+        time.sleep(1.1)
+        c = storage.create_backup(make_play())
+        assert a.hash == c.hash and a.name != c.name
+        blobs = list((tmp_path / "backups" / "plays" / "play-play-1" / "blobs").iterdir())
+        assert len(blobs) == 2
+
+    def test_retention_drops_old_backups_and_blobs(self, tmp_path: Path) -> None:
+        s = Storage(tmp_path, max_backups=2)
+        s.create_dirs()
+        entries = []
+        for i in range(4):
+            play = make_play().model_copy(update={"name": f"v{i}"})
+            entry = s.create_backup(play)
+            # Same-second names would replace each other; make them distinct
+            index_path = tmp_path / "backups" / "plays" / "play-play-1" / "index.json"
+            index = json.loads(index_path.read_text())
+            index["backups"][-1]["name"] = f"play-play-1-{i}.json"
+            index["backups"][-1]["createdAt"] = i
+            index_path.write_text(json.dumps(index))
+            entries.append(entry)
+        assert [b.name for b in s.list_backups("play-1")] == ["play-play-1-3.json", "play-play-1-2.json"]
+        blobs = {p.name for p in (tmp_path / "backups" / "plays" / "play-play-1" / "blobs").iterdir()}
+        assert blobs == {f"{e.hash}.json.gz" for e in entries[2:]}
+
+    def test_legacy_backups_are_converted(self, storage: Storage, tmp_path: Path) -> None:
+        d = tmp_path / "backups" / "plays" / "play-play-1"
+        d.mkdir(parents=True)
+        (d / "play-play-1-1700000000.json").write_text(make_play().model_dump_json(indent=2))
+        backups = storage.list_backups("play-1")
+        assert [b.name for b in backups] == ["play-play-1-1700000000.json"]
+        assert backups[0].createdAt == 1700000000
+        assert not (d / "play-play-1-1700000000.json").exists()
+        assert storage.load_backup("play-1", backups[0].name) == make_play()
+
 
 class TestExportStorage:
     def test_create_export(self, storage: Storage) -> None:
@@ -166,3 +556,30 @@ class TestExportStorage:
 
     def test_export_path_not_found(self, storage: Storage) -> None:
         assert storage.export_path("nonexistent.json") is None
+
+
+class TestImportShow:
+    def test_failure_restores_previous_state(self, storage: Storage, monkeypatch) -> None:
+        storage.save_channels([make_channel()])
+        storage.save_play(make_play("a"))
+        real_write = storage._write_play
+
+        def failing_write(play: Play) -> None:
+            if play.id == "b":
+                raise OSError("disk full")
+            real_write(play)
+
+        monkeypatch.setattr(storage, "_write_play", failing_write)
+        renamed = make_play("a").model_copy(update={"name": "New"})
+        with pytest.raises(OSError):
+            storage.import_show([], [renamed, make_play("b")], replace=True)
+        assert [c.id for c in storage.load_channels()] == ["ch-1"]
+        assert storage.load_play("a") == make_play("a")
+        assert storage.load_play("b") is None
+
+
+def test_bench_play_load_runs(capsys: pytest.CaptureFixture) -> None:
+    from bench_play_load import main
+
+    assert main(["--cues", "2", "--regions", "3", "--repeat", "1"]) == 0
+    assert "trusted fast path" in capsys.readouterr().out
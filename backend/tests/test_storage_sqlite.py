@@ -0,0 +1,217 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from storage import Storage, content_hash, create_storage
+from storage_sqlite import SqliteStorage, main, migrate_json_to_sqlite
+from tests.test_storage import make_channel, make_play
+
+
+@pytest.fixture
+def storage(tmp_path: Path):
+    s = SqliteStorage(tmp_path)
+    s.create_dirs()
+    yield s
+    s.close()
+
+
+class TestSqliteStorage:
+    def test_wal_mode(self, storage: SqliteStorage) -> None:
+        conn = sqlite3.connect(storage.db_path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
+    def test_channels_round_trip(self, storage: SqliteStorage) -> None:
+        assert storage.load_channels() == []
+        storage.save_channels([make_channel("ch-2"), make_channel("ch-1")])
+        assert [c.id for c in storage.load_channels()] == ["ch-2", "ch-1"]
+
+    def test_play_round_trip(self, storage: SqliteStorage) -> None:
+        play = make_play()
+        storage.save_play(play)
+        other = SqliteStorage(storage.data_dir)
+        assert other.load_play("play-1") == play
+        other.close()
+
+    def test_cues_and_regions_are_rows(self, storage: SqliteStorage) -> None:
+        storage.save_play(make_play())
+        conn = sqlite3.connect(storage.db_path)
+        assert conn.execute("SELECT id, channel_id FROM regions").fetchall() == [("r-1", "ch-1")]
+        assert conn.execute("SELECT id, name FROM cues").fetchall() == [("cue-1", "Intro")]
+        storage.delete_play("play-1")
+        assert conn.execute("SELECT COUNT(*) FROM cues").fetchone()[0] == 0
+        conn.close()
+
+    def test_delete(self, storage: SqliteStorage) -> None:
+        storage.save_play(make_play())
+        assert storage.delete_play("play-1") is True
+        assert storage.load_play("play-1") is None
+        assert storage.delete_play("play-1") is False
+
+    def test_query_filters_and_paginates(self, storage: SqliteStorage) -> None:
+        for i in range(5):
+            storage.save_play(make_play(f"p-{i}").model_copy(update={"name": f"Act {i}"}))
+        storage.save_play(make_play("z").model_copy(update={"name": "100%_done"}))
+        plays, total = storage.query_plays(1, 2, "act")
+        assert [p.id for p in plays] == ["p-1", "p-2"]
+        assert total == 5
+        assert plays[0].cueCount == 1 and plays[0].totalPixels == 50
+        assert [p.id for p in storage.list_plays(name_filter="%_")] == ["z"]
+
+    def test_regions_on_channel(self, storage: SqliteStorage) -> None:
+        storage.save_play(make_play("p-2"))
+        storage.save_play(make_play("p-1").model_copy(update={"name": "First"}))
+        refs = storage.regions_on_channel("ch-1")
+        assert [(r.playId, r.playName, r.regionId, r.lastPixel) for r in refs] == [
+            ("p-1", "First", "r-1", 49),
+            ("p-2", "Test Play", "r-1", 49),
+        ]
+        assert storage.regions_on_channel("ch-2") == []
+
+    def test_partial_reads(self, storage: SqliteStorage) -> None:
+        play = make_play()
+        play.cues.append(play.cues[0].model_copy(update={"id": "cue-2", "name": "Outro"}))
+        storage.save_play(play)
+        outline = storage.load_outline("play-1")
+        assert [c.id for c in outline.cues] == ["cue-1", "cue-2"]
+        assert outline.regions == play.regions
+        assert storage.load_cues("play-1", 1, 1) == ([play.cues[1]], 2)
+        assert storage.load_cue("play-1", "cue-1") == play.cues[0]
+        assert storage.load_cue("play-1", "missing") is None
+        assert storage.load_outline("missing") is None
+
+    def test_tags(self, storage: SqliteStorage) -> None:
+        play = make_play()
+        storage.save_play(play)
+        assert storage.play_tag("play-1") == content_hash(play)
+        plays_tag, channels_tag = storage.plays_tag(), storage.channels_tag()
+        storage.save_channels([make_channel()])
+        assert storage.plays_tag() == plays_tag
+        assert storage.channels_tag() != channels_tag
+        storage.delete_play("play-1")
+        assert storage.plays_tag() != plays_tag
+        assert storage.play_tag("play-1") is None
+
+    def test_adds_content_hash_column(self, tmp_path: Path) -> None:
+        conn = sqlite3.connect(tmp_path / "pilites.db")
+        conn.execute(
+            "CREATE TABLE plays (id TEXT PRIMARY KEY, name TEXT NOT NULL, "
+            "revision INTEGER NOT NULL, modified_at REAL NOT NULL, cue_count INTEGER NOT NULL, "
+            "region_count INTEGER NOT NULL, total_pixels INTEGER NOT NULL)"
+        )
+        conn.execute("INSERT INTO plays VALUES ('old', 'Old', 7, 0, 0, 0, 0)")
+        conn.commit()
+        conn.close()
+        s = SqliteStorage(tmp_path)
+        s.create_dirs()
+        assert s.play_tag("old") == "r7"
+        s.close()
+
+    def test_cache_invalidated_by_other_connection(self, storage: SqliteStorage) -> None:
+        storage.save_play(make_play())
+        assert storage.load_play("play-1").cues[0] is storage.load_play("play-1").cues[0]
+        other = SqliteStorage(storage.data_dir)
+        other.save_play(make_play().model_copy(update={"name": "Changed"}))
+        other.close()
+        assert storage.load_play("play-1").name == "Changed"
+
+    def test_backups_newest_first(self, storage: SqliteStorage) -> None:
+        play = make_play()
+        first = storage.create_backup(play)
+        time.sleep(1.1)
+        second = storage.create_backup(play.model_copy(update={"name": "Later"}))
+        assert [b.name for b in storage.list_backups("play-1")] == [second.name, first.name]
+        assert [b.name for b in storage.list_backups("play-1", offset=1, limit=1)] == [first.name]
+        assert storage.load_backup("play-1", second.name).name == "Later"
+        assert storage.load_backup("play-1", "missing.json") is None
+
+    def test_backups_dedup_and_retention(self, tmp_path: Path) -> None:
+        s = SqliteStorage(tmp_path, max_backups=1)
+        s.create_dirs()
+        first = s.create_backup(make_play())
+        assert s.create_backup(make_play()) == first
+        assert first.cueCount == 1 and first.hash
+        time.sleep(1.1)
+        second = s.create_backup(make_play().model_copy(update={"name": "Later"}))
+        assert [b.name for b in s.list_backups("play-1")] == [second.name]
+        conn = sqlite3.connect(s.db_path)
+        assert conn.execute("SELECT hash FROM backup_blobs").fetchall() == [(second.hash,)]
+        conn.close()
+        s.close()
+
+    def test_concurrent_saves_from_threads(self, storage: SqliteStorage) -> None:
+        def writer(n: int) -> None:
+            for i in range(10):
+                storage.save_play(make_play(f"p-{n}").model_copy(update={"name": f"{n}-{i}"}))
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert {p.name for p in storage.list_plays()} == {"0-9", "1-9", "2-9", "3-9"}
+
+    def test_write_behind(self, tmp_path: Path) -> None:
+        s = SqliteStorage(tmp_path, write_behind_sec=60)
+        s.create_dirs()
+        s.save_play(make_play())
+        assert [p.id for p in s.list_plays()] == ["play-1"]
+        s.close()
+        reopened = SqliteStorage(tmp_path)
+        assert reopened.load_play("play-1") is not None
+        reopened.close()
+
+    def test_create_storage_selects_backend(self, tmp_path: Path) -> None:
+        assert isinstance(create_storage("sqlite", tmp_path), SqliteStorage)
+        assert isinstance(create_storage("json", tmp_path), Storage)
+        with pytest.raises(ValueError):
+            create_storage("postgres", tmp_path)
+
+
+class TestMigration:
+    def test_migrates_json_data_dir(self, tmp_path: Path) -> None:
+        source = Storage(tmp_path)
+        source.create_dirs()
+        source.save_channels([make_channel()])
+        source.save_play(make_play("a"))
+        source.save_play(make_play("b"))
+        backup = source.create_backup(make_play("a"))
+        (tmp_path / "plays" / "play-broken.json").write_text("{not json")
+
+        counts = migrate_json_to_sqlite(tmp_path)
+        assert counts == {"channels": 1, "plays": 2, "backups": 1, "skipped": 1}
+
+        target = SqliteStorage(tmp_path)
+        assert [c.id for c in target.load_channels()] == ["ch-1"]
+        assert [p.id for p in target.list_plays()] == ["a", "b"]
+        assert target.load_play("b") == make_play("b")
+        assert [b.name for b in target.list_backups("a")] == [backup.name]
+        target.close()
+
+    def test_command(self, tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+        source = Storage(tmp_path)
+        source.create_dirs()
+        source.save_play(make_play())
+        assert main(["migrate", "--data-dir", str(tmp_path)]) == 0
+        assert "1 plays" in capsys.readouterr().out
+        assert (tmp_path / "pilites.db").exists()
+
+
+class TestImportShow:
+    def test_applies_in_one_transaction(self, storage: SqliteStorage) -> None:
+        storage.save_play(make_play("old"))
+        backups = {"a": [("play-a-1.json", 1.0, make_play("a"))]}
+        storage.import_show([make_channel()], [make_play("a")], backups, replace=True)
+        assert [p.id for p in storage.list_plays()] == ["a"]
+        assert [b.name for b in storage.list_backups("a")] == ["play-a-1.json"]
+        assert [c.id for c in storage.load_channels()] == ["ch-1"]
+
+    def test_failure_rolls_back(self, storage: SqliteStorage) -> None:
+        storage.save_play(make_play("old"))
+        with pytest.raises(AttributeError):
+            storage.import_show([make_channel()], [make_play("a"), None], replace=True)
+        assert [p.id for p in storage.list_plays()] == ["old"]
+        assert storage.load_channels() == []
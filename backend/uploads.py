@@ -0,0 +1,116 @@
+"""Streaming multipart uploads.
+
+Starlette's form parsing buffers each uploaded file in a spooled temporary
+file before the route runs. ``receive_file`` parses the request body as it
+arrives instead and writes the file part straight to its destination, so
+memory use stays at one network chunk and an oversized upload is rejected as
+soon as it crosses the limit.
+"""
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from fastapi import Request
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+
+class UploadError(ValueError):
+    """The request is not a usable multipart upload."""
+
+
+class UploadTooLarge(UploadError):
+    pass
+
+
+async def receive_file(
+    request: Request, dest: Path, max_bytes: int, field: str = "file"
+) -> str:
+    """Write the ``field`` file of a multipart request to ``dest``.
+
+    Returns the uploaded file name. On any error the partial file is removed.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise UploadError("Expected a multipart/form-data upload.")
+    length = request.headers.get("content-length", "")
+    # Allow for the multipart framing around the file itself
+    if length.isdigit() and int(length) > max_bytes + 64 * 1024:
+        raise UploadTooLarge(f"Upload exceeds the {max_bytes} byte limit.")
+
+    part: dict = {}
+    header_name = bytearray()
+    header_value = bytearray()
+    chunks: list[bytes] = []
+    found: list[str] = []
+
+    def on_part_begin() -> None:
+        part.clear()
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header_name.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header_value.extend(data[start:end])
+
+    def on_header_end() -> None:
+        if bytes(header_name).lower() == b"content-disposition":
+            _, options = parse_options_header(bytes(header_value))
+            part["name"] = options.get(b"name", b"").decode("utf-8", "replace")
+            filename = options.get(b"filename")
+            part["filename"] = None if filename is None else filename.decode("utf-8", "replace")
+        header_name.clear()
+        header_value.clear()
+
+    def is_target() -> bool:
+        return not found and part.get("name") == field and part.get("filename") is not None
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        if is_target():
+            chunks.append(data[start:end])
+
+    def on_part_end() -> None:
+        if is_target():
+            found.append(part["filename"])
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        },
+    )
+
+    size = 0
+    f = await asyncio.to_thread(open, dest, "wb")
+    try:
+        async for body in request.stream():
+            try:
+                parser.write(body)
+            except MultipartParseError as e:
+                raise UploadError(f"Malformed multipart upload: {e}")
+            if chunks:
+                data = b"".join(chunks)
+                chunks.clear()
+                size += len(data)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds the {max_bytes} byte limit.")
+                await asyncio.to_thread(f.write, data)
+        try:
+            parser.finalize()
+        except MultipartParseError as e:
+            raise UploadError(f"Malformed multipart upload: {e}")
+        if not found:
+            raise UploadError(f"No '{field}' file in the upload.")
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(dest.unlink, missing_ok=True)
+        raise
+    await asyncio.to_thread(f.close)
+    return found[0]
@@ -3,7 +3,9 @@ import {
   applyImport,
   createBackup,
   deletePlay,
+  getAllCues,
   getChannels,
+  getClusterStatus,
   getPlay,
   getLiveStatus,
   getPreviewStatus,
@@ -96,6 +98,35 @@ describe('request URLs', () => {
     expect(url).toBe('/api/plays/play-1')
   })
 
+  it('updatePlay sends the ETag of the loaded play as If-Match', async () => {
+    mockFetch.mockResolvedValueOnce({
+      ok: true,
+      headers: new Headers({ ETag: '"abc"' }),
+      json: () => Promise.resolve(play),
+    })
+    await getPlay('play-1')
+    respondOk({ ok: true })
+    await updatePlay(play)
+    const [, opts] = mockFetch.mock.calls[1] as [string, RequestInit]
+    expect((opts.headers as Record<string, string>)['If-Match']).toBe('"abc"')
+  })
+
+  it('getAllCues fetches cue pages and joins them in order', async () => {
+    const cues = Array.from({ length: 60 }, (_, i) => ({
+      id: `cue-${i}`,
+      name: `Cue ${i}`,
+      effectsByRegion: {},
+    }))
+    respondOk(cues.slice(0, 50))
+    respondOk(cues.slice(50))
+    expect(await getAllCues('play-1', 60)).toEqual(cues)
+    const urls = mockFetch.mock.calls.map(([url]) => url)
+    expect(urls).toEqual([
+      '/api/plays/play-1/cues?offset=0&limit=50',
+      '/api/plays/play-1/cues?offset=50&limit=50',
+    ])
+  })
+
   it('deletePlay calls DELETE /api/plays/{id}', async () => {
     respondOk({ ok: true })
     await deletePlay('play-1')
@@ -165,6 +196,16 @@ describe('return values', () => {
     expect(s.isBlackout).toBe(false)
   })
 
+  it('getClusterStatus calls GET /api/live/cluster', async () => {
+    const status = {
+      role: 'node', nodes: [], coordinator: '10.0.0.2:5570', synced: true,
+      offsetMs: 12.5, rttMs: 0.8, error: null,
+    }
+    respondOk(status)
+    expect(await getClusterStatus()).toEqual(status)
+    expect(mockFetch).toHaveBeenCalledWith('/api/live/cluster', expect.anything())
+  })
+
   it('listBackups returns backup entries', async () => {
     const entries = [{ name: 'play-1-123.json', path: '/var/lib/pilites/backups/play-1/play-1-123.json' }]
     respondOk(entries)
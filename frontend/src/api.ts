@@ -1,8 +1,13 @@
 import type {
   BackupEntry,
   Channel,
+  ChannelRegionRef,
+  ChannelUpdateResponse,
+  ClusterStatus,
+  Cue,
   LiveStatus,
   Play,
+  PlayOutline,
   PlaySummary,
   PreviewStatus,
 } from './types'
@@ -32,6 +37,7 @@ class ApiError extends Error {
 async function request<T>(
   path: string,
   options?: RequestInit,
+  onResponse?: (res: Response) => void,
 ): Promise<T> {
   const res = await fetch(`${BASE}${path}`, {
     headers: { 'Content-Type': 'application/json', ...options?.headers },
@@ -54,17 +60,29 @@ async function request<T>(
     }
     throw new ApiError(res.status, detail)
   }
+  onResponse?.(res)
   return res.json() as Promise<T>
 }
 
+// Last ETag seen for each play, sent as If-Match when saving it so that a
+// save never overwrites changes made elsewhere since the play was opened
+const playEtags = new Map<string, string>()
+
+function rememberEtag(playId: string): (res: Response) => void {
+  return (res) => {
+    const etag = res.headers?.get('ETag')
+    if (etag) playEtags.set(playId, etag)
+  }
+}
+
 // ── Channels ────────────────────────────────────────────────────────────────
 
 export function getChannels(): Promise<Channel[]> {
   return request<Channel[]>('/channels')
 }
 
-export function upsertChannel(channel: Channel): Promise<void> {
-  return request<void>('/channels', {
+export function upsertChannel(channel: Channel): Promise<ChannelUpdateResponse> {
+  return request<ChannelUpdateResponse>('/channels', {
     method: 'POST',
     body: JSON.stringify(channel),
   })
@@ -85,7 +103,30 @@ export function listPlays(): Promise<PlaySummary[]> {
 }
 
 export function getPlay(id: string): Promise<Play> {
-  return request<Play>(`/plays/${id}`)
+  return request<Play>(`/plays/${id}`, undefined, rememberEtag(id))
+}
+
+const CUE_PAGE_SIZE = 50
+
+export function getPlayOutline(id: string): Promise<PlayOutline> {
+  return request<PlayOutline>(`/plays/${id}/outline`, undefined, rememberEtag(id))
+}
+
+export function getCues(id: string, offset: number, limit: number): Promise<Cue[]> {
+  return request<Cue[]>(`/plays/${id}/cues?offset=${offset}&limit=${limit}`)
+}
+
+export function getCue(playId: string, cueId: string): Promise<Cue> {
+  return request<Cue>(`/plays/${playId}/cues/${cueId}`)
+}
+
+/** Fetch all of a play's cues as concurrent pages. */
+export async function getAllCues(id: string, count: number): Promise<Cue[]> {
+  const pages: Promise<Cue[]>[] = []
+  for (let offset = 0; offset < count; offset += CUE_PAGE_SIZE) {
+    pages.push(getCues(id, offset, CUE_PAGE_SIZE))
+  }
+  return (await Promise.all(pages)).flat()
 }
 
 export function createPlay(play: Play): Promise<void> {
@@ -96,10 +137,35 @@ export function createPlay(play: Play): Promise<void> {
 }
 
 export function updatePlay(play: Play): Promise<void> {
-  return request<void>(`/plays/${play.id}`, {
-    method: 'PUT',
-    body: JSON.stringify(play),
-  })
+  const etag = playEtags.get(play.id)
+  return request<void>(
+    `/plays/${play.id}`,
+    {
+      method: 'PUT',
+      headers: { 'Content-Type': 'application/json', ...(etag ? { 'If-Match': etag } : {}) },
+      body: JSON.stringify(play),
+    },
+    rememberEtag(play.id),
+  )
+}
+
+export interface PatchOperation {
+  op: 'add' | 'remove' | 'replace' | 'move' | 'copy' | 'test'
+  path: string
+  value?: unknown
+  from?: string
+}
+
+export function patchPlay(id: string, operations: PatchOperation[]): Promise<void> {
+  return request<void>(
+    `/plays/${id}`,
+    {
+      method: 'PATCH',
+      headers: { 'Content-Type': 'application/json-patch+json' },
+      body: JSON.stringify(operations),
+    },
+    rememberEtag(id),
+  )
 }
 
 export function deletePlay(id: string): Promise<void> {
@@ -129,6 +195,17 @@ export function previewNext(): Promise<void> {
   return request<void>('/preview/next', { method: 'POST' })
 }
 
+export function previewBack(): Promise<void> {
+  return request<void>('/preview/back', { method: 'POST' })
+}
+
+export function previewGoto(cueIndex: number): Promise<void> {
+  return request<void>('/preview/goto', {
+    method: 'POST',
+    body: JSON.stringify({ cueIndex }),
+  })
+}
+
 export function stopPreview(): Promise<void> {
   return request<void>('/preview/stop', { method: 'POST' })
 }
@@ -139,6 +216,10 @@ export function getLiveStatus(): Promise<LiveStatus> {
   return request<LiveStatus>('/live/status')
 }
 
+export function getClusterStatus(): Promise<ClusterStatus> {
+  return request<ClusterStatus>('/live/cluster')
+}
+
 export function startLive(playId: string): Promise<void> {
   return request<void>('/live/start', {
     method: 'POST',
@@ -150,6 +231,21 @@ export function liveNext(): Promise<void> {
   return request<void>('/live/next', { method: 'POST' })
 }
 
+export function liveBack(): Promise<void> {
+  return request<void>('/live/back', { method: 'POST' })
+}
+
+export function liveGoto(cueIndex: number): Promise<void> {
+  return request<void>('/live/goto', {
+    method: 'POST',
+    body: JSON.stringify({ cueIndex }),
+  })
+}
+
+export function liveReload(): Promise<void> {
+  return request<void>('/live/reload', { method: 'POST' })
+}
+
 export function stopLive(): Promise<void> {
   return request<void>('/live/stop', { method: 'POST' })
 }
@@ -197,6 +293,36 @@ export function applyImport(playId: string, name: string): Promise<void> {
   })
 }
 
+export function getShowExportUrl(includeBackups = false): string {
+  return `${BASE}/show/export?backups=${includeBackups}`
+}
+
+export async function importShow(
+  file: File,
+  replace = false,
+): Promise<{
+  channels: number
+  plays: number
+  backups: number
+  outOfBounds: ChannelRegionRef[]
+}> {
+  const form = new FormData()
+  form.append('file', file)
+  const res = await fetch(`${BASE}/show/import?replace=${replace}`, {
+    method: 'POST',
+    body: form,
+  })
+  if (!res.ok) {
+    let detail = `HTTP ${res.status}`
+    try {
+      const body = await res.json()
+      if (typeof body.detail === 'string') detail = body.detail
+    } catch { /* ignore */ }
+    throw new ApiError(res.status, detail)
+  }
+  return res.json()
+}
+
 export function listBackups(playId: string): Promise<BackupEntry[]> {
   return request<BackupEntry[]>(`/plays/${playId}/backups`)
 }
@@ -42,8 +42,12 @@ function ChannelModal({ initial, onClose, onSaved }: ChannelModalProps) {
     setSaving(true)
     try {
       const id = initial?.id ?? `channel-${randomUUID()}`
-      await upsertChannel({ id, ...form })
+      const { outOfBounds } = await upsertChannel({ id, ...form })
       toastSuccess(initial ? 'Channel updated.' : 'Channel created.')
+      if (outOfBounds.length > 0) {
+        const regions = outOfBounds.map((r) => `${r.playName} / ${r.regionName}`).join(', ')
+        toastError(`Regions past LED ${form.ledCount - 1}: ${regions}`)
+      }
       onSaved()
       onClose()
     } catch (e) {
@@ -1,6 +1,7 @@
 import { useCallback, useEffect, useRef, useState } from 'react'
 import {
   getChannels,
+  getClusterStatus,
   getLiveStatus,
   listPlays,
   liveBlackout,
@@ -11,7 +12,7 @@ import {
 import { LedStrip } from '../components/LedStrip'
 import { Modal } from '../components/Modal'
 import { useToast } from '../context/ToastContext'
-import type { Channel, LiveStatus, PlaySummary, WsMessage } from '../types'
+import type { Channel, ClusterStatus, LiveStatus, PlaySummary, WsMessage } from '../types'
 
 const WS_URL = `${location.protocol === 'https:' ? 'wss' : 'ws'}://${location.host}/api/live/stream`
 const RECONNECT_DELAY_MS = 2000
@@ -81,6 +82,7 @@ export function Live() {
   })
   const [frame, setFrame] = useState<Record<string, string[]>>({})
   const [showStart, setShowStart] = useState(false)
+  const [cluster, setCluster] = useState<ClusterStatus | null>(null)
 
   const wsRef = useRef<WebSocket | null>(null)
   const reconnectTimer = useRef<ReturnType<typeof setTimeout> | null>(null)
@@ -138,6 +140,8 @@ export function Live() {
         isRunningRef.current = s.isRunning
       })
       .catch((e) => toastError(e instanceof Error ? e.message : 'Load failed.'))
+    // Older backends have no cluster endpoint; treat them as standalone
+    getClusterStatus().then(setCluster).catch(() => setCluster(null))
 
     connectWs()
     return () => {
@@ -173,12 +177,14 @@ export function Live() {
 
   const isRunning = status.isRunning
   const isBlackout = status.isBlackout
+  // Nodes follow the coordinator's cues and refuse live commands
+  const isNode = cluster?.role === 'node'
 
   return (
     <>
       <div className="screen-header">
         <h1 className="screen-title">Live</h1>
-        {!isRunning && (
+        {!isRunning && !isNode && (
           <button
             className="btn btn-primary"
             onClick={() => setShowStart(true)}
@@ -213,8 +219,26 @@ export function Live() {
             </span>
           </div>
         )}
+
+        {cluster && cluster.role !== 'standalone' && (
+          <div className="status-bar-item">
+            <span className="status-bar-label">Cluster</span>
+            <span className="status-bar-value">
+              {cluster.role === 'node'
+                ? `Node of ${cluster.coordinator}${cluster.synced ? '' : ' (syncing)'}`
+                : `Coordinator, ${cluster.nodes.length} node${cluster.nodes.length === 1 ? '' : 's'}`}
+            </span>
+          </div>
+        )}
       </div>
 
+      {isNode && (
+        <p className="form-hint" style={{ marginBottom: 12 }}>
+          This Pi is a cluster node. Control the show from the coordinator.
+          {cluster?.error ? ` ${cluster.error}` : ''}
+        </p>
+      )}
+
       <div className="led-strip-wrap" style={{ marginBottom: 20 }}>
         {channels.map((ch) => {
           const pixels = frame[ch.id] ?? Array(ch.ledCount).fill('#000000')
@@ -231,7 +255,7 @@ export function Live() {
         <button
           className="btn btn-primary btn-lg"
           onClick={handleNext}
-          disabled={!isRunning}
+          disabled={!isRunning || isNode}
           style={{ width: '100%', justifyContent: 'center' }}
         >
           NEXT CUE
@@ -240,14 +264,14 @@ export function Live() {
           <button
             className={`btn btn-lg${isBlackout ? ' btn-primary' : ''}`}
             onClick={handleBlackout}
-            disabled={!isRunning}
+            disabled={!isRunning || isNode}
           >
             {isBlackout ? '◼ BLACKOUT ACTIVE' : 'BLACKOUT'}
           </button>
           <button
             className="btn btn-danger btn-lg"
             onClick={handleStop}
-            disabled={!isRunning}
+            disabled={!isRunning || isNode}
           >
             STOP
           </button>
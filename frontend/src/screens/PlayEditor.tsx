@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react'
 import { useNavigate, useParams } from 'react-router-dom'
-import { getChannels, getPlay, randomUUID, testRegion, updatePlay } from '../api'
+import { getAllCues, getChannels, getPlayOutline, randomUUID, testRegion, updatePlay } from '../api'
 import { ChannelStrip, REGION_SWATCHES, getRegionColor } from '../components/ChannelStrip'
 import { EffectForm } from '../components/EffectForm'
 import { useToast } from '../context/ToastContext'
@@ -575,14 +575,25 @@ export function PlayEditor() {
   const [play, setPlay] = useState<Play | null>(null)
   const [channels, setChannels] = useState<Channel[]>([])
   const [loading, setLoading] = useState(true)
+  const [cuesLoaded, setCuesLoaded] = useState(false)
   const [saving, setSaving] = useState(false)
   const [dirty, setDirty] = useState(false)
   const [tab, setTab] = useState<'regions' | 'cues'>('regions')
 
   useEffect(() => {
     if (!id) return
-    Promise.all([getPlay(id), getChannels()])
-      .then(([p, ch]) => { setPlay(p); setChannels(ch) })
+    // Show the regions as soon as the outline arrives; cues follow in pages
+    Promise.all([getPlayOutline(id), getChannels()])
+      .then(([outline, ch]) => {
+        setPlay({ id: outline.id, name: outline.name, regions: outline.regions, cues: [] })
+        setChannels(ch)
+        setLoading(false)
+        return getAllCues(id, outline.cues.length)
+      })
+      .then((cues) => {
+        setPlay((p) => p && { ...p, cues })
+        setCuesLoaded(true)
+      })
       .catch((e) => toastError(e instanceof Error ? e.message : 'Load failed.'))
       .finally(() => setLoading(false))
   }, [id])
@@ -623,7 +634,7 @@ export function PlayEditor() {
         <button
           className="btn btn-primary btn-sm"
           onClick={handleSave}
-          disabled={!dirty || saving}
+          disabled={!dirty || saving || !cuesLoaded}
         >
           {saving ? 'Saving…' : dirty ? 'Save Changes' : 'Saved'}
         </button>
@@ -639,8 +650,9 @@ export function PlayEditor() {
         <button
           className={`tab-btn${tab === 'cues' ? ' active' : ''}`}
           onClick={() => setTab('cues')}
+          disabled={!cuesLoaded}
         >
-          Cues
+          {cuesLoaded ? 'Cues' : 'Cues (loading…)'}
         </button>
       </div>
 
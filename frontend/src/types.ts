@@ -40,9 +40,38 @@ export interface Play {
   cues: Cue[]
 }
 
+export interface ChannelRegionRef {
+  playId: string
+  playName: string
+  regionId: string
+  regionName: string
+  lastPixel: number
+}
+
+export interface ChannelUpdateResponse {
+  ok: boolean
+  outOfBounds: ChannelRegionRef[]
+}
+
 export interface PlaySummary {
   id: string
   name: string
+  cueCount?: number
+  regionCount?: number
+  totalPixels?: number
+  modifiedAt?: number | null
+}
+
+export interface CueSummary {
+  id: string
+  name: string
+}
+
+export interface PlayOutline {
+  id: string
+  name: string
+  regions: Region[]
+  cues: CueSummary[]
 }
 
 export interface PreviewStatus {
@@ -57,6 +86,27 @@ export interface LiveStatus {
   cueName: string | null
   cueIndex: number | null
   isBlackout: boolean
+  nextCueReady?: boolean
+}
+
+export interface ClusterNodeStatus {
+  name: string
+  address: string
+  lastSeenSec: number
+  offsetMs: number | null
+  rttMs: number | null
+  playId: string | null
+  error: string | null
+}
+
+export interface ClusterStatus {
+  role: 'standalone' | 'coordinator' | 'node'
+  nodes: ClusterNodeStatus[]
+  coordinator: string | null
+  synced: boolean
+  offsetMs: number | null
+  rttMs: number | null
+  error: string | null
 }
 
 export type WsMessage =
@@ -69,6 +119,7 @@ export type WsMessage =
       cueIndex: number | null
       isRunning: boolean
       isBlackout: boolean
+      nextCueReady?: boolean
     }
   | { type: 'done' }
   | { type: 'error'; message: string }
@@ -76,4 +127,8 @@ export type WsMessage =
 export interface BackupEntry {
   name: string
   path: string
+  createdAt?: number | null
+  hash?: string | null
+  size?: number | null
+  cueCount?: number | null
 }